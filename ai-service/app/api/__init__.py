@@ -0,0 +1,6 @@
+"""
+HTTP API routers for AI service.
+"""
+from app.api.generate import router as generate_router
+
+__all__ = ["generate_router"]
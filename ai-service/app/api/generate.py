@@ -0,0 +1,164 @@
+"""
+Streaming generation API using server-sent events.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import text
+
+from app.cleaner.content import ContentCleaner
+from app.config import settings
+from app.llm.cache import get_response_cache
+from app.llm.providers import LLMError, ProviderError
+from app.llm.router import ROUTER_MODEL, build_messages, get_router
+from app.utils.db import data_access
+from app.utils.logger import logger
+from app.utils.text import TextNormalizer, normalize_text
+
+router = APIRouter(prefix="/generate", tags=["generate"])
+
+# Persistence tasks still running after their stream closed
+_background: Set[asyncio.Task] = set()
+
+
+class GenerateRequest(BaseModel):
+    """Streaming generation request."""
+
+    prompt: str
+    system: Optional[str] = None
+    content_type: str = "article"
+    title: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    use_cache: bool = True
+    persist: bool = False
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/stream")
+async def generate_stream(body: GenerateRequest) -> StreamingResponse:
+    """
+    Generate text and relay it as server-sent events.
+
+    Events:
+        token: ``{"text": ...}`` cleaned content as it is produced
+        done: generation summary, sent after the last token
+        error: ``{"error": ...}`` if generation failed
+
+    Args:
+        body: Generation request
+
+    Returns:
+        Event stream response
+    """
+    return StreamingResponse(
+        _event_stream(body),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _event_stream(body: GenerateRequest) -> AsyncIterator[str]:
+    temperature = settings.default_temperature if body.temperature is None else body.temperature
+    max_tokens = min(body.max_tokens or settings.default_max_tokens, settings.max_generation_length)
+    cache_prompt = f"{body.system}\n\n{body.prompt}" if body.system else body.prompt
+
+    if body.use_cache:
+        try:
+            hit = await asyncio.to_thread(
+                get_response_cache().get, cache_prompt, ROUTER_MODEL, temperature
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            hit = None
+        if hit is not None:
+            record = _clean(body, hit.response)
+            yield _sse("token", {"text": record["content"]})
+            yield _sse("done", _summary(record, cached=hit.tier))
+            return
+
+    normalizer = TextNormalizer()
+    raw_parts = []
+    meta: Dict[str, Any] = {}
+    try:
+        async for delta in get_router().stream(
+            build_messages(body.prompt, body.system), temperature, max_tokens, meta=meta
+        ):
+            raw_parts.append(delta)
+            cleaned = normalizer.feed(delta)
+            if cleaned:
+                yield _sse("token", {"text": cleaned})
+        tail = normalizer.close()
+        if tail:
+            yield _sse("token", {"text": tail})
+    except (LLMError, ProviderError) as e:
+        logger.error(f"Streaming generation failed: {e}")
+        yield _sse("error", {"error": str(e)})
+        return
+
+    raw = "".join(raw_parts)
+    record = _clean(body, raw)
+    task = asyncio.create_task(_persist(body, record, raw, cache_prompt, temperature))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+    yield _sse("done", _summary(record, provider=meta.get("provider"), model=meta.get("model")))
+
+
+def _clean(body: GenerateRequest, content: str) -> Dict[str, Any]:
+    """Apply the full ContentCleaner rules to the finished content."""
+    return ContentCleaner().clean({
+        "type": body.content_type,
+        "title": body.title,
+        "content": content,
+    })
+
+
+def _summary(record: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+    summary = {"length": len(record.get("content") or "")}
+    if record.get("risk_warning"):
+        summary["risk_warning"] = record["risk_warning"]
+    summary.update({key: value for key, value in extra.items() if value is not None})
+    return summary
+
+
+async def _persist(
+    body: GenerateRequest,
+    record: Dict[str, Any],
+    raw: str,
+    cache_prompt: str,
+    temperature: float,
+) -> None:
+    """Cache and store a finished generation without holding up the stream."""
+    try:
+        if body.use_cache:
+            await asyncio.to_thread(
+                get_response_cache().set, cache_prompt, ROUTER_MODEL, temperature, raw
+            )
+        if body.persist and body.content_type == "article":
+            article_id = await _insert_article(record)
+            logger.info(f"Saved generated article {article_id}")
+    except Exception as e:
+        logger.error(f"Failed to persist generated content: {e}", exc_info=True)
+
+
+async def _insert_article(record: Dict[str, Any]) -> int:
+    content = record["content"]
+    title = record.get("title") or normalize_text(content)[:50]
+    async with data_access.engine.begin() as conn:
+        result = await conn.execute(
+            text(
+                "INSERT INTO articles (title, content, author, status) "
+                "VALUES (:title, :content, 'AI', 'draft') RETURNING id"
+            ),
+            {"title": title, "content": content},
+        )
+        return result.scalar_one()
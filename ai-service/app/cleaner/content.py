@@ -2,11 +2,11 @@
 Content cleaner for processing and normalizing AI-generated content.
 """
 import re
-from html import unescape
 from typing import Any, Dict, List, Optional
 
 from app.cleaner.base import BaseCleaner
 from app.utils.logger import logger
+from app.utils.text import HTML_TAG_PATTERN, normalize_text
 
 
 class ContentCleaner(BaseCleaner):
@@ -15,11 +15,14 @@ class ContentCleaner(BaseCleaner):
     """
     
     # HTML tag pattern
-    HTML_PATTERN = re.compile(r"<[^>]+>")
+    HTML_PATTERN = HTML_TAG_PATTERN
     
     # Markdown code block pattern
     MARKDOWN_CODE_PATTERN = re.compile(r"```[\s\S]*?```")
     
+    # Three or more consecutive newlines
+    BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize content cleaner.
@@ -127,25 +130,7 @@ class ContentCleaner(BaseCleaner):
         Returns:
             Cleaned text
         """
-        if not text:
-            return ""
-        
-        # Unescape HTML entities
-        text = unescape(text)
-        
-        # Remove HTML tags
-        text = self.HTML_PATTERN.sub("", text)
-        
-        # Remove extra whitespace
-        text = re.sub(r"\s+", " ", text)
-        
-        # Remove leading/trailing whitespace
-        text = text.strip()
-        
-        # Remove special control characters
-        text = re.sub(r"[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]", "", text)
-        
-        return text
+        return normalize_text(text)
     
     def clean_markdown(self, markdown: str) -> str:
         """
@@ -160,7 +145,7 @@ class ContentCleaner(BaseCleaner):
         cleaned = markdown
         
         # Remove excessive blank lines
-        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
+        cleaned = self.BLANK_LINES_PATTERN.sub("\n\n", cleaned)
         
         # Ensure proper line breaks
         cleaned = cleaned.replace("\r\n", "\n").replace("\r", "\n")
@@ -1,11 +1,22 @@
 """
 Prompt template crawler for collecting and syncing prompt templates.
 """
+import asyncio
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import create_engine, text
+
+from app.config import settings
 from app.crawler.base import BaseCrawler
 from app.utils.logger import logger
 
+ACTIVE_TEMPLATES_SQL = """
+    SELECT name, category, template, variables, version, updated_at
+    FROM prompt_templates
+    WHERE is_active AND (CAST(:category AS VARCHAR) IS NULL OR category = :category)
+    ORDER BY name
+"""
+
 
 class PromptTemplateCrawler(BaseCrawler):
     """
@@ -31,24 +42,32 @@ class PromptTemplateCrawler(BaseCrawler):
         Fetch prompt templates.
         
         Args:
-            source: Source identifier (database, file, api)
+            source: Source identifier, only "database" (the default) is supported
             category: Prompt category filter
             **kwargs: Additional parameters
             
         Returns:
             List of prompt template records
+            
+        Raises:
+            ValueError: If the source is not supported
         """
-        # TODO: Implement actual prompt fetching
-        # This is a placeholder implementation
+        source = source or "database"
         self.logger.info(f"Fetching prompt templates from source: {source}, category: {category}")
         
-        records = []
-        # Example implementation:
-        # 1. Fetch from database
-        # 2. Load from file system
-        # 3. Fetch from external API
-        
-        return records
+        if source != "database":
+            raise ValueError(f"Unsupported prompt template source: {source}")
+        return await asyncio.to_thread(self._fetch_database, category)
+    
+    def _fetch_database(self, category: Optional[str]) -> List[Dict[str, Any]]:
+        """Read active templates from the prompt_templates table."""
+        engine = create_engine(self.config.get("postgres_url", settings.postgres_url))
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(text(ACTIVE_TEMPLATES_SQL), {"category": category})
+                return [dict(row._mapping) for row in rows]
+        finally:
+            engine.dispose()
     
     def validate(self, data: Dict[str, Any]) -> bool:
         """
@@ -75,8 +94,9 @@ class PromptTemplateCrawler(BaseCrawler):
         """
         # Normalize template variables
         if "variables" in data and isinstance(data["variables"], str):
-            # Convert string to list if needed
-            pass
+            data["variables"] = [
+                name.strip() for name in data["variables"].strip("{}").split(",") if name.strip()
+            ]
         
         return data
 
@@ -1,10 +1,12 @@
 """
 Vector data crawler for collecting embedding vectors.
 """
+import asyncio
 from typing import Any, Dict, List, Optional
 
 from app.crawler.base import BaseCrawler
 from app.utils.logger import logger
+from app.vector import get_vector_store
 
 
 class VectorDataCrawler(BaseCrawler):
@@ -30,25 +32,43 @@ class VectorDataCrawler(BaseCrawler):
         """
         Fetch vector data.
         
+        Reads records from the local vector store. With a ``query_vector``
+        the nearest neighbors are returned instead of a scan.
+        
         Args:
             collection: Vector collection name
             limit: Maximum number of vectors to fetch
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters (query_vector, where, offset)
             
         Returns:
             List of vector data records
         """
-        # TODO: Implement actual vector data fetching
-        # This is a placeholder implementation
+        collection = collection or self.config.get("collection")
         self.logger.info(f"Fetching vector data from collection: {collection}, limit: {limit}")
         
-        records = []
-        # Example implementation:
-        # 1. Fetch from Milvus
-        # 2. Generate embeddings from text
-        # 3. Sync with external vector database
+        store = self.config.get("store") or get_vector_store()
+        if not collection or not store.has_collection(collection):
+            self.logger.warning(f"Vector collection not found: {collection}")
+            return []
+        
+        query_vector = kwargs.get("query_vector")
+        if query_vector is None:
+            return await asyncio.to_thread(
+                lambda: list(store.scan(collection, limit, kwargs.get("offset", 0)))
+            )
         
-        return records
+        hits = await asyncio.to_thread(
+            store.search, collection, query_vector, limit or 10, kwargs.get("where")
+        )
+        ids = [hit.id for hit in hits]
+        vectors = {
+            record["id"]: record["vector"]
+            for record in await asyncio.to_thread(store.get, collection, ids)
+        }
+        return [
+            {"id": hit.id, "score": hit.score, "vector": vectors.get(hit.id), "payload": hit.payload}
+            for hit in hits
+        ]
     
     def validate(self, data: Dict[str, Any]) -> bool:
         """
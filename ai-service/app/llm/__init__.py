@@ -0,0 +1,36 @@
+"""
+LLM access layer: provider clients, routing, response caching and prompt templates.
+"""
+from app.llm.batch import BatchClaim, BatchGenerator, BatchQueue
+from app.llm.cache import CacheHit, LLMResponseCache, get_response_cache
+from app.llm.providers import LLMError, LLMResponse, Provider, ProviderConfig
+from app.llm.router import LLMRouter, close_router, generate_text, get_router
+from app.llm.templates import (
+    CompiledTemplate,
+    TemplateError,
+    TemplateRegistry,
+    compile_template,
+    get_template_registry,
+)
+
+__all__ = [
+    "BatchGenerator",
+    "BatchQueue",
+    "BatchClaim",
+    "CacheHit",
+    "LLMResponseCache",
+    "get_response_cache",
+    "LLMError",
+    "LLMResponse",
+    "Provider",
+    "ProviderConfig",
+    "LLMRouter",
+    "close_router",
+    "generate_text",
+    "get_router",
+    "CompiledTemplate",
+    "TemplateError",
+    "TemplateRegistry",
+    "compile_template",
+    "get_template_registry",
+]
@@ -0,0 +1,372 @@
+"""
+Batch generation: many prompts packed into few provider requests.
+"""
+import asyncio
+import json
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import redis
+
+from app.config import settings
+from app.llm.cache import LLMResponseCache, get_response_cache
+from app.llm.providers import LLMError, configured_providers
+from app.llm.router import ROUTER_MODEL, build_messages, get_router
+from app.runtime import runtime
+from app.utils.logger import logger
+
+GROUP_INSTRUCTION = (
+    "以下有 {count} 条相互独立的任务。请依次完成每条任务，"
+    "每条结果以单独一行“=== 任务 序号 ===”开头，不要输出其他内容。"
+)
+
+GROUP_MARKER = "=== 任务 {index} ==="
+
+GROUP_MARKER_PATTERN = re.compile(r"^\s*=+\s*任务\s*(\d+)\s*=+\s*$", re.MULTILINE)
+
+# Move up to ARGV[1] items from the queue head onto a claim list and record its deadline
+# KEYS: queue, claim list, claims zset
+# ARGV: limit, deadline
+_CLAIM_SCRIPT = """
+local items = {}
+for i = 1, tonumber(ARGV[1]) do
+    local item = redis.call('LMOVE', KEYS[1], KEYS[2], 'LEFT', 'RIGHT')
+    if not item then
+        break
+    end
+    items[i] = item
+end
+if #items > 0 then
+    redis.call('ZADD', KEYS[3], ARGV[2], KEYS[2])
+end
+return items
+"""
+
+# Put a claim's items back at the queue head in their original order
+# KEYS: claim list, queue, claims zset
+_RELEASE_SCRIPT = """
+local moved = 0
+while redis.call('LMOVE', KEYS[1], KEYS[2], 'RIGHT', 'LEFT') do
+    moved = moved + 1
+end
+redis.call('ZREM', KEYS[3], KEYS[1])
+return moved
+"""
+
+
+def build_group_prompt(prompts: Sequence[str]) -> str:
+    """
+    Combine prompts into one multi-task prompt.
+
+    Args:
+        prompts: Independent prompts
+
+    Returns:
+        Prompt asking for one marked answer per task
+    """
+    parts = [GROUP_INSTRUCTION.format(count=len(prompts))]
+    for index, prompt in enumerate(prompts, 1):
+        parts.append(f"{GROUP_MARKER.format(index=index)}\n{prompt}")
+    return "\n\n".join(parts)
+
+
+def split_group_response(response: str, count: int) -> List[Optional[str]]:
+    """
+    Split a multi-task response into per-task answers.
+
+    Args:
+        response: Model output for a group prompt
+        count: Number of tasks in the group
+
+    Returns:
+        Answer per task, None where the model skipped or mangled a marker
+    """
+    answers: List[Optional[str]] = [None] * count
+    matches = list(GROUP_MARKER_PATTERN.finditer(response))
+    for i, match in enumerate(matches):
+        index = int(match.group(1)) - 1
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        answer = response[match.end() : end].strip()
+        if 0 <= index < count and answer and answers[index] is None:
+            answers[index] = answer
+    return answers
+
+
+def window_capacity(window_seconds: Optional[float] = None) -> int:
+    """
+    Group requests batch mode may send in one window.
+
+    Args:
+        window_seconds: Scheduling window, defaults to settings.llm_batch_window_seconds
+
+    Returns:
+        Request count within the batch share of every provider's rate limit
+    """
+    window = window_seconds or settings.llm_batch_window_seconds
+    per_minute = sum(config.requests_per_minute for config in configured_providers())
+    return int(per_minute * window / 60 * settings.llm_batch_rate_share)
+
+
+class BatchGenerator:
+    """
+    Generates many prompts with few provider requests.
+
+    Prompts already answered in the response cache are served from it; the
+    rest are grouped ``group_size`` to a request and sent concurrently
+    through the router, whose token buckets pace them across the rate-limit
+    window. Tasks the model dropped from a group response come back as None
+    so callers can retry them.
+    """
+
+    def __init__(
+        self,
+        group_size: Optional[int] = None,
+        cache: Optional[LLMResponseCache] = None,
+    ):
+        """
+        Initialize the generator.
+
+        Args:
+            group_size: Prompts per request, defaults to settings.llm_batch_group_size
+            cache: Response cache, defaults to the shared one
+        """
+        self.group_size = group_size or settings.llm_batch_group_size
+        self._cache = cache
+
+    @property
+    def cache(self) -> LLMResponseCache:
+        """Response cache, resolved on first use."""
+        if self._cache is None:
+            self._cache = get_response_cache()
+        return self._cache
+
+    def generate(
+        self,
+        prompts: Sequence[str],
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> List[Optional[str]]:
+        """
+        Generate a response for every prompt.
+
+        Args:
+            prompts: Independent prompts
+            system: System prompt shared by every prompt
+            temperature: Sampling temperature, defaults to settings.default_temperature
+            use_cache: Whether to read and write the response cache
+
+        Returns:
+            Response per prompt, None where generation failed
+        """
+        temperature = settings.default_temperature if temperature is None else temperature
+        responses: List[Optional[str]] = [None] * len(prompts)
+        keys = [f"{system}\n\n{prompt}" if system else prompt for prompt in prompts]
+
+        pending = []
+        for i, key in enumerate(keys):
+            hit = self.cache.get(key, ROUTER_MODEL, temperature) if use_cache else None
+            if hit is not None:
+                responses[i] = hit.response
+            else:
+                pending.append(i)
+
+        groups = [
+            pending[start : start + self.group_size]
+            for start in range(0, len(pending), self.group_size)
+        ]
+        results = runtime.run(
+            self._generate_groups(
+                [[prompts[i] for i in group] for group in groups], system, temperature
+            )
+        )
+
+        for group, answers in zip(groups, results):
+            for i, answer in zip(group, answers):
+                responses[i] = answer
+                if answer is not None and use_cache:
+                    self.cache.set(keys[i], ROUTER_MODEL, temperature, answer)
+
+        logger.info(
+            f"Batch generated {len(prompts)} prompts: {len(prompts) - len(pending)} cached, "
+            f"{len(groups)} requests, {responses.count(None)} missing"
+        )
+        return responses
+
+    async def _generate_groups(
+        self,
+        groups: List[List[str]],
+        system: Optional[str],
+        temperature: float,
+    ) -> List[List[Optional[str]]]:
+        return await asyncio.gather(
+            *(self._generate_group(prompts, system, temperature) for prompts in groups)
+        )
+
+    async def _generate_group(
+        self,
+        prompts: List[str],
+        system: Optional[str],
+        temperature: float,
+    ) -> List[Optional[str]]:
+        if len(prompts) == 1:
+            messages = build_messages(prompts[0], system)
+            max_tokens = settings.default_max_tokens
+        else:
+            messages = build_messages(build_group_prompt(prompts), system)
+            max_tokens = min(
+                settings.default_max_tokens * len(prompts), settings.llm_batch_max_tokens
+            )
+        try:
+            response = await get_router().complete(messages, temperature, max_tokens)
+        except LLMError as e:
+            logger.warning(f"Batch group of {len(prompts)} failed: {e}")
+            return [None] * len(prompts)
+        if len(prompts) == 1:
+            return [response.content.strip() or None]
+        return split_group_response(response.content, len(prompts))
+
+
+@dataclass
+class BatchClaim:
+    """Items taken from a BatchQueue, kept in Redis until acked or released."""
+
+    key: str
+    items: List[Dict[str, Any]]
+
+
+class BatchQueue:
+    """
+    Redis-backed queue of items waiting for batch generation.
+
+    Consumers claim items rather than removing them: a claim moves them onto
+    a list of its own, and they are only deleted when the claim is acked.
+    Claims that are neither acked nor released within ``claim_seconds``,
+    such as those of a crashed worker, are put back on the queue by the next
+    claim, so an item is generated at least once.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: Optional[redis.Redis] = None,
+        claim_seconds: Optional[int] = None,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            name: Queue name
+            client: Redis client, defaults to settings.redis_url
+            claim_seconds: Time a claim may stay unacked, defaults to
+                settings.llm_batch_claim_seconds
+        """
+        self.key = f"llm:batch:{name}"
+        self.claims_key = f"{self.key}:claims"
+        self.client = client or redis.from_url(settings.redis_url)
+        self.claim_seconds = claim_seconds or settings.llm_batch_claim_seconds
+        self._claim = self.client.register_script(_CLAIM_SCRIPT)
+        self._release = self.client.register_script(_RELEASE_SCRIPT)
+
+    def push(self, items: Sequence[Dict[str, Any]]) -> int:
+        """
+        Queue items.
+
+        Args:
+            items: JSON-serializable items
+
+        Returns:
+            Queue length after the push
+        """
+        if not items:
+            return self.client.llen(self.key)
+        return self.client.rpush(
+            self.key, *(json.dumps(item, ensure_ascii=False, default=str) for item in items)
+        )
+
+    def claim(self, limit: int) -> BatchClaim:
+        """
+        Claim up to ``limit`` items, oldest first, after requeueing expired claims.
+
+        Args:
+            limit: Maximum items to take
+
+        Returns:
+            Claim holding the items; ack or release it when done
+        """
+        self.recover()
+        key = f"{self.key}:claim:{uuid.uuid4().hex}"
+        if limit <= 0:
+            return BatchClaim(key, [])
+        raw = self._claim(
+            keys=[self.key, key, self.claims_key],
+            args=[limit, time.time() + self.claim_seconds],
+        )
+        return BatchClaim(key, [json.loads(item) for item in raw])
+
+    def ack(self, claim: BatchClaim, requeue: Sequence[Dict[str, Any]] = ()) -> None:
+        """
+        Finish a claim, deleting its items.
+
+        Args:
+            claim: Claim returned by claim()
+            requeue: Items to queue again in the same transaction, such as
+                retries with updated attempt counts
+        """
+        pipe = self.client.pipeline(transaction=True)
+        if requeue:
+            pipe.rpush(
+                self.key, *(json.dumps(item, ensure_ascii=False, default=str) for item in requeue)
+            )
+        pipe.delete(claim.key)
+        pipe.zrem(self.claims_key, claim.key)
+        pipe.execute()
+
+    def release(self, claim: BatchClaim) -> int:
+        """
+        Give up a claim, putting its items back at the head of the queue.
+
+        Args:
+            claim: Claim returned by claim()
+
+        Returns:
+            Items put back
+        """
+        return self._release(keys=[claim.key, self.key, self.claims_key])
+
+    def recover(self) -> int:
+        """
+        Put the items of expired claims back on the queue.
+
+        Returns:
+            Items put back
+        """
+        expired = self.client.zrangebyscore(self.claims_key, "-inf", time.time())
+        recovered = 0
+        for raw_key in expired:
+            key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            recovered += self._release(keys=[key, self.key, self.claims_key])
+        if recovered:
+            logger.warning(f"Requeued {recovered} items from expired claims on {self.key}")
+        return recovered
+
+    def __len__(self) -> int:
+        return self.client.llen(self.key)
+
+
+def batch_limit(group_size: Optional[int] = None) -> int:
+    """
+    Items one scheduling window can take.
+
+    Args:
+        group_size: Prompts per request, defaults to settings.llm_batch_group_size
+
+    Returns:
+        Item count, at least one group
+    """
+    group_size = group_size or settings.llm_batch_group_size
+    return max(1, window_capacity()) * group_size
+
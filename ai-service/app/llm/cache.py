@@ -0,0 +1,378 @@
+"""
+Two-tier LLM response cache: exact prompt matches and near-duplicate prompts.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import redis
+
+from app.config import settings
+from app.utils.logger import logger
+from app.vector.embedding import (
+    EmbeddingService,
+    decode_vector,
+    encode_vector,
+    get_embedding_service,
+)
+
+ENTRY_KEY = "llm:cache:{namespace}:{digest}"
+LRU_KEY = "llm:cache:lru"
+VECTORS_KEY = "llm:cache:vectors:{namespace}"
+
+
+@dataclass
+class CacheHit:
+    """A cached response and how it was found."""
+
+    response: str
+    tier: str  # "local", "exact" or "semantic"
+    similarity: float = 1.0
+
+
+def cache_namespace(model: str, temperature: float) -> str:
+    """
+    Namespace isolating responses by model and sampling temperature.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+
+    Returns:
+        Namespace string
+    """
+    return f"{model}:{temperature:.2f}"
+
+
+def prompt_digest(prompt: str) -> str:
+    """
+    Hash a prompt after whitespace normalization.
+
+    Only runs of whitespace are collapsed. Anything else, including text
+    that looks like markup such as ``close < ma5 and volume > 1e6``, can
+    change the answer and is hashed as is.
+
+    Args:
+        prompt: Prompt text
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(" ".join(prompt.split()).encode("utf-8")).hexdigest()
+
+
+class _SemanticIndex:
+    """In-process snapshot of one namespace's prompt embeddings."""
+
+    def __init__(self):
+        self.digests: List[str] = []
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.loaded_at = 0.0
+
+    def load(self, vectors: Dict[bytes, bytes]) -> None:
+        self.digests = [digest.decode() for digest in vectors]
+        rows = [decode_vector(data) for data in vectors.values()]
+        self.matrix = np.vstack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+        self.loaded_at = time.monotonic()
+
+    def add(self, digest: str, vector: np.ndarray) -> None:
+        if digest in self.digests:
+            return
+        self.digests.append(digest)
+        self.matrix = vector[None, :] if not self.matrix.size else np.vstack([self.matrix, vector])
+
+    def remove(self, digest: str) -> None:
+        if digest in self.digests:
+            i = self.digests.index(digest)
+            del self.digests[i]
+            self.matrix = np.delete(self.matrix, i, axis=0)
+
+    def nearest(self, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        if not self.digests:
+            return None, 0.0
+        scores = self.matrix @ vector
+        best = int(np.argmax(scores))
+        return self.digests[best], float(scores[best])
+
+
+class LLMResponseCache:
+    """
+    LLM response cache shared by all workers through Redis.
+
+    Lookups try, in order:
+
+    - a small in-process LRU;
+    - the exact tier, keyed by model, temperature and a hash of the prompt
+      with its whitespace collapsed;
+    - the semantic tier, which embeds the prompt with only its whitespace
+      collapsed, like the exact tier, and serves the closest cached prompt
+      in the same namespace if its cosine similarity reaches
+      ``similarity_threshold``.
+
+    Entries expire after ``ttl_seconds``. A sorted set of last-access times
+    bounds the cache at ``max_entries`` by evicting the least recently used.
+    """
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        embedder: Optional[EmbeddingService] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        similarity_threshold: Optional[float] = None,
+        local_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            client: Redis client, defaults to settings.redis_url
+            embedder: Embedding service for the semantic tier
+            ttl_seconds: Entry lifetime
+            max_entries: Entries kept before LRU eviction
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            local_entries: Size of the in-process LRU
+        """
+        self.client = client or redis.from_url(settings.redis_url)
+        self._embedder = embedder
+        self.ttl = ttl_seconds or settings.llm_cache_ttl_seconds
+        self.max_entries = max_entries or settings.llm_cache_max_entries
+        self.threshold = similarity_threshold or settings.llm_cache_similarity_threshold
+        self.local_entries = local_entries or settings.llm_cache_local_entries
+
+        self._local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._indexes: Dict[str, _SemanticIndex] = {}
+        self._lock = threading.Lock()
+        self.stats = {"local": 0, "exact": 0, "semantic": 0, "miss": 0}
+
+    @property
+    def embedder(self) -> EmbeddingService:
+        """Embedding service, resolved on first semantic lookup."""
+        if self._embedder is None:
+            self._embedder = get_embedding_service()
+        return self._embedder
+
+    def get(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        semantic: bool = True,
+    ) -> Optional[CacheHit]:
+        """
+        Look up a cached response.
+
+        Args:
+            prompt: Prompt text
+            model: Model name
+            temperature: Sampling temperature
+            semantic: Whether near-duplicate prompts may be served
+
+        Returns:
+            CacheHit, or None on a miss
+        """
+        namespace = cache_namespace(model, temperature)
+        digest = prompt_digest(prompt)
+        key = ENTRY_KEY.format(namespace=namespace, digest=digest)
+
+        response = self._local_get(key)
+        if response is not None:
+            self.stats["local"] += 1
+            return CacheHit(response, "local")
+
+        response = self._fetch(key)
+        if response is not None:
+            self.stats["exact"] += 1
+            return CacheHit(response, "exact")
+
+        if semantic:
+            hit = self._semantic_get(namespace, prompt)
+            if hit is not None:
+                self.stats["semantic"] += 1
+                return hit
+
+        self.stats["miss"] += 1
+        return None
+
+    def set(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        response: str,
+        ttl_seconds: Optional[int] = None,
+        semantic: bool = True,
+    ) -> None:
+        """
+        Store a response for a prompt.
+
+        Args:
+            prompt: Prompt text
+            model: Model name
+            temperature: Sampling temperature
+            response: Generated response
+            ttl_seconds: Override of the default lifetime
+            semantic: Whether near-duplicate prompts may be served this
+                response; if not, the prompt is not embedded
+        """
+        namespace = cache_namespace(model, temperature)
+        digest = prompt_digest(prompt)
+        key = ENTRY_KEY.format(namespace=namespace, digest=digest)
+        entry = json.dumps({"response": response, "created_at": time.time()}, ensure_ascii=False)
+
+        vector = None
+        if semantic:
+            try:
+                vector = self.embedder.embed_sync([prompt], normalize=False)[0]
+            except Exception as e:
+                logger.warning(f"Prompt embedding failed, caching exact tier only: {e}")
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(key, entry, ex=ttl_seconds or self.ttl)
+        pipe.zadd(LRU_KEY, {key: time.time()})
+        if vector is not None:
+            pipe.hset(VECTORS_KEY.format(namespace=namespace), digest, encode_vector(vector))
+        pipe.zcard(LRU_KEY)
+        size = pipe.execute()[-1]
+
+        self._local_put(key, response)
+        if vector is not None:
+            with self._lock:
+                self._indexes.setdefault(namespace, _SemanticIndex()).add(digest, vector)
+        if size > self.max_entries:
+            self._evict(size - self.max_entries)
+
+    def get_or_generate(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        generate: Callable[[], str],
+        semantic: bool = True,
+    ) -> Tuple[str, Optional[CacheHit]]:
+        """
+        Serve a cached response or generate and cache a new one.
+
+        Args:
+            prompt: Prompt text
+            model: Model name
+            temperature: Sampling temperature
+            generate: Called on a miss to produce the response
+            semantic: Whether near-duplicate prompts may be served
+
+        Returns:
+            Tuple of (response, hit), where hit is None if the response was generated
+        """
+        hit = self.get(prompt, model, temperature, semantic=semantic)
+        if hit is not None:
+            return hit.response, hit
+        response = generate()
+        self.set(prompt, model, temperature, response, semantic=semantic)
+        return response, None
+
+    def _fetch(self, key: str) -> Optional[str]:
+        """Read an entry from Redis and mark it recently used."""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.zadd(LRU_KEY, {key: time.time()}, xx=True)
+        raw = pipe.execute()[0]
+        if raw is None:
+            return None
+        response = json.loads(raw)["response"]
+        self._local_put(key, response)
+        return response
+
+    def _semantic_get(self, namespace: str, prompt: str) -> Optional[CacheHit]:
+        try:
+            vector = self.embedder.embed_sync([prompt], normalize=False)[0]
+        except Exception as e:
+            logger.warning(f"Prompt embedding failed, skipping semantic cache: {e}")
+            return None
+
+        index = self._index(namespace)
+        with self._lock:
+            digest, similarity = index.nearest(vector)
+        if digest is None or similarity < self.threshold:
+            return None
+
+        response = self._fetch(ENTRY_KEY.format(namespace=namespace, digest=digest))
+        if response is None:
+            # Entry expired; drop its vector so it stops matching
+            self.client.hdel(VECTORS_KEY.format(namespace=namespace), digest)
+            with self._lock:
+                index.remove(digest)
+            return None
+        return CacheHit(response, "semantic", similarity)
+
+    def _index(self, namespace: str) -> _SemanticIndex:
+        """Namespace index, reloaded periodically to pick up other workers' entries."""
+        with self._lock:
+            index = self._indexes.setdefault(namespace, _SemanticIndex())
+            stale = time.monotonic() - index.loaded_at > settings.llm_cache_refresh_seconds
+        if stale:
+            vectors = self.client.hgetall(VECTORS_KEY.format(namespace=namespace))
+            with self._lock:
+                index.load(vectors)
+        return index
+
+    def _evict(self, count: int) -> None:
+        """Remove the least recently used entries from every tier."""
+        evicted = self.client.zpopmin(LRU_KEY, count)
+        if not evicted:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for raw_key, _ in evicted:
+            key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            namespace, digest = key[len("llm:cache:"):].rsplit(":", 1)
+            pipe.delete(key)
+            pipe.hdel(VECTORS_KEY.format(namespace=namespace), digest)
+            with self._lock:
+                self._local.pop(key, None)
+                if namespace in self._indexes:
+                    self._indexes[namespace].remove(digest)
+        pipe.execute()
+        logger.debug(f"Evicted {len(evicted)} LLM cache entries")
+
+    def _local_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._local.get(key)
+            if item is None:
+                return None
+            expires_at, response = item
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return response
+
+    def _local_put(self, key: str, response: str) -> None:
+        with self._lock:
+            # Bounded so evictions by other workers are seen within a refresh period
+            lifetime = min(self.ttl, settings.llm_cache_refresh_seconds)
+            self._local[key] = (time.monotonic() + lifetime, response)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_entries:
+                self._local.popitem(last=False)
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """
+    Get the process-wide LLM response cache.
+
+    Returns:
+        Shared LLMResponseCache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+        return _cache
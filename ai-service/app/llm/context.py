@@ -0,0 +1,295 @@
+"""
+Token-budgeted context packing for report prompts.
+"""
+import math
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.config import settings
+from app.utils.logger import logger
+from app.utils.text import normalize_text
+
+# CJK ideographs and full-width punctuation, roughly one token each
+CJK_PATTERN = re.compile(r"[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uff00-\uffef]")
+
+# Section order and headers in the packed context
+SECTIONS = {
+    "market": "【市场数据】",
+    "factor": "【因子亮点】",
+    "news": "【要闻】",
+}
+
+# Relative value of one unit of score per section
+DEFAULT_WEIGHTS = {"market": 1.0, "factor": 0.6, "news": 0.8}
+
+# Tokens kept back for chat formatting the tokenizer does not see
+_MESSAGE_OVERHEAD = 16
+
+_NEWS_SNIPPET_CHARS = 200
+_NEWS_HALF_LIFE_HOURS = 6.0
+
+
+@dataclass(frozen=True)
+class ContextItem:
+    """One candidate fact for a prompt."""
+
+    kind: str  # "market", "factor" or "news"
+    text: str
+    score: float
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count without a tokenizer.
+
+    CJK characters count as one token each and other text as one token per
+    four characters, which tracks BPE tokenizers closely enough for budgeting.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def load_tokenizer(name: str) -> Callable[[str], int]:
+    """
+    Load a Hugging Face tokenizer as a token counter.
+
+    Args:
+        name: Tokenizer name or local path
+
+    Returns:
+        Callable returning the token count of a text
+
+    Raises:
+        RuntimeError: If transformers is not installed
+    """
+    try:
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        raise RuntimeError("transformers is required for tokenizer-based counting") from e
+
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    logger.info(f"Loaded tokenizer {name}")
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+
+class TokenCounter:
+    """Token counter with a per-text cache."""
+
+    def __init__(self, count: Optional[Callable[[str], int]] = None, cache_size: int = 8192):
+        """
+        Initialize the counter.
+
+        Args:
+            count: Exact counting function, defaults to estimate_tokens
+            cache_size: Distinct texts whose counts are kept
+        """
+        self.count = lru_cache(maxsize=cache_size)(count or estimate_tokens)
+
+    def total(self, texts: Iterable[str]) -> int:
+        """
+        Token count of several texts joined by newlines.
+
+        Args:
+            texts: Texts to measure
+
+        Returns:
+            Token count
+        """
+        return sum(self.count(text) + 1 for text in texts)
+
+
+_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """
+    Get the process-wide token counter.
+
+    Uses settings.context_tokenizer when set and loadable, and the
+    character-based estimate otherwise.
+
+    Returns:
+        Shared TokenCounter instance
+    """
+    global _counter
+    with _counter_lock:
+        if _counter is None:
+            count = None
+            if settings.context_tokenizer:
+                try:
+                    count = load_tokenizer(settings.context_tokenizer)
+                except Exception as e:
+                    logger.warning(f"Tokenizer unavailable, estimating token counts: {e}")
+            _counter = TokenCounter(count)
+        return _counter
+
+
+def context_budget(
+    overhead: Sequence[str],
+    prompt_tokens: Optional[int] = None,
+    counter: Optional[TokenCounter] = None,
+) -> int:
+    """
+    Tokens left for context once the fixed prompt text is paid for.
+
+    Args:
+        overhead: Fixed prompt text, such as the system prompt and template
+        prompt_tokens: Whole-prompt budget, defaults to what settings.max_generation_length
+            leaves after a completion of settings.default_max_tokens
+        counter: Token counter, defaults to the shared one
+
+    Returns:
+        Context token budget, at least 0
+    """
+    counter = counter or get_token_counter()
+    prompt_tokens = prompt_tokens or settings.max_generation_length - settings.default_max_tokens
+    return max(0, prompt_tokens - counter.total(overhead) - _MESSAGE_OVERHEAD)
+
+
+def market_items(quotes: Iterable[Dict[str, Any]]) -> List[ContextItem]:
+    """
+    Context items for index and instrument quotes.
+
+    Args:
+        quotes: Quotes with name or code, close and change_pct, and an
+            optional is_index flag
+
+    Returns:
+        Items scored by the size of the move, indices first
+    """
+    items = []
+    for quote in quotes:
+        change = float(quote.get("change_pct") or 0)
+        label = quote.get("name") or quote.get("code")
+        text = f"{label} 收盘 {quote.get('close')}（{change:+.2f}%）"
+        if quote.get("turnover"):
+            text += f"，成交额 {quote['turnover']}"
+        score = min(abs(change) / 5, 1.0) + (1.0 if quote.get("is_index") else 0.0)
+        items.append(ContextItem("market", text, score))
+    return items
+
+
+def factor_items(highlights: Iterable[Dict[str, Any]]) -> List[ContextItem]:
+    """
+    Context items for factor highlights.
+
+    Args:
+        highlights: Highlights with name or code, factor, value and zscore
+
+    Returns:
+        Items scored by absolute z-score
+    """
+    items = []
+    for highlight in highlights:
+        zscore = float(highlight.get("zscore") or 0)
+        label = highlight.get("name") or highlight.get("code")
+        text = f"{label} {highlight.get('factor')}={highlight.get('value')}（z={zscore:+.2f}）"
+        items.append(ContextItem("factor", text, min(abs(zscore) / 3, 1.0)))
+    return items
+
+
+def news_items(rows: Iterable[Dict[str, Any]], as_of: datetime) -> List[ContextItem]:
+    """
+    Context items for news.
+
+    Args:
+        rows: News rows with title, summary or content, publish_time and
+            optional sentiment_score and view_count
+        as_of: Time recency is measured from
+
+    Returns:
+        Items scored by recency, sentiment strength and readership
+    """
+    items = []
+    for row in rows:
+        snippet = normalize_text(row.get("summary") or row.get("content") or "")
+        if len(snippet) > _NEWS_SNIPPET_CHARS:
+            snippet = snippet[:_NEWS_SNIPPET_CHARS] + "…"
+        text = f"{row.get('title')}：{snippet}" if snippet else str(row.get("title"))
+
+        age_hours = 0.0
+        if isinstance(row.get("publish_time"), datetime):
+            age_hours = max(0.0, (as_of - row["publish_time"]).total_seconds() / 3600)
+        recency = 0.5 ** (age_hours / _NEWS_HALF_LIFE_HOURS)
+        sentiment = abs(float(row.get("sentiment_score") or 0))
+        readership = math.log1p(row.get("view_count") or 0) / 10
+        items.append(ContextItem("news", text, recency * (1 + sentiment) * (1 + readership)))
+    return items
+
+
+def pack_context(
+    items: Sequence[ContextItem],
+    budget: int,
+    counter: Optional[TokenCounter] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> str:
+    """
+    Pack the most valuable items into a token budget.
+
+    Items are chosen greedily by weighted score per token, charging each
+    section's header to its first item; the single most valuable item that
+    fits is used instead if it beats the greedy set, which bounds the
+    result at half the best possible value. Chosen items are laid out by
+    section, highest score first.
+
+    Args:
+        items: Candidate items
+        budget: Token budget
+        counter: Token counter, defaults to the shared one
+        weights: Score weight per section, defaults to DEFAULT_WEIGHTS
+
+    Returns:
+        Packed context text
+    """
+    counter = counter or get_token_counter()
+    weights = weights or DEFAULT_WEIGHTS
+    header_cost = {kind: counter.count(header) + 1 for kind, header in SECTIONS.items()}
+
+    def value(item: ContextItem) -> float:
+        return item.score * weights.get(item.kind, 1.0)
+
+    def cost(item: ContextItem) -> int:
+        return counter.count(item.text) + 1
+
+    candidates = [item for item in items if item.kind in SECTIONS and value(item) > 0]
+    ranked = sorted(
+        candidates,
+        key=lambda item: value(item) / (cost(item) + header_cost[item.kind]),
+        reverse=True,
+    )
+
+    chosen: List[ContextItem] = []
+    opened = set()
+    used = 0
+    for item in ranked:
+        needed = cost(item) + (0 if item.kind in opened else header_cost[item.kind])
+        if used + needed <= budget:
+            chosen.append(item)
+            opened.add(item.kind)
+            used += needed
+
+    fitting = [item for item in candidates if cost(item) + header_cost[item.kind] <= budget]
+    if fitting:
+        best = max(fitting, key=value)
+        if value(best) > sum(value(item) for item in chosen):
+            chosen = [best]
+
+    logger.debug(f"Packed {len(chosen)}/{len(items)} context items into {budget} tokens")
+
+    sections = []
+    for kind, header in SECTIONS.items():
+        lines = [item.text for item in sorted(chosen, key=value, reverse=True) if item.kind == kind]
+        if lines:
+            sections.append("\n".join([header, *lines]))
+    return "\n\n".join(sections)
@@ -0,0 +1,384 @@
+"""
+OpenAI-compatible LLM provider clients with rate limiting and latency tracking.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+from app.utils.logger import logger
+
+# 4xx statuses worth retrying elsewhere; any other 4xx is an error in the request itself
+RETRYABLE_CLIENT_STATUS = frozenset({408, 429})
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """
+    Whether a failed request may succeed on another provider.
+
+    Timeouts, rate limits and 5xx responses fail over and count toward a
+    provider cooldown; other 4xx responses would fail the same way anywhere.
+
+    Args:
+        status_code: HTTP status of the failed response
+
+    Returns:
+        True if the request should fail over
+    """
+    return status_code >= 500 or status_code in RETRYABLE_CLIENT_STATUS
+
+
+class LLMError(Exception):
+    """Raised when no provider could complete a request."""
+
+
+class ProviderError(Exception):
+    """A single provider request failed."""
+
+    def __init__(self, provider: str, message: str, retryable: bool = True):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.retryable = retryable
+
+
+@dataclass
+class LLMResponse:
+    """Completed chat generation."""
+
+    content: str
+    provider: str
+    model: str
+    latency: float
+    usage: Dict[str, Any] = field(default_factory=dict)
+    hedged: bool = False
+
+
+@dataclass
+class ProviderConfig:
+    """Connection and limit settings for one provider."""
+
+    name: str
+    base_url: str
+    model: str
+    api_key: Optional[str] = None
+    requests_per_minute: int = 60
+    max_concurrency: int = 16
+
+
+class TokenBucket:
+    """Request-rate limiter; owned by a single event loop."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate_per_second: Refill rate
+            capacity: Burst size
+        """
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """
+        Seconds until a token is available.
+
+        Returns:
+            Expected wait, 0 if a token is available now
+        """
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Take one token, sleeping until it is available."""
+        while True:
+            wait = self.wait_time()
+            if wait == 0:
+                self.tokens -= 1
+                return
+            await asyncio.sleep(wait)
+
+
+class LatencyTracker:
+    """Rolling window of request latencies."""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.ewma: Optional[float] = None
+
+    def record(self, latency: float) -> None:
+        self.samples.append(latency)
+        self.ewma = latency if self.ewma is None else 0.8 * self.ewma + 0.2 * latency
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Latency percentile over the window.
+
+        Args:
+            q: Percentile in [0, 1]
+
+        Returns:
+            Latency in seconds, or None with fewer than 20 samples
+        """
+        if len(self.samples) < 20:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Provider:
+    """
+    One OpenAI-compatible chat endpoint.
+
+    Holds a pooled HTTP/2 client, a token bucket and a concurrency limit,
+    plus the latency and failure history the router ranks providers by.
+    """
+
+    def __init__(self, config: ProviderConfig):
+        """
+        Initialize the provider.
+
+        Args:
+            config: Provider settings
+        """
+        self.config = config
+        self.name = config.name
+        self.model = config.model
+        headers = {"Authorization": f"Bearer {config.api_key}"} if config.api_key else {}
+        self.client = httpx.AsyncClient(
+            base_url=config.base_url,
+            headers=headers,
+            http2=True,
+            timeout=httpx.Timeout(settings.llm_request_timeout_seconds, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=config.max_concurrency,
+                max_keepalive_connections=config.max_concurrency,
+            ),
+        )
+        self.bucket = TokenBucket(
+            config.requests_per_minute / 60,
+            max(1, config.requests_per_minute // 10),
+        )
+        self.semaphore = asyncio.Semaphore(config.max_concurrency)
+        self.latency = LatencyTracker()
+        self.inflight = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Whether the provider is outside a failure cooldown."""
+        return time.monotonic() >= self.cooldown_until
+
+    def expected_latency(self) -> float:
+        """
+        Estimated time to complete a request sent now.
+
+        Returns:
+            Seconds, combining recent latency, rate-limit wait and load
+        """
+        base = self.latency.ewma if self.latency.ewma is not None else 1.0
+        load = self.inflight / self.config.max_concurrency
+        return base * (1 + load) + self.bucket.wait_time()
+
+    def hedge_delay(self) -> float:
+        """
+        How long to wait on this provider before hedging.
+
+        Returns:
+            p95 latency, floored at llm_hedge_min_delay_ms
+        """
+        floor = settings.llm_hedge_min_delay_ms / 1000
+        p95 = self.latency.percentile(0.95)
+        return max(floor, p95) if p95 is not None else max(floor, 10.0)
+
+    def _payload(self, messages: List[Dict[str, str]], **params: Any) -> Dict[str, Any]:
+        payload = {"model": self.model, "messages": messages}
+        payload.update({key: value for key, value in params.items() if value is not None})
+        return payload
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> LLMResponse:
+        """
+        Run one chat completion.
+
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+
+        Returns:
+            Completed response
+
+        Raises:
+            ProviderError: If the request fails
+        """
+        await self.bucket.acquire()
+        async with self.semaphore:
+            self.inflight += 1
+            started = time.monotonic()
+            try:
+                response = await self.client.post(
+                    "/chat/completions",
+                    json=self._payload(messages, temperature=temperature, max_tokens=max_tokens),
+                )
+                if response.status_code >= 400:
+                    raise ProviderError(
+                        self.name,
+                        f"HTTP {response.status_code}: {response.text[:200]}",
+                        retryable=is_retryable_status(response.status_code),
+                    )
+                body = response.json()
+                content = body["choices"][0]["message"]["content"] or ""
+            except ProviderError as e:
+                self._record_failure(e.retryable)
+                raise
+            except (httpx.HTTPError, KeyError, IndexError, ValueError) as e:
+                self._record_failure(True)
+                raise ProviderError(self.name, f"{type(e).__name__}: {e}") from e
+            finally:
+                self.inflight -= 1
+
+        latency = time.monotonic() - started
+        self.latency.record(latency)
+        self.failures = 0
+        return LLMResponse(
+            content=content,
+            provider=self.name,
+            model=body.get("model", self.model),
+            latency=latency,
+            usage=body.get("usage") or {},
+        )
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion as content deltas.
+
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+
+        Yields:
+            Content fragments as they arrive
+
+        Raises:
+            ProviderError: If the request fails before any content is produced
+        """
+        await self.bucket.acquire()
+        async with self.semaphore:
+            self.inflight += 1
+            started = time.monotonic()
+            try:
+                payload = self._payload(
+                    messages, temperature=temperature, max_tokens=max_tokens, stream=True
+                )
+                async with self.client.stream("POST", "/chat/completions", json=payload) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        raise ProviderError(
+                            self.name,
+                            f"HTTP {response.status_code}: {response.text[:200]}",
+                            retryable=is_retryable_status(response.status_code),
+                        )
+                    async for delta in _iter_sse_deltas(response):
+                        yield delta
+            except ProviderError as e:
+                self._record_failure(e.retryable)
+                raise
+            except httpx.HTTPError as e:
+                self._record_failure(True)
+                raise ProviderError(self.name, f"{type(e).__name__}: {e}") from e
+            finally:
+                self.inflight -= 1
+
+        self.latency.record(time.monotonic() - started)
+        self.failures = 0
+
+    def _record_failure(self, retryable: bool) -> None:
+        if not retryable:
+            return
+        self.failures += 1
+        if self.failures >= 3:
+            self.cooldown_until = time.monotonic() + settings.llm_failure_cooldown_seconds
+            logger.warning(
+                f"LLM provider {self.name} cooling down after {self.failures} failures"
+            )
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.client.aclose()
+
+
+async def _iter_sse_deltas(response: httpx.Response) -> AsyncIterator[str]:
+    """Content deltas from an OpenAI-style server-sent event stream."""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+        except (ValueError, KeyError, IndexError):
+            continue
+        if delta:
+            yield delta
+
+
+def configured_providers() -> List[ProviderConfig]:
+    """
+    Provider configs for every provider enabled in settings.
+
+    Returns:
+        Provider configs in settings order
+    """
+    configs = []
+    if settings.deepseek_api_key:
+        configs.append(ProviderConfig(
+            name="deepseek",
+            base_url=settings.deepseek_base_url,
+            model=settings.deepseek_model,
+            api_key=settings.deepseek_api_key,
+            requests_per_minute=settings.deepseek_rpm,
+            max_concurrency=settings.llm_max_concurrency,
+        ))
+    if settings.qwen_api_key:
+        configs.append(ProviderConfig(
+            name="qwen",
+            base_url=settings.qwen_base_url,
+            model=settings.qwen_model,
+            api_key=settings.qwen_api_key,
+            requests_per_minute=settings.qwen_rpm,
+            max_concurrency=settings.llm_max_concurrency,
+        ))
+    if settings.local_model_enabled:
+        configs.append(ProviderConfig(
+            name="local",
+            base_url=settings.local_model_base_url,
+            model=settings.local_model_name,
+            requests_per_minute=settings.local_model_rpm,
+            max_concurrency=settings.llm_max_concurrency,
+        ))
+    return configs
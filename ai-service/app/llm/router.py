@@ -0,0 +1,318 @@
+"""
+Latency-aware LLM router with hedged requests and failover.
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
+
+from app.config import settings
+from app.llm.cache import get_response_cache
+from app.llm.providers import (
+    LLMError,
+    LLMResponse,
+    Provider,
+    ProviderConfig,
+    ProviderError,
+    configured_providers,
+)
+from app.runtime import runtime
+from app.utils.logger import logger
+
+# Namespace for cached responses: failover means any provider may have answered
+ROUTER_MODEL = "router"
+
+
+class LLMRouter:
+    """
+    Routes chat requests across providers.
+
+    Providers are ranked by expected latency (recent latency scaled by load,
+    plus any rate-limit wait). The best one is tried first; if it has not
+    answered within its p95 latency, a hedged copy goes to the next provider
+    and the first success wins. Timeouts, rate limits, 5xx responses and
+    transport errors fail over to the next provider, and a provider that
+    keeps failing sits out a cooldown. Any other 4xx means the request
+    itself is invalid and fails at once.
+
+    A router and its HTTP clients belong to the event loop they were created
+    on; use ``get_router()`` to get the one for the running loop.
+    """
+
+    def __init__(self, configs: Optional[Sequence[ProviderConfig]] = None):
+        """
+        Initialize the router.
+
+        Args:
+            configs: Provider configs, defaults to those enabled in settings
+        """
+        self.providers: Dict[str, Provider] = {
+            config.name: Provider(config)
+            for config in (configs if configs is not None else configured_providers())
+        }
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0}
+
+    def ranked(self, names: Optional[Sequence[str]] = None) -> List[Provider]:
+        """
+        Available providers, fastest expected first.
+
+        Args:
+            names: Restrict to these provider names
+
+        Returns:
+            Providers in routing order
+        """
+        candidates = [
+            provider
+            for name, provider in self.providers.items()
+            if (names is None or name in names) and provider.available
+        ]
+        if not candidates and names is None:
+            # Everything is cooling down; trying beats failing outright
+            candidates = list(self.providers.values())
+        return sorted(candidates, key=lambda provider: provider.expected_latency())
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        providers: Optional[Sequence[str]] = None,
+        hedge: Optional[bool] = None,
+    ) -> LLMResponse:
+        """
+        Complete a chat request on the best available provider.
+
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            providers: Restrict routing to these provider names
+            hedge: Override settings.llm_hedge_enabled
+
+        Returns:
+            First successful response
+
+        Raises:
+            LLMError: If every candidate provider failed, or one rejected the request
+        """
+        queue = self.ranked(providers)
+        if not queue:
+            raise LLMError("No LLM provider configured")
+        hedge = settings.llm_hedge_enabled if hedge is None else hedge
+        self.stats["requests"] += 1
+
+        pending: Set[asyncio.Task] = set()
+        owners: Dict[asyncio.Task, Provider] = {}
+        started: Dict[asyncio.Task, float] = {}
+        errors: List[str] = []
+        hedged = False
+
+        def launch() -> asyncio.Task:
+            provider = queue.pop(0)
+            task = asyncio.create_task(provider.complete(messages, temperature, max_tokens))
+            pending.add(task)
+            owners[task] = provider
+            started[task] = time.monotonic()
+            return task
+
+        primary = launch()
+        try:
+            while pending:
+                timeout = None
+                if hedge and not hedged and queue and pending == {primary}:
+                    elapsed = time.monotonic() - started[primary]
+                    timeout = max(0.0, owners[primary].hedge_delay() - elapsed)
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    self.stats["hedged"] += 1
+                    logger.info(
+                        f"Hedging slow {owners[primary].name} request "
+                        f"to {queue[0].name}"
+                    )
+                    launch()
+                    continue
+
+                for task in done:
+                    pending.discard(task)
+                    error = task.exception()
+                    if error is None:
+                        response = task.result()
+                        response.hedged = hedged
+                        if hedged and task is not primary:
+                            self.stats["hedge_wins"] += 1
+                        return response
+                    if isinstance(error, ProviderError) and not error.retryable:
+                        raise LLMError(f"LLM request rejected: {error}") from error
+                    errors.append(str(error))
+                    logger.warning(f"LLM request failed: {error}")
+
+                if not pending and queue:
+                    self.stats["failovers"] += 1
+                    primary = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise LLMError(f"All LLM providers failed: {'; '.join(errors)}")
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        providers: Optional[Sequence[str]] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from the best available provider.
+
+        Failover happens only before the first token; once content has been
+        relayed, an error ends the stream.
+
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            providers: Restrict routing to these provider names
+            meta: Filled with the serving provider and model
+
+        Yields:
+            Content fragments as they arrive
+
+        Raises:
+            LLMError: If every candidate provider failed before streaming, or
+                one rejected the request
+        """
+        queue = self.ranked(providers)
+        if not queue:
+            raise LLMError("No LLM provider configured")
+        self.stats["requests"] += 1
+
+        errors: List[str] = []
+        for attempt, provider in enumerate(queue):
+            if attempt:
+                self.stats["failovers"] += 1
+            started = False
+            try:
+                async for delta in provider.stream(messages, temperature, max_tokens):
+                    if not started:
+                        started = True
+                        if meta is not None:
+                            meta.update(provider=provider.name, model=provider.model)
+                    yield delta
+                return
+            except ProviderError as e:
+                if started:
+                    raise
+                if not e.retryable:
+                    raise LLMError(f"LLM request rejected: {e}") from e
+                errors.append(str(e))
+                logger.warning(f"LLM stream failed before first token: {e}")
+
+        raise LLMError(f"All LLM providers failed: {'; '.join(errors)}")
+
+    async def aclose(self) -> None:
+        """Close every provider's connections."""
+        await asyncio.gather(*(provider.aclose() for provider in self.providers.values()))
+
+
+_routers: Dict[asyncio.AbstractEventLoop, LLMRouter] = {}
+
+
+def get_router() -> LLMRouter:
+    """
+    Get the router bound to the running event loop.
+
+    Returns:
+        Shared LLMRouter for this loop
+    """
+    loop = asyncio.get_running_loop()
+    router = _routers.get(loop)
+    if router is None:
+        router = _routers[loop] = LLMRouter()
+        logger.info(f"LLM router initialized with providers: {list(router.providers)}")
+    return router
+
+
+async def close_router() -> None:
+    """Close the router bound to the running event loop, if any."""
+    router = _routers.pop(asyncio.get_running_loop(), None)
+    if router is not None:
+        await router.aclose()
+
+
+def build_messages(prompt: str, system: Optional[str] = None) -> List[Dict[str, str]]:
+    """
+    Build chat messages from a prompt.
+
+    Args:
+        prompt: User prompt
+        system: Optional system prompt
+
+    Returns:
+        Chat messages
+    """
+    messages = [{"role": "system", "content": system}] if system else []
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+async def _complete(
+    messages: List[Dict[str, str]],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+) -> LLMResponse:
+    return await get_router().complete(messages, temperature, max_tokens)
+
+
+def generate_text(
+    prompt: str,
+    system: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+    semantic: bool = True,
+) -> str:
+    """
+    Generate text from synchronous code through the shared router and cache.
+
+    Args:
+        prompt: User prompt
+        system: Optional system prompt
+        temperature: Sampling temperature, defaults to settings.default_temperature
+        max_tokens: Completion limit, defaults to settings.default_max_tokens
+        use_cache: Whether to read and write the response cache
+        semantic: Whether near-duplicate cached prompts may be served
+
+    Returns:
+        Generated text
+
+    Raises:
+        LLMError: If every provider failed
+    """
+    temperature = settings.default_temperature if temperature is None else temperature
+    max_tokens = max_tokens or settings.default_max_tokens
+    messages = build_messages(prompt, system)
+
+    def generate() -> str:
+        response = runtime.run(_complete(messages, temperature, max_tokens))
+        logger.info(
+            f"LLM response from {response.provider} in {response.latency:.2f}s"
+            + (" (hedged)" if response.hedged else "")
+        )
+        return response.content
+
+    if not use_cache:
+        return generate()
+
+    cache_key = f"{system}\n\n{prompt}" if system else prompt
+    content, hit = get_response_cache().get_or_generate(
+        cache_key, ROUTER_MODEL, temperature, generate, semantic=semantic
+    )
+    if hit is not None:
+        logger.info(f"LLM response served from {hit.tier} cache (similarity {hit.similarity:.3f})")
+    return content
@@ -0,0 +1,384 @@
+"""
+Compiled prompt template registry with versioned hot reload.
+
+Templates use ``{{ variable }}`` placeholders; any other braces are literal
+text, so prompts can contain JSON examples unescaped. Each template is
+parsed once into a ``str.format_map`` pattern, so rendering is a single
+C-level call.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+import redis
+
+from app.config import settings
+from app.utils.logger import logger
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+TEMPLATES_KEY = "prompt:templates"
+TEMPLATES_VERSION_KEY = "prompt:templates:version"
+
+# Old versions kept per template for inspection and rollback
+_HISTORY_SIZE = 5
+
+
+class TemplateError(ValueError):
+    """Raised when a template is invalid or rendered with missing variables."""
+
+
+def template_hash(template: str, variables: Iterable[str]) -> str:
+    """
+    Content hash identifying a template version.
+
+    Args:
+        template: Template text
+        variables: Declared variables
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps([template, sorted(variables)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A parsed, validated template ready to render."""
+
+    name: str
+    template: str
+    variables: FrozenSet[str]
+    hash: str
+    version: str = "1.0"
+    category: Optional[str] = None
+    loaded_at: float = field(default_factory=time.time)
+    _pattern: str = field(default="", repr=False)
+
+    def render(self, **values: Any) -> str:
+        """
+        Render with the given variable values.
+
+        Args:
+            **values: Variable values; extra keys are ignored
+
+        Returns:
+            Rendered prompt
+
+        Raises:
+            TemplateError: If a variable is missing
+        """
+        try:
+            return self._pattern.format_map(values)
+        except KeyError as e:
+            raise TemplateError(f"Template {self.name} missing variable {e.args[0]}") from None
+
+
+def compile_template(
+    name: str,
+    template: str,
+    variables: Optional[Iterable[str]] = None,
+    version: str = "1.0",
+    category: Optional[str] = None,
+) -> CompiledTemplate:
+    """
+    Parse and validate a template.
+
+    Args:
+        name: Template name
+        template: Template text with ``{{ variable }}`` placeholders
+        variables: Declared variables; defaults to the placeholders found
+        version: Version label
+        category: Template category
+
+    Returns:
+        Compiled template
+
+    Raises:
+        TemplateError: If declared variables and placeholders disagree
+    """
+    parts: List[str] = []
+    found = set()
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(template):
+        literal = template[position : match.start()]
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        parts.append("{" + match.group(1) + "}")
+        found.add(match.group(1))
+        position = match.end()
+    parts.append(template[position:].replace("{", "{{").replace("}", "}}"))
+
+    declared = set(variables) if variables is not None else found
+    if declared != found:
+        problems = []
+        if found - declared:
+            problems.append(f"undeclared {sorted(found - declared)}")
+        if declared - found:
+            problems.append(f"unused {sorted(declared - found)}")
+        raise TemplateError(f"Template {name} variables invalid: {', '.join(problems)}")
+
+    return CompiledTemplate(
+        name=name,
+        template=template,
+        variables=frozenset(found),
+        hash=template_hash(template, found),
+        version=version,
+        category=category,
+        _pattern="".join(parts),
+    )
+
+
+class TemplateRegistry:
+    """
+    In-memory registry of compiled templates.
+
+    Lookups read an immutable dict that is replaced wholesale on change,
+    so readers never see a half-applied sync. Synced templates are
+    published to Redis with a version counter; each process checks the
+    counter at most every ``prompt_template_refresh_seconds`` and reloads
+    only when it moved.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            client: Redis client for cross-process reloads, defaults to settings.redis_url
+        """
+        self._client = client
+        self._templates: Mapping[str, CompiledTemplate] = {}
+        self._history: Dict[str, Deque[CompiledTemplate]] = {}
+        self._lock = threading.Lock()
+        self._published_version: Optional[int] = None
+        self._checked_at = 0.0
+
+    @property
+    def client(self) -> redis.Redis:
+        """Redis client, created on first use."""
+        if self._client is None:
+            self._client = redis.from_url(settings.redis_url, decode_responses=True)
+        return self._client
+
+    def names(self) -> List[str]:
+        """
+        Registered template names.
+
+        Returns:
+            Sorted names
+        """
+        return sorted(self._templates)
+
+    def get(self, name: str) -> CompiledTemplate:
+        """
+        Current version of a template.
+
+        Args:
+            name: Template name
+
+        Returns:
+            Compiled template
+
+        Raises:
+            KeyError: If no template has that name
+        """
+        self._maybe_refresh()
+        return self._templates[name]
+
+    def render(self, name: str, **values: Any) -> str:
+        """
+        Render a template by name.
+
+        Args:
+            name: Template name
+            **values: Variable values
+
+        Returns:
+            Rendered prompt
+        """
+        return self.get(name).render(**values)
+
+    def history(self, name: str) -> List[CompiledTemplate]:
+        """
+        Previous versions of a template, oldest first.
+
+        Args:
+            name: Template name
+
+        Returns:
+            Replaced versions kept in memory
+        """
+        return list(self._history.get(name, ()))
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Compile template records and swap in any that changed.
+
+        Records whose hash matches the loaded version are skipped without
+        recompiling. Invalid records are logged and leave the current
+        version in place.
+
+        Args:
+            records: Records with name, template and optional variables,
+                version and category
+
+        Returns:
+            Counts of added, updated, unchanged and failed templates
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        with self._lock:
+            current = self._templates
+            changed: Dict[str, CompiledTemplate] = {}
+            for record in records:
+                name = record["name"]
+                variables = record.get("variables")
+                declared = (
+                    set(variables)
+                    if variables is not None
+                    else set(PLACEHOLDER_PATTERN.findall(record["template"]))
+                )
+                digest = template_hash(record["template"], declared)
+                existing = current.get(name)
+                if existing is not None and existing.hash == digest:
+                    stats["unchanged"] += 1
+                    continue
+                try:
+                    changed[name] = compile_template(
+                        name,
+                        record["template"],
+                        variables,
+                        version=str(record.get("version") or "1.0"),
+                        category=record.get("category"),
+                    )
+                except TemplateError as e:
+                    logger.error(str(e))
+                    stats["failed"] += 1
+                    continue
+                stats["updated" if existing is not None else "added"] += 1
+                if existing is not None:
+                    self._history.setdefault(name, deque(maxlen=_HISTORY_SIZE)).append(existing)
+
+            if changed:
+                self._templates = {**current, **changed}
+                logger.info(f"Prompt templates swapped in: {sorted(changed)}")
+        return stats
+
+    def publish(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Share template records with every process through Redis.
+
+        The published set replaces the previous one, so deactivated
+        templates stop reaching processes that start later.
+
+        Args:
+            records: Template records, as accepted by load()
+
+        Returns:
+            New published version number
+        """
+        pipe = self.client.pipeline()
+        pipe.delete(TEMPLATES_KEY)
+        for record in records:
+            pipe.hset(
+                TEMPLATES_KEY, record["name"], json.dumps(record, ensure_ascii=False, default=str)
+            )
+        pipe.incr(TEMPLATES_VERSION_KEY)
+        version = pipe.execute()[-1]
+        self._published_version = version
+        return version
+
+    def refresh(self) -> bool:
+        """
+        Reload published templates if their version moved.
+
+        Returns:
+            True if templates were reloaded
+        """
+        self._checked_at = time.monotonic()
+        raw_version = self.client.get(TEMPLATES_VERSION_KEY)
+        version = int(raw_version) if raw_version else None
+        if version is None or version == self._published_version:
+            return False
+        records = [json.loads(raw) for raw in self.client.hgetall(TEMPLATES_KEY).values()]
+        self.load(records)
+        self._published_version = version
+        return True
+
+    def _maybe_refresh(self) -> None:
+        if time.monotonic() - self._checked_at < settings.prompt_template_refresh_seconds:
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving the templates already loaded
+            logger.warning(f"Prompt template refresh failed: {e}")
+
+
+DEFAULT_TEMPLATES: List[Dict[str, Any]] = [
+    {
+        "name": "news_article_system",
+        "category": "news_generation",
+        "template": "你是一名专业的财经编辑，负责把快讯扩写为客观、准确的新闻稿。",
+    },
+    {
+        "name": "news_article",
+        "category": "news_generation",
+        "template": (
+            "请根据以下快讯撰写一篇新闻稿，包含标题和正文，不要编造快讯中没有的数据。\n\n"
+            "标题：{{ title }}\n来源：{{ source }}\n内容：{{ content }}"
+        ),
+        "variables": ["title", "source", "content"],
+    },
+    {
+        "name": "daily_report_system",
+        "category": "report_generation",
+        "template": "你是一名资深投资研究员，只依据提供的数据撰写客观的每日投资报告，并给出风险提示。",
+    },
+    {
+        "name": "daily_report",
+        "category": "report_generation",
+        "template": (
+            "请根据以下 {{ report_date }} 的市场数据、因子亮点和要闻，撰写当日投资报告，"
+            "包含市场综述、市场分析、关注标的和风险提示。\n\n{{ context }}"
+        ),
+        "variables": ["report_date", "context"],
+    },
+    {
+        "name": "strategy_code_system",
+        "category": "strategy_generation",
+        "template": "You are a quantitative developer. Reply with a single Python code block.",
+    },
+    {
+        "name": "strategy_code",
+        "category": "strategy_generation",
+        "template": (
+            "Write a complete {{ framework }} strategy implementing the description below.\n\n"
+            "{{ description }}"
+        ),
+        "variables": ["framework", "description"],
+    },
+]
+
+_registry: Optional[TemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    """
+    Get the process-wide template registry, seeded with the built-in templates.
+
+    Returns:
+        Shared TemplateRegistry instance
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = TemplateRegistry()
+            _registry.load(DEFAULT_TEMPLATES)
+        return _registry
@@ -7,14 +7,16 @@ middleware, and startup/shutdown events.
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-import redis
 from fastapi import FastAPI, status
 from fastapi.responses import JSONResponse
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
 
+from app.api import generate_router
 from app.config import settings
+from app.llm import close_router
+from app.utils.db import data_access
+from app.utils.health import health_monitor, postgres_check, redis_check
 from app.utils.logger import logger
+from app.vector import LocalVectorStore, close_vector_store, get_vector_store
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -25,10 +27,11 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+app.include_router(generate_router)
+
 # Global connection objects (initialized on startup)
-redis_client: Optional[redis.Redis] = None
-postgres_engine: Optional[Engine] = None
 milvus_connected: bool = False
+vector_store: Optional[LocalVectorStore] = None
 
 
 @app.on_event("startup")
@@ -36,38 +39,11 @@ async def startup_event() -> None:
     """
     Initialize connections and resources on application startup.
     """
-    global redis_client, postgres_engine, milvus_connected
+    global milvus_connected, vector_store
     
     logger.info(f"Starting {settings.service_name} v{settings.service_version}")
     
-    try:
-        # Initialize Redis connection
-        redis_client = redis.from_url(
-            settings.redis_url,
-            decode_responses=True,
-            socket_connect_timeout=5,
-        )
-        redis_client.ping()
-        logger.info("Redis connection established")
-    except Exception as e:
-        logger.warning(f"Redis connection failed: {e}")
-        redis_client = None
-    
-    try:
-        # Initialize PostgreSQL connection
-        postgres_engine = create_engine(
-            settings.postgres_url,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
-        )
-        # Test connection
-        with postgres_engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        logger.info("PostgreSQL connection established")
-    except Exception as e:
-        logger.warning(f"PostgreSQL connection failed: {e}")
-        postgres_engine = None
+    await data_access.start()
     
     try:
         # Initialize Milvus connection (optional)
@@ -83,6 +59,50 @@ async def startup_event() -> None:
     except Exception as e:
         logger.warning(f"Milvus connection failed: {e}")
         milvus_connected = False
+    
+    try:
+        # Open the embedded vector index used for retrieval without Milvus
+        vector_store = get_vector_store()
+    except Exception as e:
+        logger.warning(f"Local vector store failed to open: {e}")
+        vector_store = None
+    
+    # Probed in the background from here on; /status serves the cached results
+    health_monitor.register("redis", redis_check(data_access.redis))
+    health_monitor.register("postgresql", postgres_check(data_access.engine))
+    health_monitor.set_static(
+        "milvus",
+        {
+            "status": "healthy" if milvus_connected else "not_configured",
+            "host": settings.milvus_host,
+            "port": settings.milvus_port,
+        },
+    )
+    if vector_store:
+        health_monitor.register("vector_store", _vector_store_check(vector_store), critical=False)
+    else:
+        health_monitor.set_static("vector_store", {"status": "not_configured"})
+    health_monitor.set_static(
+        "llm_providers",
+        {
+            "deepseek": "configured" if settings.deepseek_api_key else "not_configured",
+            "qwen": "configured" if settings.qwen_api_key else "not_configured",
+            "local_model": "enabled" if settings.local_model_enabled else "disabled",
+        },
+    )
+    await health_monitor.start()
+
+
+def _vector_store_check(store: LocalVectorStore):
+    """Collection sizes of the local vector store."""
+
+    def check() -> Dict[str, Any]:
+        return {
+            "path": str(store.path),
+            "collections": {name: store.count(name) for name in store.list_collections()},
+        }
+
+    return check
 
 
 @app.on_event("shutdown")
@@ -92,18 +112,17 @@ async def shutdown_event() -> None:
     """
     logger.info("Shutting down AI service")
     
-    global redis_client, postgres_engine
-    
-    if redis_client:
-        redis_client.close()
-        logger.info("Redis connection closed")
+    await health_monitor.close()
     
-    if postgres_engine:
-        postgres_engine.dispose()
-        logger.info("PostgreSQL connection closed")
+    await data_access.close()
     
     # Close Milvus connection if needed
     # TODO: Add Milvus disconnection logic
+    
+    close_vector_store()
+    logger.info("Local vector store closed")
+    
+    await close_router()
 
 
 @app.get("/health")
@@ -126,71 +145,27 @@ async def status_check() -> JSONResponse:
     """
     Detailed status check endpoint with dependency health.
     
-    Checks the health of:
+    Reports the latest background check results for:
     - Redis connection
     - PostgreSQL connection
     - Milvus connection
+    - Local vector store
     - LLM provider status
     
+    Checks run on an interval in the background, so this endpoint does
+    no I/O and answers instantly however often it is polled.
+    
     Returns:
         Detailed status JSON response
     """
-    global redis_client, postgres_engine, milvus_connected
-    
+    health = health_monitor.snapshot()
     status_info: Dict[str, Any] = {
         "service": settings.service_name,
         "version": settings.service_version,
         "timestamp": datetime.utcnow().isoformat() + "Z",
-        "status": "healthy",
-        "dependencies": {},
-    }
-    
-    # Check Redis
-    redis_status = {"status": "unknown", "error": None}
-    if redis_client:
-        try:
-            redis_client.ping()
-            redis_status["status"] = "healthy"
-        except Exception as e:
-            redis_status["status"] = "unhealthy"
-            redis_status["error"] = str(e)
-            status_info["status"] = "degraded"
-    else:
-        redis_status["status"] = "not_configured"
-    
-    status_info["dependencies"]["redis"] = redis_status
-    
-    # Check PostgreSQL
-    postgres_status = {"status": "unknown", "error": None}
-    if postgres_engine:
-        try:
-            with postgres_engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            postgres_status["status"] = "healthy"
-        except Exception as e:
-            postgres_status["status"] = "unhealthy"
-            postgres_status["error"] = str(e)
-            status_info["status"] = "degraded"
-    else:
-        postgres_status["status"] = "not_configured"
-    
-    status_info["dependencies"]["postgresql"] = postgres_status
-    
-    # Check Milvus
-    milvus_status = {
-        "status": "healthy" if milvus_connected else "not_configured",
-        "host": settings.milvus_host,
-        "port": settings.milvus_port,
-    }
-    status_info["dependencies"]["milvus"] = milvus_status
-    
-    # Check LLM providers
-    llm_status = {
-        "deepseek": "configured" if settings.deepseek_api_key else "not_configured",
-        "qwen": "configured" if settings.qwen_api_key else "not_configured",
-        "local_model": "enabled" if settings.local_model_enabled else "disabled",
+        "status": health["status"],
+        "dependencies": health["dependencies"],
     }
-    status_info["dependencies"]["llm_providers"] = llm_status
     
     # Determine overall HTTP status code
     http_status = status.HTTP_200_OK
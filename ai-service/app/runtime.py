@@ -0,0 +1,108 @@
+"""
+Persistent event loop for synchronous callers such as Celery tasks.
+
+Each process owns one loop running in a background thread. Sync code
+submits coroutines with ``runtime.run(...)``, so async clients (pooled
+HTTP/2 connections, rate limiters) are created once per process and shared
+by every task instead of being rebuilt by ``asyncio.run`` on each call.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.utils.logger import logger
+
+
+class AsyncRuntime:
+    """Background event loop for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop of this process, started on first use."""
+        # A loop inherited through fork has no running thread; start a new one
+        if self._loop is None or self._pid != os.getpid():
+            self.start()
+        return self._loop
+
+    def start(self) -> None:
+        """Start the loop thread for the current process."""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-runtime", daemon=True)
+            thread.start()
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            logger.info(f"Async runtime started in process {self._pid}")
+
+    def stop(self) -> None:
+        """Close the LLM router's HTTP clients, then stop the loop thread."""
+        # Imported here: the router module itself imports this runtime
+        from app.llm.router import close_router
+
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(close_router(), self._loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Closing LLM router clients failed: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = self._thread = None
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """
+        Schedule a coroutine on the runtime loop.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Future for its result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the runtime loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait
+
+        Returns:
+            Coroutine result
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+
+runtime = AsyncRuntime()
+
+
+@worker_process_init.connect
+def _start_runtime(**kwargs: Any) -> None:
+    """Give each prefork child its own loop instead of inheriting the parent's."""
+    runtime.start()
+
+
+@worker_process_shutdown.connect
+def _stop_runtime(**kwargs: Any) -> None:
+    """Stop the loop on worker exit."""
+    runtime.stop()
@@ -4,6 +4,9 @@ Celery application configuration for AI service.
 from celery import Celery
 
 from app.config import settings
+from app.scheduler.payload import SERIALIZER, register_serializer
+
+register_serializer()
 
 # Create Celery instance
 celery_app = Celery(
@@ -18,9 +21,9 @@ celery_app = Celery(
 # Celery configuration
 celery_app.conf.update(
     # Task settings
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=settings.celery_serializer,
+    accept_content=["json", SERIALIZER],
+    result_serializer=settings.celery_serializer,
     timezone="Asia/Shanghai",
     enable_utc=True,
     
@@ -47,6 +50,11 @@ celery_app.conf.update(
             "schedule": {"hour": 16, "minute": 0},  # Daily at 16:00 (after market close)
             "options": {"queue": "ai"},
         },
+        "generate-news-articles-batch": {
+            "task": "app.scheduler.tasks.ai_tasks.generate_news_articles_batch",
+            "schedule": float(settings.llm_batch_window_seconds),
+            "options": {"queue": "ai"},
+        },
         "sync-prompt-templates": {
             "task": "app.scheduler.tasks.ai_tasks.sync_prompt_templates",
             "schedule": 3600.0,  # Every hour
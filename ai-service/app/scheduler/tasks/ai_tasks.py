@@ -1,22 +1,107 @@
 """
 Celery tasks for AI-related operations.
 """
+import re
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
+from sqlalchemy import column, create_engine, insert, table, text
+
+from app.config import settings
 from app.crawler.prompt import PromptTemplateCrawler
 from app.cleaner.content import ContentCleaner
+from app.llm.context import (
+    context_budget,
+    factor_items,
+    get_token_counter,
+    market_items,
+    news_items,
+    pack_context,
+)
+from app.llm.batch import BatchGenerator, BatchQueue, batch_limit
+from app.llm.router import generate_text
+from app.llm.templates import get_template_registry
+from app.runtime import runtime
 from app.scheduler.celery_app import celery_app
 from app.utils.logger import logger
+from app.utils.text import normalize_text
+from app.vector.embedding import get_embedding_service
+
+CODE_BLOCK_PATTERN = re.compile(r"```(?:python)?\s*\n([\s\S]*?)```")
+
+ARTICLES = table("articles", column("id"), column("title"), column("content"), column("author"))
+
+# Flash items waiting for batch article generation
+NEWS_ARTICLE_QUEUE = "news_article"
+
+REPORT_NEWS_SQL = """
+    SELECT title, summary, content, publish_time, sentiment_score, view_count
+    FROM news
+    WHERE status = 'published' AND publish_time >= :start AND publish_time < :end
+"""
+
+
+def _report_news(day: datetime) -> List[Dict[str, Any]]:
+    """News published on the report day."""
+    engine = create_engine(settings.postgres_url)
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                text(REPORT_NEWS_SQL), {"start": day, "end": day + timedelta(days=1)}
+            )
+            return [dict(row._mapping) for row in rows]
+    finally:
+        engine.dispose()
+
+
+def _insert_articles(articles: List[Dict[str, Any]]) -> List[int]:
+    """Insert generated articles in one statement and return their ids."""
+    engine = create_engine(settings.postgres_url)
+    try:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                insert(ARTICLES).returning(ARTICLES.c.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "title": article.get("title") or normalize_text(article["content"])[:50],
+                        "content": article["content"],
+                        "author": "AI",
+                    }
+                    for article in articles
+                ],
+            )
+            return [row.id for row in rows]
+    finally:
+        engine.dispose()
+
+
+def _news_article_prompt(news_data: Dict[str, Any], prompt_template: Optional[str] = None) -> str:
+    return get_template_registry().render(
+        prompt_template or "news_article",
+        title=news_data.get("title", ""),
+        source=news_data.get("source", ""),
+        content=news_data.get("content", ""),
+    )
 
 
 @celery_app.task(name="app.scheduler.tasks.ai_tasks.generate_daily_report")
-def generate_daily_report(report_date: Optional[str] = None) -> Dict[str, Any]:
+def generate_daily_report(
+    report_date: Optional[str] = None,
+    market_data: Optional[List[Dict[str, Any]]] = None,
+    factor_highlights: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
     """
     Generate daily investment report using AI.
     
+    Market quotes, factor highlights and the day's news are ranked and
+    packed into the prompt budget max_generation_length leaves after a
+    default_max_tokens completion, so the prompt carries the most valuable
+    facts rather than everything available.
+    
     Args:
         report_date: Report date (YYYY-MM-DD), defaults to today
+        market_data: Index and instrument quotes (name, close, change_pct, is_index)
+        factor_highlights: Factor outliers (name, factor, value, zscore)
         
     Returns:
         Generation result dictionary
@@ -24,20 +109,43 @@ def generate_daily_report(report_date: Optional[str] = None) -> Dict[str, Any]:
     logger.info(f"Starting daily report generation for date: {report_date}")
     
     try:
-        # TODO: Implement actual report generation
-        # 1. Fetch market data
-        # 2. Generate report using LLM
-        # 3. Clean and validate content
-        # 4. Store in database
+        report_date = report_date or datetime.now().strftime("%Y-%m-%d")
+        day = datetime.strptime(report_date, "%Y-%m-%d")
+        
+        items = market_items(market_data or [])
+        items += factor_items(factor_highlights or [])
+        items += news_items(_report_news(day), as_of=min(datetime.now(), day + timedelta(days=1)))
+        
+        templates = get_template_registry()
+        counter = get_token_counter()
+        system = templates.render("daily_report_system")
+        budget = context_budget(
+            [system, templates.render("daily_report", report_date=report_date, context="")],
+            counter=counter,
+        )
+        context = pack_context(items, budget, counter=counter)
+        prompt = templates.render("daily_report", report_date=report_date, context=context)
+        
+        # The inputs for a date change as news arrives, so only exact prompts hit the cache
+        content = generate_text(prompt, system=system, semantic=False)
+        
+        # TODO: Store in database
         
         result = {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
-            "report_date": report_date or datetime.now().strftime("%Y-%m-%d"),
+            "report_date": report_date,
             "report_id": None,
+            "context_items": len(items),
+            "context_budget": budget,
+            "prompt_tokens": counter.total([system, prompt]),
+            "content": content,
         }
         
-        logger.info(f"Completed daily report generation: {result}")
+        logger.info(
+            f"Completed daily report generation for {report_date}: "
+            f"{result['prompt_tokens']} prompt tokens from {len(items)} candidate items"
+        )
         return result
         
     except Exception as e:
@@ -69,16 +177,25 @@ def generate_news_article(
     try:
         cleaner = ContentCleaner()
         
-        # TODO: Implement actual article generation
-        # 1. Prepare prompt with news data
-        # 2. Call LLM to generate article
-        # 3. Clean generated content
-        # 4. Store in database
+        prompt = _news_article_prompt(news_data, prompt_template)
+        # Near-duplicate flashes from different sources share one generation
+        content = generate_text(
+            prompt, system=get_template_registry().render("news_article_system")
+        )
+        
+        article = cleaner.clean({
+            "type": "article",
+            "title": news_data.get("title"),
+            "content": content,
+        })
+        
+        # TODO: Store in database
         
         result = {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
             "article_id": None,
+            "article": article,
         }
         
         logger.info("Completed news article generation")
@@ -89,6 +206,121 @@ def generate_news_article(
         raise
 
 
+@celery_app.task(name="app.scheduler.tasks.ai_tasks.queue_news_articles")
+def queue_news_articles(news_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Queue flash news for batch article generation.
+    
+    Use instead of one generate_news_article task per item when many items
+    arrive at once; generate_news_articles_batch drains the queue every
+    settings.llm_batch_window_seconds.
+    
+    Args:
+        news_items: Raw news data
+        
+    Returns:
+        Queue result dictionary
+    """
+    try:
+        queued = BatchQueue(NEWS_ARTICLE_QUEUE).push(news_items)
+        logger.info(f"Queued {len(news_items)} news items for batch generation ({queued} pending)")
+        return {
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "queued": len(news_items),
+            "pending": queued,
+        }
+        
+    except Exception as e:
+        logger.error(f"Error queueing news articles: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+
+@celery_app.task(name="app.scheduler.tasks.ai_tasks.generate_news_articles_batch")
+def generate_news_articles_batch() -> Dict[str, Any]:
+    """
+    Generate articles for queued flash news in grouped requests.
+    
+    Takes as many items as the batch share of the providers' rate limits
+    allows for one window, packs several into each request and inserts the
+    results in one statement. Items a group response dropped are queued
+    again, and generated alone with generate_news_article once they reach
+    settings.llm_batch_max_attempts. Items stay claimed in Redis until
+    they are handled, so a failed or crashed run does not lose them.
+    
+    Returns:
+        Generation result dictionary
+    """
+    try:
+        queue = BatchQueue(NEWS_ARTICLE_QUEUE)
+        claim = queue.claim(batch_limit())
+        items = claim.items
+        if not items:
+            return {
+                "status": "success",
+                "timestamp": datetime.now().isoformat(),
+                "processed": 0,
+            }
+        logger.info(f"Generating {len(items)} news articles in batch mode")
+        
+        try:
+            prompts = [_news_article_prompt(item) for item in items]
+            system = get_template_registry().render("news_article_system")
+            responses = BatchGenerator().generate(prompts, system=system)
+            
+            cleaner = ContentCleaner()
+            articles = []
+            retry, fallback = [], []
+            for item, content in zip(items, responses):
+                if content is not None:
+                    articles.append(cleaner.clean({
+                        "type": "article",
+                        "title": item.get("title"),
+                        "content": content,
+                    }))
+                    continue
+                attempts = item.get("_attempts", 0) + 1
+                if attempts < settings.llm_batch_max_attempts:
+                    retry.append({**item, "_attempts": attempts})
+                else:
+                    fallback.append({k: v for k, v in item.items() if k != "_attempts"})
+            
+            article_ids = _insert_articles(articles) if articles else []
+        except Exception:
+            # Nothing was stored; leave the items for the next window
+            queue.release(claim)
+            raise
+        
+        for item in fallback:
+            generate_news_article.delay(item)
+        queue.ack(claim, requeue=retry)
+        
+        result = {
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "processed": len(items),
+            "generated": len(articles),
+            "requeued": len(retry),
+            "fallback": len(fallback),
+            "article_ids": article_ids,
+        }
+        
+        logger.info(f"Completed batch news article generation: {result}")
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error generating news articles in batch: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+
 @celery_app.task(name="app.scheduler.tasks.ai_tasks.generate_strategy_code")
 def generate_strategy_code(
     strategy_description: str,
@@ -107,17 +339,27 @@ def generate_strategy_code(
     logger.info(f"Generating strategy code for framework: {framework}")
     
     try:
-        # TODO: Implement actual strategy code generation
-        # 1. Prepare prompt with strategy description
-        # 2. Call LLM to generate code
-        # 3. Validate and clean code
-        # 4. Return generated code
+        templates = get_template_registry()
+        prompt = templates.render(
+            "strategy_code",
+            framework=framework,
+            description=strategy_description,
+        )
+        # Small wording changes can change parameters, so only exact prompts hit the cache
+        response = generate_text(
+            prompt,
+            system=templates.render("strategy_code_system"),
+            temperature=0.2,
+            semantic=False,
+        )
+        match = CODE_BLOCK_PATTERN.search(response)
+        code = (match.group(1) if match else response).strip()
         
         result = {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
             "framework": framework,
-            "code": "",
+            "code": code,
         }
         
         logger.info("Completed strategy code generation")
@@ -133,6 +375,9 @@ def sync_prompt_templates(source: Optional[str] = None) -> Dict[str, Any]:
     """
     Synchronize prompt templates from external sources.
     
+    Templates are compiled into this process's registry and published so
+    every other process hot-swaps the ones whose hash changed.
+    
     Args:
         source: Source identifier
         
@@ -143,17 +388,19 @@ def sync_prompt_templates(source: Optional[str] = None) -> Dict[str, Any]:
     
     try:
         crawler = PromptTemplateCrawler()
+        records = runtime.run(crawler.crawl(source=source))
         
-        # TODO: Implement actual template synchronization
-        # 1. Fetch templates from source
-        # 2. Validate templates
-        # 3. Store/update in database
+        registry = get_template_registry()
+        stats = registry.load(records)
+        if records:
+            registry.publish(records)
         
         result = {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
             "source": source,
-            "templates_synced": 0,
+            "templates_synced": len(records),
+            **stats,
         }
         
         logger.info(f"Completed prompt template sync: {result}")
@@ -237,3 +484,44 @@ def clean_content(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         logger.error(f"Error cleaning content: {e}", exc_info=True)
         raise
 
+
+@celery_app.task(name="app.scheduler.tasks.ai_tasks.embed_texts")
+def embed_texts(texts: List[str]) -> Dict[str, Any]:
+    """
+    Embed texts into the shared embedding cache.
+    
+    Texts already embedded with the current model are served from the cache,
+    so re-running this for reprocessed content costs no model calls.
+    
+    Args:
+        texts: Texts to embed
+        
+    Returns:
+        Embedding result dictionary with cache statistics
+    """
+    logger.info(f"Embedding {len(texts)} texts")
+    
+    try:
+        service = get_embedding_service()
+        computed_before = service.stats["computed"]
+        vectors = service.embed_sync(texts)
+        computed = service.stats["computed"] - computed_before
+        
+        result = {
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "embedded": len(vectors),
+            "computed": computed,
+            "cached": len(vectors) - computed,
+        }
+        
+        logger.info(f"Completed embedding: {result}")
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error embedding texts: {e}", exc_info=True)
+        return {
+            "status": "error",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat(),
+        }
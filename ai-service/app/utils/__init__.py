@@ -1,7 +1,10 @@
 """
 Utility modules for AI service.
 """
+from app.utils.db import DataAccess, data_access
+from app.utils.health import HealthMonitor, health_monitor
 from app.utils.logger import logger, setup_logger
+from app.utils.text import TextNormalizer, normalize_text
 
-__all__ = ["logger", "setup_logger"]
+__all__ = ["logger", "setup_logger", "DataAccess", "data_access", "HealthMonitor", "health_monitor", "normalize_text", "TextNormalizer"]
 
@@ -0,0 +1,187 @@
+"""
+Dependency health checks run in the background and served from a cache.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+import redis.asyncio as aioredis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+from app.utils.logger import logger
+
+# A check returns optional details and raises when the dependency is unhealthy
+Check = Callable[[], Union[Optional[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]]
+
+
+class HealthMonitor:
+    """
+    Probes dependencies on an interval and caches the results.
+
+    Blocking checks run in worker threads and every check has a timeout,
+    so a slow dependency never stalls the event loop or the other checks.
+    A check still running from the previous round is not started again.
+    ``snapshot()`` does no I/O, so status endpoints answer instantly
+    however often they are polled.
+    """
+
+    def __init__(self, interval: Optional[float] = None, timeout: Optional[float] = None):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between rounds, defaults to settings.health_check_interval
+            timeout: Seconds per check, defaults to settings.health_check_timeout
+        """
+        self.interval = interval or settings.health_check_interval
+        self.timeout = timeout or settings.health_check_timeout
+        self._checks: Dict[str, Check] = {}
+        self._critical: Dict[str, bool] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, check: Check, critical: bool = True) -> None:
+        """
+        Add a dependency check.
+
+        Args:
+            name: Dependency name
+            check: Sync or async callable; raising marks the dependency unhealthy
+            critical: Whether a failure degrades the service
+        """
+        self._checks[name] = check
+        self._critical[name] = critical
+        self._results[name] = {"status": "unknown", "error": None}
+
+    def set_static(self, name: str, info: Dict[str, Any]) -> None:
+        """
+        Report fixed information for a dependency that is not probed.
+
+        Args:
+            name: Dependency name
+            info: Status details, such as {"status": "not_configured"}
+        """
+        self._results[name] = info
+
+    async def check_all(self) -> None:
+        """Run every check once, concurrently."""
+        await asyncio.gather(*(self._run(name, check) for name, check in self._checks.items()))
+
+    async def _run(self, name: str, check: Check) -> None:
+        pending = self._pending.get(name)
+        if pending is not None and not pending.done():
+            self._results[name] = self._result("unhealthy", "check still running", None)
+            return
+
+        started = time.perf_counter()
+        if asyncio.iscoroutinefunction(check):
+            future = asyncio.ensure_future(check())
+        else:
+            future = asyncio.ensure_future(asyncio.to_thread(check))
+        self._pending[name] = future
+        try:
+            details = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            result = self._result("unhealthy", f"timed out after {self.timeout}s", None)
+        except Exception as e:
+            result = self._result("unhealthy", str(e), started)
+        else:
+            result = self._result("healthy", None, started)
+            result.update(details or {})
+
+        previous = self._results.get(name, {}).get("status")
+        if result["status"] != previous and previous != "unknown":
+            logger.warning(f"Dependency {name}: {previous} -> {result['status']}")
+        self._results[name] = result
+
+    @staticmethod
+    def _result(status: str, error: Optional[str], started: Optional[float]) -> Dict[str, Any]:
+        return {
+            "status": status,
+            "error": error,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1) if started else None,
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Latest results.
+
+        Returns:
+            Overall status ("healthy" or "degraded") and per-dependency results
+        """
+        degraded = any(
+            self._results[name]["status"] == "unhealthy"
+            for name, critical in self._critical.items()
+            if critical
+        )
+        return {
+            "status": "degraded" if degraded else "healthy",
+            "dependencies": {name: dict(result) for name, result in self._results.items()},
+        }
+
+    async def start(self) -> None:
+        """Run a first round, then keep checking in the background."""
+        await self.check_all()
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.error(f"Health check round failed: {e}", exc_info=True)
+
+    async def close(self) -> None:
+        """Stop checking."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def redis_check(client: aioredis.Redis) -> Check:
+    """
+    Check for an async Redis client.
+
+    Args:
+        client: redis.asyncio.Redis instance
+
+    Returns:
+        Check that pings the server
+    """
+
+    async def check() -> None:
+        await client.ping()
+
+    return check
+
+
+def postgres_check(engine: AsyncEngine) -> Check:
+    """
+    Check for an async SQLAlchemy engine.
+
+    Args:
+        engine: Async database engine
+
+    Returns:
+        Check that runs SELECT 1 on a pooled connection
+    """
+
+    async def check() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    return check
+
+
+health_monitor = HealthMonitor()
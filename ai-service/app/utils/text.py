@@ -0,0 +1,129 @@
+"""
+Text normalization helpers shared by the cleaners.
+"""
+import re
+from html import unescape
+
+# HTML tag pattern
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Control characters (C0/C1) that survive whitespace collapsing
+CONTROL_CHAR_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
+
+
+def normalize_text(text: str, strip_control: bool = True) -> str:
+    """
+    Decode HTML entities, strip tags, collapse whitespace and drop control characters.
+
+    Equivalent to running ``unescape``, tag removal, ``\\s+`` collapsing, ``strip``
+    and control-character removal in that order, but every step is a precompiled
+    C-level scan and steps that cannot match are skipped:
+
+    - entity decoding only runs when the text contains ``&``
+    - tag stripping only runs when the text contains ``<``
+    - whitespace is collapsed and trimmed by ``str.split``/``str.join``
+    - control characters are only searched for when the collapsed text is not
+      printable, which is the rare case for crawled articles
+
+    Args:
+        text: Raw text, possibly containing HTML markup
+        strip_control: Whether to drop control characters
+
+    Returns:
+        Normalized single-line text
+    """
+    if not text:
+        return ""
+
+    if "&" in text:
+        text = unescape(text)
+
+    if "<" in text:
+        text = HTML_TAG_PATTERN.sub("", text)
+
+    text = " ".join(text.split())
+
+    if strip_control and not text.isprintable():
+        text = CONTROL_CHAR_PATTERN.sub("", text)
+
+    return text
+
+
+# Tail of a chunk that may be the start of an entity html.unescape would decode
+_PARTIAL_ENTITY_PATTERN = re.compile(r"&(?:#[xX]?[0-9a-fA-F]*|[^\t\n\f <&#;]{0,32})$")
+
+# Longest unterminated tag held back while waiting for its closing ">"
+_MAX_PENDING_TAG = 1024
+
+
+class TextNormalizer:
+    """
+    Incremental ``normalize_text`` for streamed text.
+
+    Each ``feed`` returns the normalized output that is final so far. The
+    tail of a chunk that could still be part of an entity or a tag is held
+    back until the next chunk, so the concatenated output equals
+    ``normalize_text`` of the concatenated input (tags longer than
+    ``_MAX_PENDING_TAG`` characters excepted).
+    """
+
+    def __init__(self):
+        self._raw = ""
+        self._markup = ""
+        self._started = False
+        self._space = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Normalize the next chunk.
+
+        Args:
+            chunk: Raw text fragment
+
+        Returns:
+            Newly finalized normalized text, possibly empty
+        """
+        raw = self._raw + chunk
+        match = _PARTIAL_ENTITY_PATTERN.search(raw)
+        if match:
+            raw, self._raw = raw[: match.start()], raw[match.start():]
+        else:
+            self._raw = ""
+        return self._strip_markup(unescape(raw) if "&" in raw else raw, final=False)
+
+    def close(self) -> str:
+        """
+        Flush held-back text at the end of the stream.
+
+        Returns:
+            Remaining normalized text
+        """
+        raw, self._raw = self._raw, ""
+        return self._strip_markup(unescape(raw) if "&" in raw else raw, final=True)
+
+    def _strip_markup(self, text: str, final: bool) -> str:
+        text = self._markup + text
+        self._markup = ""
+        if "<" in text:
+            # A "<" after the last ">" may open a tag that closes in a later chunk
+            start = text.find("<", text.rfind(">") + 1)
+            if not final and start != -1 and len(text) - start < _MAX_PENDING_TAG:
+                text, self._markup = text[:start], text[start:]
+            text = HTML_TAG_PATTERN.sub("", text)
+        return self._collapse(text)
+
+    def _collapse(self, text: str) -> str:
+        if not text:
+            return ""
+        words = text.split()
+        if not words:
+            self._space = self._space or self._started
+            return ""
+        parts = []
+        if self._started and (self._space or text[0].isspace()):
+            parts.append(" ")
+        parts.append(" ".join(words))
+        self._started = True
+        self._space = text[-1].isspace()
+        out = "".join(parts)
+        return out if out.isprintable() else CONTROL_CHAR_PATTERN.sub("", out)
@@ -0,0 +1,19 @@
+"""
+Vector storage and approximate nearest-neighbor search.
+"""
+from app.vector.base import SearchHit, VectorStore
+from app.vector.embedding import EmbeddingService, content_hash, get_embedding_service
+from app.vector.ivf import IVFIndex
+from app.vector.local import LocalVectorStore, close_vector_store, get_vector_store
+
+__all__ = [
+    "SearchHit",
+    "VectorStore",
+    "IVFIndex",
+    "LocalVectorStore",
+    "get_vector_store",
+    "close_vector_store",
+    "EmbeddingService",
+    "content_hash",
+    "get_embedding_service",
+]
@@ -0,0 +1,163 @@
+"""
+Vector store interface shared by the local index and remote backends.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+@dataclass
+class SearchHit:
+    """A single nearest-neighbor result."""
+
+    id: str
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+class VectorStore(ABC):
+    """
+    Abstract vector store.
+
+    Collections hold fixed-dimension vectors keyed by string ids, each with
+    an optional JSON-serializable payload (title, text, source, ...).
+    Scores are similarities: higher is closer.
+    """
+
+    @abstractmethod
+    def create_collection(self, name: str, dim: int, metric: str = "cosine") -> None:
+        """
+        Create a collection if it does not exist.
+
+        Args:
+            name: Collection name
+            dim: Vector dimension
+            metric: Similarity metric ("cosine" or "ip")
+        """
+
+    @abstractmethod
+    def has_collection(self, name: str) -> bool:
+        """
+        Check whether a collection exists.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            True if the collection exists
+        """
+
+    @abstractmethod
+    def list_collections(self) -> List[str]:
+        """
+        List collection names.
+
+        Returns:
+            Collection names
+        """
+
+    @abstractmethod
+    def upsert(
+        self,
+        collection: str,
+        ids: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        payloads: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> int:
+        """
+        Insert vectors, replacing any existing vectors with the same ids.
+
+        Args:
+            collection: Collection name
+            ids: Vector ids
+            vectors: Vectors, one per id
+            payloads: Optional payloads, one per id
+
+        Returns:
+            Number of vectors written
+        """
+
+    @abstractmethod
+    def delete(self, collection: str, ids: Sequence[str]) -> int:
+        """
+        Delete vectors by id.
+
+        Args:
+            collection: Collection name
+            ids: Vector ids
+
+        Returns:
+            Number of vectors deleted
+        """
+
+    @abstractmethod
+    def search(
+        self,
+        collection: str,
+        vector: Sequence[float],
+        top_k: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[SearchHit]:
+        """
+        Find the nearest vectors to a query.
+
+        Args:
+            collection: Collection name
+            vector: Query vector
+            top_k: Number of results
+            where: Optional payload equality filter
+
+        Returns:
+            Hits ordered by descending score
+        """
+
+    @abstractmethod
+    def get(self, collection: str, ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch stored records by id; missing ids are skipped.
+
+        Args:
+            collection: Collection name
+            ids: Vector ids
+
+        Returns:
+            Records with id, vector and payload
+        """
+
+    @abstractmethod
+    def scan(
+        self,
+        collection: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over stored records in insertion order.
+
+        Args:
+            collection: Collection name
+            limit: Maximum number of records
+            offset: Number of records to skip
+
+        Returns:
+            Iterator of records with id, vector and payload
+        """
+
+    @abstractmethod
+    def count(self, collection: str) -> int:
+        """
+        Count live vectors in a collection.
+
+        Args:
+            collection: Collection name
+
+        Returns:
+            Number of vectors
+        """
+
+    def flush(self) -> None:
+        """Persist pending changes."""
+
+    def close(self) -> None:
+        """Release resources."""
+        self.flush()
@@ -0,0 +1,368 @@
+"""
+Embedding service with a content-addressed cache and request coalescing.
+"""
+import asyncio
+import hashlib
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+from app.utils.logger import logger
+from app.utils.text import normalize_text
+
+CACHE_KEY = "embedding:{model}:{digest}"
+
+# Leading byte of a cached vector identifying its storage format
+_FORMAT_FLOAT16 = b"h"
+_FORMAT_INT8 = b"b"
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+
+def prepare_text(text: str, normalize: bool = True) -> str:
+    """
+    Text as sent to the model.
+
+    Args:
+        text: Raw text
+        normalize: Apply normalize_text; when False only whitespace runs are
+            collapsed, so markup-like content such as ``close < ma5`` is kept
+
+    Returns:
+        Model input text
+    """
+    return normalize_text(text) if normalize else " ".join(text.split())
+
+
+def content_hash(text: str, normalize: bool = True) -> str:
+    """
+    Hash the model input so formatting-only changes share a cache entry.
+
+    Args:
+        text: Raw text
+        normalize: Whether the text is embedded normalized, see prepare_text
+
+    Returns:
+        Hex SHA-256 digest of the prepared text
+    """
+    return hashlib.sha256(prepare_text(text, normalize).encode("utf-8")).hexdigest()
+
+
+def encode_vector(vector: np.ndarray, dtype: str = "float16") -> bytes:
+    """
+    Pack a vector into its compact cache form.
+
+    float16 halves storage with negligible loss; int8 quarters it using a
+    per-vector scale, which preserves cosine ranking for normalized vectors.
+
+    Args:
+        vector: float32 vector
+        dtype: "float16" or "int8"
+
+    Returns:
+        Encoded bytes
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    if dtype == "float16":
+        return _FORMAT_FLOAT16 + vector.astype(np.float16).tobytes()
+    if dtype == "int8":
+        scale = float(np.abs(vector).max()) / 127 or 1.0
+        quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+        return _FORMAT_INT8 + struct.pack("<f", scale) + quantized.tobytes()
+    raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    """
+    Unpack a cached vector to float32.
+
+    Args:
+        data: Bytes produced by encode_vector
+
+    Returns:
+        float32 vector
+    """
+    tag, body = data[:1], data[1:]
+    if tag == _FORMAT_FLOAT16:
+        return np.frombuffer(body, dtype=np.float16).astype(np.float32)
+    if tag == _FORMAT_INT8:
+        (scale,) = struct.unpack("<f", body[:4])
+        return np.frombuffer(body[4:], dtype=np.int8).astype(np.float32) * scale
+    raise ValueError(f"Unknown cached vector format: {tag!r}")
+
+
+def load_sentence_transformer(model_name: str) -> Encoder:
+    """
+    Load a sentence-transformers model as a batch encoder.
+
+    Args:
+        model_name: Model name or local path
+
+    Returns:
+        Callable mapping a list of texts to a (n, dim) float32 array
+
+    Raises:
+        RuntimeError: If sentence-transformers is not installed
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise RuntimeError("sentence-transformers is required for local embeddings") from e
+
+    model = SentenceTransformer(model_name)
+    logger.info(f"Loaded embedding model {model_name}")
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return model.encode(
+            texts,
+            batch_size=settings.embedding_batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        ).astype(np.float32)
+
+    return encode
+
+
+class EmbeddingService:
+    """
+    Embeds text at most once per model and content.
+
+    Every request is keyed by the hash of the text sent to the model. Cached
+    vectors are read from Redis in one MGET; misses from concurrent callers
+    are queued together, identical texts share a single pending slot, and
+    the queue is sent to the model when it reaches ``batch_size`` or after
+    ``max_wait_ms``. Results are always returned after the same
+    quantization round trip, so a cache hit and a fresh computation yield
+    identical vectors.
+    """
+
+    def __init__(
+        self,
+        encoder: Optional[Encoder] = None,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_wait_ms: Optional[int] = None,
+        dtype: Optional[str] = None,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            encoder: Batch encoder, defaults to the configured sentence-transformers model
+            model_name: Model name used in cache keys
+            batch_size: Maximum texts per model call
+            max_wait_ms: Longest a queued text waits for its batch to fill
+            dtype: Cache storage type ("float16" or "int8")
+        """
+        self.model_name = model_name or settings.embedding_model_name
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.max_wait = (max_wait_ms or settings.embedding_max_wait_ms) / 1000
+        self.dtype = dtype or settings.embedding_cache_dtype
+        self._encoder = encoder
+        self._encoder_lock = threading.Lock()
+
+        self._redis: Optional[redis.Redis] = None
+        self._aredis: Optional[aioredis.Redis] = None
+
+        # Coalescing state, owned by the event loop
+        self._queue: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.stats = {"requested": 0, "cache_hits": 0, "coalesced": 0, "computed": 0}
+
+    @property
+    def encoder(self) -> Encoder:
+        """Batch encoder, loaded on first use."""
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    self._encoder = load_sentence_transformer(self.model_name)
+        return self._encoder
+
+    async def embed(self, texts: Sequence[str], normalize: bool = True) -> List[np.ndarray]:
+        """
+        Embed texts, reusing cached and in-flight results.
+
+        Args:
+            texts: Texts to embed
+            normalize: Whether to normalize texts before embedding, see prepare_text
+
+        Returns:
+            float32 vectors in input order
+        """
+        texts = [prepare_text(text, normalize) for text in texts]
+        digests = [content_hash(text, normalize=False) for text in texts]
+        self.stats["requested"] += len(digests)
+        unique = list(dict.fromkeys(digests))
+
+        cached = await self._async_client().mget([self._key(d) for d in unique])
+        vectors: Dict[str, np.ndarray] = {
+            digest: decode_vector(data) for digest, data in zip(unique, cached) if data
+        }
+        self.stats["cache_hits"] += len(vectors)
+
+        text_by_digest = dict(zip(digests, texts))
+        waiting = {
+            digest: self._submit(digest, text_by_digest[digest])
+            for digest in unique
+            if digest not in vectors
+        }
+        if waiting:
+            # Futures are shared with other callers; a cancelled caller must
+            # only stop waiting, not cancel the result for everyone else
+            results = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+            vectors.update(zip(waiting, results))
+
+        return [vectors[digest] for digest in digests]
+
+    async def embed_one(self, text: str) -> np.ndarray:
+        """
+        Embed a single text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            float32 vector
+        """
+        return (await self.embed([text]))[0]
+
+    def embed_sync(self, texts: Sequence[str], normalize: bool = True) -> List[np.ndarray]:
+        """
+        Embed texts from synchronous code such as Celery tasks.
+
+        The call's misses form one batch; there is no cross-call coalescing.
+
+        Args:
+            texts: Texts to embed
+            normalize: Whether to normalize texts before embedding, see prepare_text
+
+        Returns:
+            float32 vectors in input order
+        """
+        texts = [prepare_text(text, normalize) for text in texts]
+        digests = [content_hash(text, normalize=False) for text in texts]
+        self.stats["requested"] += len(digests)
+        unique = list(dict.fromkeys(digests))
+        client = self._sync_client()
+
+        cached = client.mget([self._key(d) for d in unique])
+        vectors = {digest: decode_vector(data) for digest, data in zip(unique, cached) if data}
+        self.stats["cache_hits"] += len(vectors)
+
+        text_by_digest = dict(zip(digests, texts))
+        missing = [digest for digest in unique if digest not in vectors]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            encoded = self._compute([text_by_digest[d] for d in batch])
+            pipe = client.pipeline(transaction=False)
+            for digest, data in zip(batch, encoded):
+                pipe.set(self._key(digest), data)
+                vectors[digest] = decode_vector(data)
+            pipe.execute()
+
+        return [vectors[digest] for digest in digests]
+
+    def _submit(self, digest: str, text: str) -> asyncio.Future:
+        """Queue a cache miss, sharing any pending or in-flight request for it."""
+        future = self._inflight.get(digest)
+        if future is None and digest in self._queue:
+            future = self._queue[digest][1]
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue[digest] = (text, future)
+        if len(self._queue) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        """Send the queued texts to the model as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, {}
+        for digest, (_, future) in batch.items():
+            self._inflight[digest] = future
+        asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: Dict[str, Tuple[str, asyncio.Future]]) -> None:
+        digests = list(batch)
+        try:
+            encoded = await asyncio.to_thread(self._compute, [batch[d][0] for d in digests])
+            await self._async_client().mset(
+                {self._key(digest): data for digest, data in zip(digests, encoded)}
+            )
+            for digest, data in zip(digests, encoded):
+                future = batch[digest][1]
+                if not future.done():
+                    future.set_result(decode_vector(data))
+        except Exception as e:
+            logger.error(f"Embedding batch of {len(digests)} failed: {e}")
+            for _, future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for digest in digests:
+                self._inflight.pop(digest, None)
+
+    def _compute(self, texts: List[str]) -> List[bytes]:
+        vectors = self.encoder(texts)
+        self.stats["computed"] += len(texts)
+        return [encode_vector(vector, self.dtype) for vector in vectors]
+
+    def _key(self, digest: str) -> str:
+        return CACHE_KEY.format(model=self.model_name, digest=digest)
+
+    def _sync_client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(settings.redis_url)
+        return self._redis
+
+    def _async_client(self) -> aioredis.Redis:
+        if self._aredis is None:
+            self._aredis = aioredis.from_url(settings.redis_url)
+        return self._aredis
+
+    async def aclose(self) -> None:
+        """Close Redis connections."""
+        if self._aredis is not None:
+            await self._aredis.close()
+            self._aredis = None
+        if self._redis is not None:
+            self._redis.close()
+            self._redis = None
+
+
+_service: Optional[EmbeddingService] = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service(**kwargs: Any) -> EmbeddingService:
+    """
+    Get the process-wide embedding service.
+
+    Args:
+        **kwargs: EmbeddingService arguments, used only on first call
+
+    Returns:
+        Shared EmbeddingService instance
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = EmbeddingService(**kwargs)
+        return _service
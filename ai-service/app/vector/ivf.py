@@ -0,0 +1,376 @@
+"""
+Inverted-file (IVF) approximate nearest-neighbor index over memory-mapped vectors.
+"""
+import json
+import math
+from array import array
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Row states in the assignment array besides a cluster number
+UNASSIGNED = -1
+DELETED = -2
+
+METRICS = ("cosine", "ip")
+
+_ASSIGN_BATCH = 65536
+_KMEANS_ITERATIONS = 10
+_MAX_LISTS = 4096
+_SAMPLES_PER_LIST = 256
+_SCORE_BLOCK = 1 << 24
+
+
+class IVFIndex:
+    """
+    IVF-Flat index persisted in a directory.
+
+    Vectors live in ``vectors.f32``, a float32 memory map that only grows;
+    ``lists.i32`` holds each row's cluster (or a tombstone). Until
+    ``train_threshold`` live rows exist a search is an exact scan. Beyond
+    that, k-means centroids partition the rows and a query scans only its
+    ``nprobe`` nearest partitions. The index retrains when the live row
+    count has quadrupled since the last training.
+
+    Several processes may open the same directory. Each save() bumps a
+    generation number in ``index.json``, and refresh() reloads what another
+    process changed; callers serialize writers across processes themselves
+    (LocalVectorStore holds a file lock).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        dim: int,
+        metric: str = "cosine",
+        nprobe: int = 16,
+        train_threshold: int = 10000,
+    ):
+        """
+        Open or create an index.
+
+        Args:
+            path: Index directory
+            dim: Vector dimension
+            metric: "cosine" (vectors are normalized) or "ip"
+            nprobe: Partitions scanned per query
+            train_threshold: Live rows needed before partitioning
+
+        Raises:
+            ValueError: If the metric is unknown or does not match the stored index
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.metric = metric
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+
+        meta_path = self.path / "index.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta["dim"] != dim or meta["metric"] != metric:
+                raise ValueError(
+                    f"Index at {self.path} is {meta['metric']}/{meta['dim']}, "
+                    f"requested {metric}/{dim}"
+                )
+            self._load(meta)
+        else:
+            self.size = 0
+            self.capacity = 1024
+            self.trained_size = 0
+            self.generation = 0
+            self._allocate(self.capacity)
+            self._open_maps()
+            self._load_partitions()
+
+    @property
+    def trained(self) -> bool:
+        """Whether rows are partitioned by centroids."""
+        return self.centroids is not None
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Append vectors.
+
+        Args:
+            vectors: Array of shape (n, dim)
+
+        Returns:
+            Row numbers assigned to the vectors
+        """
+        vectors = self._prepare(vectors)
+        count = len(vectors)
+        self._reserve(self.size + count)
+
+        rows = np.arange(self.size, self.size + count, dtype=np.int32)
+        self._vectors[rows] = vectors
+        self._assign(rows, vectors)
+        self.size += count
+        self.live += count
+        self._maybe_train()
+        return rows
+
+    def set(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Overwrite vectors in place.
+
+        Args:
+            rows: Existing row numbers
+            vectors: Replacement vectors, one per row
+        """
+        rows = np.asarray(rows, dtype=np.int32)
+        vectors = self._prepare(vectors)
+        revived = int(np.count_nonzero(self._lists[rows] == DELETED))
+        self._vectors[rows] = vectors
+        self._assign(rows, vectors)
+        self.live += revived
+
+    def remove(self, rows: np.ndarray) -> None:
+        """
+        Tombstone rows; stale inverted-list entries are skipped at query time.
+
+        Args:
+            rows: Row numbers to delete
+        """
+        rows = np.asarray(rows, dtype=np.int32)
+        if not len(rows):
+            return
+        self.live -= int(np.count_nonzero(self._lists[rows] != DELETED))
+        self._lists[rows] = DELETED
+
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Read stored vectors.
+
+        Args:
+            rows: Row numbers
+
+        Returns:
+            Array of shape (len(rows), dim)
+        """
+        return np.array(self._vectors[np.asarray(rows, dtype=np.int32)])
+
+    def search(
+        self, query: np.ndarray, k: int, nprobe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k highest-scoring live rows.
+
+        Args:
+            query: Query vector of shape (dim,)
+            k: Number of results
+            nprobe: Partitions to scan, defaults to the index setting
+
+        Returns:
+            Tuple of (rows, scores) ordered by descending score
+        """
+        query = self._prepare(query)[0]
+        if self.trained:
+            clusters = self._nearest_clusters(query, nprobe or self.nprobe)
+        else:
+            clusters = [UNASSIGNED]
+
+        candidates = [self._list_rows(int(cluster)) for cluster in clusters]
+        rows = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int32)
+        if not len(rows):
+            return rows, np.empty(0, dtype=np.float32)
+
+        scores = self._vectors[rows] @ query
+        if len(rows) > k:
+            top = np.argpartition(-scores, k)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores)
+        return rows[order], scores[order]
+
+    def train(self) -> None:
+        """Cluster live rows with k-means and reassign every row to a partition."""
+        live_rows = np.flatnonzero(self._lists[: self.size] != DELETED).astype(np.int32)
+        if not len(live_rows):
+            return
+
+        nlist = max(1, min(_MAX_LISTS, int(4 * math.sqrt(len(live_rows)))))
+        rng = np.random.default_rng(0)
+        sample_size = min(len(live_rows), nlist * _SAMPLES_PER_LIST)
+        # 4 * sqrt(n) exceeds n below 16 rows; centroids are drawn from the sample
+        nlist = min(nlist, sample_size)
+        sample = self._vectors[np.sort(rng.choice(live_rows, sample_size, replace=False))]
+
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(_KMEANS_ITERATIONS):
+            labels = self._closest(sample, centroids)
+            counts = np.bincount(labels, minlength=nlist)
+            filled = np.flatnonzero(counts)
+            starts = (np.cumsum(counts) - counts)[filled]
+            sums = np.add.reduceat(sample[np.argsort(labels, kind="stable")], starts, axis=0)
+            centroids[filled] = sums / counts[filled, None]
+            # Reseed empty partitions from random samples
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(sample_size, len(empty))]
+
+        self.centroids = centroids.astype(np.float32)
+        for start in range(0, len(live_rows), _ASSIGN_BATCH):
+            batch = live_rows[start : start + _ASSIGN_BATCH]
+            self._lists[batch] = self._closest(self._vectors[batch], self.centroids)
+        self.trained_size = len(live_rows)
+        self._rebuild_lists()
+        np.save(self.path / "centroids.npy", self.centroids)
+
+    def refresh(self) -> bool:
+        """
+        Reload the index if another process saved it since this one last did.
+
+        Returns:
+            True if the index was reloaded
+        """
+        meta_path = self.path / "index.json"
+        if not meta_path.exists():
+            return False
+        meta = json.loads(meta_path.read_text())
+        if meta.get("generation", 0) == self.generation:
+            return False
+        self._load(meta)
+        return True
+
+    def save(self) -> None:
+        """Flush memory maps and write index metadata."""
+        self._vectors.flush()
+        self._lists.flush()
+        self.generation += 1
+        meta = {
+            "dim": self.dim,
+            "metric": self.metric,
+            "size": self.size,
+            "capacity": self.capacity,
+            "trained_size": self.trained_size,
+            "generation": self.generation,
+        }
+        tmp_path = self.path / "index.json.tmp"
+        tmp_path.write_text(json.dumps(meta))
+        tmp_path.replace(self.path / "index.json")
+
+    def _load(self, meta: Dict[str, int]) -> None:
+        """Adopt saved metadata, remapping the files and reloading the partitions."""
+        self.size = meta["size"]
+        self.capacity = meta["capacity"]
+        self.trained_size = meta["trained_size"]
+        self.generation = meta.get("generation", 0)
+        self._open_maps()
+        self._load_partitions()
+
+    def _load_partitions(self) -> None:
+        centroids_path = self.path / "centroids.npy"
+        self.centroids: Optional[np.ndarray] = (
+            np.load(centroids_path) if centroids_path.exists() else None
+        )
+        self._rebuild_lists()
+        self.live = int(np.count_nonzero(self._lists[: self.size] != DELETED))
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected dimension {self.dim}, got {vectors.shape[1]}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+        return vectors
+
+    def _allocate(self, capacity: int) -> None:
+        """Grow the backing files; new rows start as tombstones."""
+        for name, itemsize in (("vectors.f32", 4 * self.dim), ("lists.i32", 4)):
+            file_path = self.path / name
+            with open(file_path, "ab") as f:
+                f.truncate(capacity * itemsize)
+        lists = np.memmap(self.path / "lists.i32", dtype=np.int32, mode="r+")
+        lists[self.size :] = DELETED
+        lists.flush()
+
+    def _open_maps(self) -> None:
+        self._vectors = np.memmap(
+            self.path / "vectors.f32", dtype=np.float32, mode="r+",
+            shape=(self.capacity, self.dim),
+        )
+        self._lists = np.memmap(
+            self.path / "lists.i32", dtype=np.int32, mode="r+", shape=(self.capacity,)
+        )
+
+    def _reserve(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        self._vectors.flush()
+        self._lists.flush()
+        del self._vectors, self._lists
+        self.capacity = max(needed, self.capacity * 2)
+        self._allocate(self.capacity)
+        self._open_maps()
+
+    def _closest(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Nearest centroid by L2 distance for each vector."""
+        half_norms = 0.5 * np.einsum("ij,ij->i", centroids, centroids)
+        labels = np.empty(len(vectors), dtype=np.int32)
+        # Chunked so the score matrix stays small with thousands of centroids
+        step = max(1, _SCORE_BLOCK // len(centroids))
+        for start in range(0, len(vectors), step):
+            scores = vectors[start : start + step] @ centroids.T - half_norms
+            labels[start : start + step] = np.argmax(scores, axis=1)
+        return labels
+
+    def _nearest_clusters(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        scores = self.centroids @ query - 0.5 * np.einsum(
+            "ij,ij->i", self.centroids, self.centroids
+        )
+        nprobe = min(nprobe, len(scores))
+        return np.argpartition(-scores, nprobe - 1)[:nprobe]
+
+    def _assign(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        if self.trained:
+            clusters = self._closest(vectors, self.centroids)
+        else:
+            clusters = np.full(len(rows), UNASSIGNED, dtype=np.int32)
+        self._lists[rows] = clusters
+        for cluster in np.unique(clusters):
+            self._inverted.setdefault(int(cluster), array("i")).extend(
+                rows[clusters == cluster].tolist()
+            )
+            self._arrays.pop(int(cluster), None)
+
+    def _list_rows(self, cluster: int) -> np.ndarray:
+        """Rows currently assigned to a partition, skipping stale entries."""
+        rows = self._arrays.get(cluster)
+        if rows is None:
+            entries = self._inverted.get(cluster)
+            if entries is None:
+                return np.empty(0, dtype=np.int32)
+            # Compact the list: drop duplicates and rows that moved or were deleted
+            rows = np.unique(np.frombuffer(entries, dtype=np.int32))
+            rows = rows[self._lists[rows] == cluster]
+            compacted = array("i")
+            compacted.frombytes(rows.tobytes())
+            self._inverted[cluster] = compacted
+            self._arrays[cluster] = rows
+        return rows[self._lists[rows] == cluster]
+
+    def _rebuild_lists(self) -> None:
+        assignments = np.asarray(self._lists[: self.size])
+        self._inverted: Dict[int, array] = {}
+        self._arrays: Dict[int, np.ndarray] = {}
+        order = np.argsort(assignments, kind="stable").astype(np.int32)
+        clusters, starts = np.unique(assignments[order], return_index=True)
+        bounds = list(starts[1:]) + [len(order)]
+        for cluster, start, end in zip(clusters, starts, bounds):
+            if cluster != DELETED:
+                self._inverted[int(cluster)] = array("i", order[start:end].tolist())
+
+    def _maybe_train(self) -> None:
+        if not self.trained:
+            if self.live >= self.train_threshold:
+                self.train()
+        elif self.live >= 4 * self.trained_size:
+            self.train()
@@ -0,0 +1,342 @@
+"""
+Embedded vector store backed by on-disk IVF indexes.
+
+Each collection is a directory holding an ``IVFIndex`` and an SQLite table
+that maps string ids to index rows and payloads, so the store runs without
+a Milvus cluster and survives restarts. The API and Celery workers open the
+same directory; a file lock per collection keeps their writes apart.
+"""
+import fcntl
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.logger import logger
+from app.vector.base import SearchHit, VectorStore
+from app.vector.ivf import IVFIndex
+
+_COLLECTION_NAME = re.compile(r"^[A-Za-z0-9_\-]+$")
+_SQL_BATCH = 500
+# Extra candidates fetched when a payload filter may discard hits
+_FILTER_OVERFETCH = 4
+
+
+@contextmanager
+def _file_lock(path: Path, exclusive: bool) -> Iterator[None]:
+    """Hold an advisory lock on a file shared by every process using the store."""
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class _Collection:
+    """An index plus its id/payload table."""
+
+    def __init__(self, path: Path, dim: int, metric: str):
+        path.mkdir(parents=True, exist_ok=True)
+        self.lock_path = path / "collection.lock"
+        self.lock = threading.Lock()
+        with _file_lock(self.lock_path, exclusive=True):
+            self.index = IVFIndex(
+                path,
+                dim,
+                metric=metric,
+                nprobe=settings.vector_ivf_nprobe,
+                train_threshold=settings.vector_ivf_train_threshold,
+            )
+            self.db = sqlite3.connect(path / "items.db", check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "id TEXT PRIMARY KEY, row INTEGER UNIQUE NOT NULL, payload TEXT)"
+            )
+            self.db.commit()
+
+    @contextmanager
+    def locked(self, exclusive: bool = False) -> Iterator[None]:
+        """
+        Hold the collection against other threads and processes.
+
+        Readers in different processes share the file lock and writers hold
+        it alone. Either way the index is first brought up to date with
+        writes other processes saved.
+        """
+        with self.lock, _file_lock(self.lock_path, exclusive):
+            self.index.refresh()
+            yield
+
+    def rows_for(self, ids: Sequence[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        for start in range(0, len(ids), _SQL_BATCH):
+            batch = list(ids[start : start + _SQL_BATCH])
+            marks = ",".join("?" * len(batch))
+            found.update(
+                self.db.execute(f"SELECT id, row FROM items WHERE id IN ({marks})", batch)
+            )
+        return found
+
+    def items_for(self, rows: Sequence[int]) -> Dict[int, Tuple[str, Optional[str]]]:
+        found: Dict[int, Tuple[str, Optional[str]]] = {}
+        for start in range(0, len(rows), _SQL_BATCH):
+            batch = [int(row) for row in rows[start : start + _SQL_BATCH]]
+            marks = ",".join("?" * len(batch))
+            for item_id, row, payload in self.db.execute(
+                f"SELECT id, row, payload FROM items WHERE row IN ({marks})", batch
+            ):
+                found[row] = (item_id, payload)
+        return found
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Vector store kept entirely on local disk.
+
+    Vectors are float32 memory maps, so the working set is paged in by the
+    OS rather than loaded up front. Writes are persisted per call: the index
+    files first, then the SQLite commit, so an interrupted write can leave
+    an unreferenced row but never an id pointing at a missing vector.
+
+    Every process opening the same path sees the others' writes: each call
+    takes the collection's file lock (shared for reads, exclusive for
+    writes) and reloads the index if another process saved it since.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open a store, loading any collections already on disk.
+
+        Args:
+            path: Root directory, defaults to settings.vector_store_path
+        """
+        self.path = Path(path or settings.vector_store_path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._collections: Dict[str, _Collection] = {}
+        self._lock = threading.Lock()
+
+        for meta_path in sorted(self.path.glob("*/collection.json")):
+            self._open(meta_path.parent.name)
+        logger.info(
+            f"Local vector store opened at {self.path} "
+            f"with {len(self._collections)} collections"
+        )
+
+    def create_collection(self, name: str, dim: int, metric: str = "cosine") -> None:
+        if not _COLLECTION_NAME.match(name):
+            raise ValueError(f"Invalid collection name: {name}")
+        with self._lock, _file_lock(self.path / "store.lock", exclusive=True):
+            if name in self._collections or self._open(name) is not None:
+                return
+            collection_path = self.path / name
+            collection = _Collection(collection_path, dim, metric)
+            meta_path = collection_path / "collection.json"
+            tmp_path = collection_path / "collection.json.tmp"
+            tmp_path.write_text(json.dumps({"dim": dim, "metric": metric}))
+            tmp_path.replace(meta_path)
+            self._collections[name] = collection
+            logger.info(f"Created vector collection {name} (dim={dim}, metric={metric})")
+
+    def has_collection(self, name: str) -> bool:
+        return self._find(name) is not None
+
+    def list_collections(self) -> List[str]:
+        return sorted(meta_path.parent.name for meta_path in self.path.glob("*/collection.json"))
+
+    def upsert(
+        self,
+        collection: str,
+        ids: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        payloads: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> int:
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if payloads is not None and len(payloads) != len(ids):
+            raise ValueError("ids and payloads must have the same length")
+        if not ids:
+            return 0
+
+        # Last write wins for ids repeated within one call
+        positions = {item_id: i for i, item_id in enumerate(ids)}
+        ids = list(positions)
+        order = list(positions.values())
+        vectors = np.asarray(vectors, dtype=np.float32)[order]
+        payload_json = [
+            json.dumps(payloads[i], ensure_ascii=False) if payloads else None for i in order
+        ]
+
+        coll = self._get(collection)
+        with coll.locked(exclusive=True):
+            existing = coll.rows_for(ids)
+            replace = [i for i, item_id in enumerate(ids) if item_id in existing]
+            insert = [i for i, item_id in enumerate(ids) if item_id not in existing]
+
+            rows = np.empty(len(ids), dtype=np.int32)
+            if replace:
+                rows[replace] = [existing[ids[i]] for i in replace]
+                coll.index.set(rows[replace], vectors[replace])
+            if insert:
+                rows[insert] = coll.index.add(vectors[insert])
+            coll.index.save()
+
+            coll.db.executemany(
+                "INSERT INTO items (id, row, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET payload = excluded.payload",
+                [(ids[i], int(rows[i]), payload_json[i]) for i in range(len(ids))],
+            )
+            coll.db.commit()
+        return len(ids)
+
+    def delete(self, collection: str, ids: Sequence[str]) -> int:
+        coll = self._get(collection)
+        with coll.locked(exclusive=True):
+            existing = coll.rows_for(list(ids))
+            if not existing:
+                return 0
+            coll.index.remove(np.fromiter(existing.values(), dtype=np.int32))
+            coll.index.save()
+            coll.db.executemany(
+                "DELETE FROM items WHERE id = ?", [(item_id,) for item_id in existing]
+            )
+            coll.db.commit()
+        return len(existing)
+
+    def search(
+        self,
+        collection: str,
+        vector: Sequence[float],
+        top_k: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[SearchHit]:
+        coll = self._get(collection)
+        k = top_k * _FILTER_OVERFETCH if where else top_k
+        with coll.locked():
+            rows, scores = coll.index.search(np.asarray(vector, dtype=np.float32), k)
+            items = coll.items_for(rows.tolist())
+
+        hits = []
+        for row, score in zip(rows.tolist(), scores.tolist()):
+            if row not in items:
+                continue
+            item_id, payload_json = items[row]
+            payload = json.loads(payload_json) if payload_json else {}
+            if where and any(payload.get(key) != value for key, value in where.items()):
+                continue
+            hits.append(SearchHit(id=item_id, score=score, payload=payload))
+            if len(hits) == top_k:
+                break
+        return hits
+
+    def get(self, collection: str, ids: Sequence[str]) -> List[Dict[str, Any]]:
+        coll = self._get(collection)
+        with coll.locked():
+            rows = coll.rows_for(list(ids))
+            if not rows:
+                return []
+            items = coll.items_for(list(rows.values()))
+            vectors = coll.index.get(list(rows.values()))
+        return [
+            {
+                "id": item_id,
+                "vector": vector.tolist(),
+                "payload": json.loads(items[row][1]) if items[row][1] else {},
+            }
+            for (item_id, row), vector in zip(rows.items(), vectors)
+        ]
+
+    def scan(
+        self,
+        collection: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        coll = self._get(collection)
+        with coll.locked():
+            records = coll.db.execute(
+                "SELECT id, row, payload FROM items ORDER BY row LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+        for start in range(0, len(records), _SQL_BATCH):
+            batch = records[start : start + _SQL_BATCH]
+            with coll.locked():
+                vectors = coll.index.get([row for _, row, _ in batch])
+            for (item_id, _, payload_json), vector in zip(batch, vectors):
+                yield {
+                    "id": item_id,
+                    "vector": vector.tolist(),
+                    "payload": json.loads(payload_json) if payload_json else {},
+                }
+
+    def count(self, collection: str) -> int:
+        coll = self._get(collection)
+        with coll.locked():
+            return coll.index.live
+
+    def close(self) -> None:
+        with self._lock:
+            for coll in self._collections.values():
+                coll.close()
+            self._collections.clear()
+
+    def _get(self, name: str) -> _Collection:
+        coll = self._find(name)
+        if coll is None:
+            raise KeyError(f"Vector collection not found: {name}")
+        return coll
+
+    def _find(self, name: str) -> Optional[_Collection]:
+        """An open collection, or one another process created since."""
+        coll = self._collections.get(name)
+        if coll is None and _COLLECTION_NAME.match(name):
+            with self._lock:
+                coll = self._open(name)
+        return coll
+
+    def _open(self, name: str) -> Optional[_Collection]:
+        """Open a collection that exists on disk; the caller holds self._lock."""
+        coll = self._collections.get(name)
+        meta_path = self.path / name / "collection.json"
+        if coll is None and meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            coll = _Collection(meta_path.parent, meta["dim"], meta["metric"])
+            self._collections[name] = coll
+        return coll
+
+
+_store: Optional[LocalVectorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> LocalVectorStore:
+    """
+    Get the process-wide vector store, opening it on first use.
+
+    Returns:
+        Shared LocalVectorStore instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalVectorStore()
+        return _store
+
+
+def close_vector_store() -> None:
+    """Persist and close the process-wide vector store if it was opened."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -2,9 +2,11 @@
 Content API endpoints
 """
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+from app.progress import STATE_DONE, mark_pending, read_progress
 
 router = APIRouter()
 
@@ -30,6 +32,8 @@ async def start_crawling(request: CrawlRequest, background_tasks: BackgroundTask
     else:
         raise HTTPException(status_code=400, detail="Unsupported content type")
     
+    await mark_pending(task.id)
+    
     return {
         "status": "started",
         "task_id": task.id,
@@ -48,6 +52,8 @@ async def clean_content(request: CleanRequest):
         "html": request.content if request.content_type == "html" else None
     })
     
+    await mark_pending(task.id)
+    
     return {
         "status": "processing",
         "task_id": task.id,
@@ -60,13 +66,33 @@ async def get_task_status(task_id: str):
     from celery.result import AsyncResult
     from app.celery_app import celery_app
     
-    result = AsyncResult(task_id, app=celery_app)
+    # Queued and running tasks are answered from the throttled progress
+    # record alone; tasks write it as DONE on success and on failure, so the
+    # result backend is only queried once there is a result to return, or
+    # when no record exists
+    progress = await read_progress(task_id)
+    if progress and progress["state"] != STATE_DONE:
+        return {
+            "task_id": task_id,
+            "status": progress["state"],
+            "progress": progress,
+            "result": None,
+            "ready": False
+        }
+    
+    def _fetch_result():
+        result = AsyncResult(task_id, app=celery_app)
+        ready = result.ready()
+        return result.state, result.result if ready else None, ready
+    
+    state, result, ready = await run_in_threadpool(_fetch_result)
     
     return {
         "task_id": task_id,
-        "status": result.state,
-        "result": result.result if result.ready() else None,
-        "ready": result.ready()
+        "status": state,
+        "progress": progress,
+        "result": result,
+        "ready": ready
     }
 
 @router.get("/schedules")
@@ -0,0 +1,327 @@
+"""
+Bulk upserts of cleaned records through COPY and a staging table.
+"""
+import io
+import json
+import logging
+import re
+import threading
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# COPY text format escapes
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+@dataclass
+class UpsertResult:
+    """Row counts from a bulk upsert."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0  # conflicting rows whose values already matched
+
+    def __iadd__(self, other: "UpsertResult") -> "UpsertResult":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        return self
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Quote a possibly schema-qualified identifier.
+
+    Args:
+        name: Table or column name, such as "news" or "public.news"
+
+    Returns:
+        Quoted identifier
+
+    Raises:
+        ValueError: If a part is not a plain identifier
+    """
+    parts = name.split(".")
+    for part in parts:
+        if not IDENTIFIER_PATTERN.match(part):
+            raise ValueError(f"Invalid identifier: {name}")
+    return ".".join(f'"{part}"' for part in parts)
+
+
+def copy_value(value: Any) -> str:
+    """
+    Encode one value for COPY text format.
+
+    Lists become PostgreSQL arrays and dicts become JSON; None is NULL.
+    Use copy_json for JSON columns, whose values may also be lists.
+
+    Args:
+        value: Python value
+
+    Returns:
+        Escaped field text
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        text = json.dumps(value, ensure_ascii=False, default=str)
+    elif isinstance(value, (list, tuple)):
+        text = _array_literal(value)
+    else:
+        text = str(value)
+    return text.translate(_COPY_ESCAPES)
+
+
+def copy_json(value: Any) -> str:
+    """
+    Encode one JSON column value for COPY text format.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        Escaped JSON text, or NULL for None
+    """
+    if value is None:
+        return "\\N"
+    return json.dumps(value, ensure_ascii=False, default=str).translate(_COPY_ESCAPES)
+
+
+def _array_literal(values: Sequence[Any]) -> str:
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        else:
+            text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            elements.append(f'"{text}"')
+    return "{" + ",".join(elements) + "}"
+
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_bulk_engine() -> Engine:
+    """
+    Get the process-wide engine used for bulk writes.
+
+    Returns:
+        Shared sync Engine on settings.postgres_url
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine(settings.postgres_url, pool_pre_ping=True)
+        return _engine
+
+
+class BulkWriter:
+    """
+    Upserts record batches into one table.
+
+    Each batch is streamed with COPY into a temporary staging table, then
+    merged with a single ``INSERT ... SELECT ... ON CONFLICT`` and committed,
+    so a batch costs a few round trips however many rows it has. Rows
+    whose conflict key repeats within a batch keep the last record.
+    Conflicting rows are only rewritten when a value changed.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        columns: Sequence[str],
+        conflict_columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        json_columns: Sequence[str] = (),
+        batch_size: Optional[int] = None,
+        engine: Optional[Engine] = None,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            table: Target table, optionally schema-qualified
+            columns: Columns written from each record; missing keys are NULL
+            conflict_columns: Columns of a unique index identifying a row
+            update_columns: Columns overwritten on conflict, defaults to every
+                written column outside the conflict key; empty keeps
+                existing rows untouched
+            json_columns: JSON/JSONB columns, encoded as JSON even when the
+                value is a list
+            batch_size: Records per COPY and merge, defaults to
+                settings.bulk_write_batch_size
+            engine: Database engine, defaults to the shared bulk engine
+
+        Raises:
+            ValueError: If a conflict or update column is not written
+        """
+        self.table = table
+        self.columns = list(columns)
+        self.conflict_columns = list(conflict_columns)
+        if update_columns is None:
+            update_columns = [c for c in self.columns if c not in self.conflict_columns]
+        self.update_columns = list(update_columns)
+        self.batch_size = batch_size or settings.bulk_write_batch_size
+        self._engine = engine
+        self._fields: List[Tuple[str, Callable[[Any], str]]] = [
+            (column, copy_json if column in json_columns else copy_value) for column in self.columns
+        ]
+
+        unknown = set(self.conflict_columns + self.update_columns) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Columns not written to {table}: {sorted(unknown)}")
+        self._copy_sql, self._merge_sql = self._build_sql()
+
+    @property
+    def engine(self) -> Engine:
+        """Database engine, resolved on first use."""
+        if self._engine is None:
+            self._engine = get_bulk_engine()
+        return self._engine
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> UpsertResult:
+        """
+        Upsert records, one transaction per batch.
+
+        Args:
+            records: Cleaned records keyed by column name
+
+        Returns:
+            Inserted, updated and unchanged row counts
+        """
+        result = UpsertResult()
+        batches = 0
+        for batch in self._batches(records):
+            result += self._write_batch(batch)
+            batches += 1
+        logger.info(
+            f"Bulk upserted into {self.table} in {batches} batches: "
+            f"{result.inserted} inserted, {result.updated} updated, "
+            f"{result.unchanged} unchanged"
+        )
+        return result
+
+    def _batches(self, records: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        batch: Dict[tuple, Dict[str, Any]] = {}
+        for record in records:
+            key = tuple(record.get(column) for column in self.conflict_columns)
+            # ON CONFLICT cannot touch the same row twice in one statement
+            batch[key] = record
+            if len(batch) >= self.batch_size:
+                yield list(batch.values())
+                batch = {}
+        if batch:
+            yield list(batch.values())
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> UpsertResult:
+        buffer = io.StringIO()
+        for record in batch:
+            buffer.write("\t".join(encode(record.get(column)) for column, encode in self._fields))
+            buffer.write("\n")
+        buffer.seek(0)
+
+        conn = self.engine.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE TEMP TABLE _bulk_stage ON COMMIT DROP AS "
+                    f"SELECT {self._column_list} FROM {quote_identifier(self.table)} WITH NO DATA"
+                )
+                cursor.copy_expert(self._copy_sql, buffer)
+                cursor.execute(self._merge_sql)
+                inserted, updated = cursor.fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return UpsertResult(inserted, updated, len(batch) - inserted - updated)
+
+    @property
+    def _column_list(self) -> str:
+        return ", ".join(quote_identifier(column) for column in self.columns)
+
+    def _build_sql(self) -> Tuple[str, str]:
+        table = quote_identifier(self.table)
+        columns = self._column_list
+        copy_sql = f"COPY _bulk_stage ({columns}) FROM STDIN"
+
+        conflict = ", ".join(quote_identifier(column) for column in self.conflict_columns)
+        if self.update_columns:
+            updates = [quote_identifier(column) for column in self.update_columns]
+            assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in updates)
+            current = ", ".join(f"{table}.{column}" for column in updates)
+            incoming = ", ".join(f"EXCLUDED.{column}" for column in updates)
+            action = f"DO UPDATE SET {assignments} WHERE ({current}) IS DISTINCT FROM ({incoming})"
+        else:
+            action = "DO NOTHING"
+
+        # xmax is 0 only on rows this statement inserted
+        merge_sql = (
+            f"WITH merged AS ("
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM _bulk_stage "
+            f"ON CONFLICT ({conflict}) {action} "
+            f"RETURNING (xmax = 0) AS inserted) "
+            f"SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) "
+            f"FROM merged"
+        )
+        return copy_sql, merge_sql
+
+
+def bulk_upsert(
+    table: str,
+    records: Iterable[Dict[str, Any]],
+    conflict_columns: Sequence[str],
+    columns: Optional[Sequence[str]] = None,
+    update_columns: Optional[Sequence[str]] = None,
+    json_columns: Sequence[str] = (),
+    batch_size: Optional[int] = None,
+) -> UpsertResult:
+    """
+    Upsert records with a one-off BulkWriter.
+
+    Args:
+        table: Target table
+        records: Cleaned records keyed by column name
+        conflict_columns: Columns of a unique index identifying a row
+        columns: Columns to write, defaults to the keys of the first record
+        update_columns: Columns overwritten on conflict
+        json_columns: JSON/JSONB columns
+        batch_size: Records per batch
+
+    Returns:
+        Inserted, updated and unchanged row counts
+    """
+    records = iter(records)
+    if columns is None:
+        first = next(records, None)
+        if first is None:
+            return UpsertResult()
+        columns = list(first)
+        records = _prepend(first, records)
+    writer = BulkWriter(table, columns, conflict_columns, update_columns, json_columns, batch_size)
+    return writer.write(records)
+
+
+def _prepend(first: Dict[str, Any], rest: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    yield first
+    yield from rest
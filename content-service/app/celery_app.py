@@ -3,6 +3,9 @@ Celery configuration for Content Service
 """
 from celery import Celery
 from app.config import settings
+from app.payload import SERIALIZER, register_serializer
+
+register_serializer()
 
 # Create Celery instance
 celery_app = Celery(
@@ -18,9 +21,9 @@ celery_app = Celery(
 
 # Celery configuration
 celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=settings.celery_serializer,
+    accept_content=["json", SERIALIZER],
+    result_serializer=settings.celery_serializer,
     timezone="Asia/Shanghai",
     enable_utc=True,
     task_track_started=True,
@@ -30,6 +33,11 @@ celery_app.conf.update(
     worker_max_tasks_per_child=100,
     task_acks_late=True,
     broker_connection_retry_on_startup=True,
+    # Crawl tasks are I/O bound and share a per-process event loop
+    # (app.runtime), so they run on a thread pool worker of their own
+    task_routes={
+        "crawler.*": {"queue": "crawl"},
+    },
 )
 
 @celery_app.task(bind=True)
@@ -1,10 +1,25 @@
 """
 Content Cleaner Module
 """
-from .tasks import clean_content, sanitize_html, extract_keywords
+from .tasks import (
+    clean_content,
+    sanitize_html,
+    extract_keywords,
+    extract_keywords_batch,
+    dispatch_keyword_extraction
+)
+from .sanitizer import HTMLSanitizer, sanitize, iter_sanitize
+from .keywords import KeywordExtractor, tokenize
 
 __all__ = [
     "clean_content",
     "sanitize_html",
-    "extract_keywords"
+    "extract_keywords",
+    "extract_keywords_batch",
+    "dispatch_keyword_extraction",
+    "HTMLSanitizer",
+    "sanitize",
+    "iter_sanitize",
+    "KeywordExtractor",
+    "tokenize"
 ]
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Keyword extraction: Chinese-aware tokenization, an incrementally updated
+document-frequency table, and TF-IDF plus TextRank scoring over sparse vectors
+
+Per-article cost depends only on the article: scoring reads document
+frequencies for the article's own terms (one HMGET), never the whole corpus.
+"""
+import hashlib
+import math
+import re
+from collections import Counter, defaultdict
+from html import unescape
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import redis
+
+from app.config import settings
+
+try:
+    import jieba
+    jieba.setLogLevel(60)
+except ImportError:  # pragma: no cover - fallback when jieba is not installed
+    jieba = None
+
+DF_KEY = "keywords:df"
+DOC_COUNT_KEY = "keywords:docs"
+COUNTED_KEY = "keywords:counted"  # digests of document ids already in the DF table
+
+STOPWORDS = frozenset("""
+的 了 和 是 在 也 有 就 不 都 而 及 与 着 或 一个 没有 我们 你们 他们 她们 它们 这个 那个
+这些 那些 自己 什么 因为 所以 但是 如果 虽然 以及 其中 之后 之前 已经 可以 进行 表示 认为
+通过 对于 由于 目前 今年 去年 同时 此外 相关 方面 记者 报道 来源 编辑 责任 图片 点击 阅读
+原文 公众号 关注 分享 the a an and or of to in on for is are was were be by with as at from
+that this it its not but if then so than into about over
+""".split())
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_CJK_RUN = re.compile(r"[一-鿿]+")
+_TOKEN_PATTERN = re.compile(r"[一-鿿]+|[A-Za-z][A-Za-z0-9\-\.]*[A-Za-z0-9]|[A-Za-z]")
+_WORD = re.compile(r"[\w\-\.]+")
+_NUMERIC = re.compile(r"^[\d\.\-%_]+$")
+
+
+def html_to_text(html_content: str) -> str:
+    """Plain text of an HTML fragment for keyword extraction"""
+    return unescape(_TAG_PATTERN.sub(" ", html_content))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into candidate keyword tokens in document order.
+
+    Uses jieba for Chinese when available, otherwise falls back to CJK
+    bigrams. Stopwords, numbers and single characters are dropped.
+    """
+    if jieba is not None:
+        raw = jieba.lcut(text)
+    else:
+        raw = []
+        for match in _TOKEN_PATTERN.finditer(text):
+            token = match.group()
+            if _CJK_RUN.fullmatch(token) and len(token) > 2:
+                raw.extend(token[i:i + 2] for i in range(len(token) - 1))
+            else:
+                raw.append(token)
+
+    tokens = []
+    for token in raw:
+        token = token.strip().lower()
+        if len(token) < 2 or token in STOPWORDS or _NUMERIC.match(token):
+            continue
+        if not _WORD.fullmatch(token):
+            continue
+        tokens.append(token)
+    return tokens
+
+
+def tfidf_scores(tokens: Sequence[str], df: Dict[str, int], doc_count: int) -> Dict[str, float]:
+    """Sparse TF-IDF vector for one document"""
+    counts = Counter(tokens)
+    total = len(tokens) or 1
+    return {
+        term: (count / total) * (math.log((doc_count + 1) / (df.get(term, 0) + 1)) + 1)
+        for term, count in counts.items()
+    }
+
+
+def textrank_scores(
+    tokens: Sequence[str],
+    window: int = 5,
+    damping: float = 0.85,
+    iterations: int = 30,
+    tolerance: float = 1e-4
+) -> Dict[str, float]:
+    """TextRank over the token co-occurrence graph, stored as sparse adjacency"""
+    graph: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for i, term in enumerate(tokens):
+        for other in tokens[i + 1:i + window]:
+            if other != term:
+                graph[term][other] += 1.0
+                graph[other][term] += 1.0
+
+    if not graph:
+        return {term: 1.0 for term in set(tokens)}
+
+    out_weight = {term: sum(edges.values()) for term, edges in graph.items()}
+    scores = {term: 1.0 for term in graph}
+    for _ in range(iterations):
+        delta = 0.0
+        new_scores = {}
+        for term, edges in graph.items():
+            rank = sum(weight / out_weight[other] * scores[other] for other, weight in edges.items())
+            new_scores[term] = (1 - damping) + damping * rank
+            delta = max(delta, abs(new_scores[term] - scores[term]))
+        scores = new_scores
+        if delta < tolerance:
+            break
+    return scores
+
+
+def combine_scores(
+    tfidf: Dict[str, float],
+    textrank: Dict[str, float],
+    weight: float = 0.5
+) -> Dict[str, float]:
+    """Blend max-normalized TF-IDF and TextRank scores"""
+    tfidf_max = max(tfidf.values(), default=0.0) or 1.0
+    textrank_max = max(textrank.values(), default=0.0) or 1.0
+    return {
+        term: weight * tfidf.get(term, 0.0) / tfidf_max
+        + (1 - weight) * textrank.get(term, 0.0) / textrank_max
+        for term in tfidf.keys() | textrank.keys()
+    }
+
+
+class KeywordExtractor:
+    """Extracts keywords against a Redis-backed document-frequency table"""
+
+    def __init__(self, client: Optional[redis.Redis] = None, weight: float = 0.5):
+        self.client = client or redis.from_url(settings.redis_url, decode_responses=True)
+        self.weight = weight
+
+    def extract(
+        self,
+        text: str,
+        max_keywords: int = 10,
+        doc_id: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Top keywords for one text, counting it into the corpus if it has a new doc_id"""
+        return self.extract_batch([text], max_keywords, [doc_id])[0]
+
+    def extract_batch(
+        self,
+        texts: Sequence[str],
+        max_keywords: int = 10,
+        doc_ids: Optional[Sequence[Optional[str]]] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Top keywords for many texts.
+
+        Texts with a document id (such as the article URL) seen for the first
+        time are counted into the document-frequency table; texts without one,
+        and documents already counted, are only scored, so re-cleaning a
+        document or extracting its keywords again does not skew IDF.
+
+        The whole batch costs at most three Redis round trips: one to claim the
+        new document ids, one pipeline to count those documents into the
+        document-frequency table and one to read frequencies for the batch's
+        distinct terms.
+        """
+        docs = [tokenize(text or "") for text in texts]
+        doc_terms = [set(tokens) for tokens in docs]
+        vocabulary = sorted(set().union(*doc_terms)) if doc_terms else []
+
+        new_docs = [terms for terms, is_new in zip(doc_terms, self._claim(doc_ids)) if is_new]
+        if new_docs:
+            batch_df = Counter(term for terms in new_docs for term in terms)
+            pipe = self.client.pipeline(transaction=False)
+            for term, count in batch_df.items():
+                pipe.hincrby(DF_KEY, term, count)
+            pipe.incrby(DOC_COUNT_KEY, len(new_docs))
+            pipe.execute()
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(DOC_COUNT_KEY)
+        if vocabulary:
+            pipe.hmget(DF_KEY, vocabulary)
+        results = pipe.execute()
+        doc_count = int(results[0] or 0)
+        df = {
+            term: int(value)
+            for term, value in zip(vocabulary, results[1] if vocabulary else [])
+            if value
+        }
+
+        keywords = []
+        for tokens in docs:
+            scores = combine_scores(
+                tfidf_scores(tokens, df, doc_count),
+                textrank_scores(tokens),
+                self.weight
+            )
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            keywords.append([(term, round(score, 4)) for term, score in ranked[:max_keywords]])
+        return keywords
+
+
+    def _claim(self, doc_ids: Optional[Sequence[Optional[str]]]) -> List[bool]:
+        """Whether each document id is new to the DF table, marking new ones as counted"""
+        if not doc_ids or not any(doc_ids):
+            return [False] * len(doc_ids or ())
+        pipe = self.client.pipeline(transaction=False)
+        for doc_id in doc_ids:
+            if doc_id:
+                pipe.sadd(COUNTED_KEY, hashlib.blake2b(doc_id.encode(), digest_size=16).hexdigest())
+        added = iter(pipe.execute())
+        return [bool(next(added)) if doc_id else False for doc_id in doc_ids]
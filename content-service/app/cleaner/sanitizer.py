@@ -0,0 +1,161 @@
+"""
+Allowlist-based streaming HTML sanitizer
+
+Built on the incremental tokenizer in `html.parser`: input is fed in chunks
+and safe markup is emitted as soon as each token is complete, so a page is
+never held as a DOM. Memory is bounded by the open-tag stack (capped at
+MAX_DEPTH) and the tokenizer's buffer for a single incomplete token.
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ALLOWED_TAGS: FrozenSet[str] = frozenset({
+    "a", "abbr", "b", "blockquote", "br", "caption", "code", "dd", "del", "div",
+    "dl", "dt", "em", "figcaption", "figure", "h1", "h2", "h3", "h4", "h5", "h6",
+    "hr", "i", "img", "ins", "li", "ol", "p", "pre", "q", "s", "section", "small",
+    "span", "strong", "sub", "sup", "table", "tbody", "td", "tfoot", "th", "thead",
+    "tr", "u", "ul",
+})
+
+# Tags whose entire content is discarded, not just the tags themselves
+DROP_CONTENT_TAGS: FrozenSet[str] = frozenset({
+    "script", "style", "iframe", "object", "embed", "noscript", "template",
+    "svg", "math", "textarea", "select", "head", "title", "frameset",
+})
+
+VOID_TAGS: FrozenSet[str] = frozenset({"br", "hr", "img"})
+
+ALLOWED_ATTRIBUTES: Dict[str, FrozenSet[str]] = {
+    "*": frozenset({"title"}),
+    "a": frozenset({"href", "title"}),
+    "img": frozenset({"src", "alt", "title", "width", "height"}),
+    "td": frozenset({"colspan", "rowspan"}),
+    "th": frozenset({"colspan", "rowspan", "scope"}),
+}
+
+URL_ATTRIBUTES: FrozenSet[str] = frozenset({"href", "src"})
+
+ALLOWED_SCHEMES: FrozenSet[str] = frozenset({"http", "https", "mailto", ""})
+
+# Deeper nesting than this is flattened rather than tracked
+MAX_DEPTH = 256
+
+# Characters browsers ignore inside a URL scheme ("java\tscript:")
+_URL_IGNORED_CHARS = re.compile(r"[\x00-\x20\x7f]+")
+
+class HTMLSanitizer(HTMLParser):
+    """Incremental sanitizer: feed() returns the safe output for what was fed so far"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._out: List[str] = []
+        self._stack: List[str] = []
+        self._drop_depth = 0
+
+    def feed(self, data: str) -> str:
+        """Tokenize a chunk and return the sanitized markup it completed"""
+        super().feed(data)
+        return self._drain()
+
+    def close(self) -> str:
+        """Flush buffered input and close any tags left open"""
+        super().close()
+        while self._stack:
+            self._out.append(f"</{self._stack.pop()}>")
+        return self._drain()
+
+    def _drain(self) -> str:
+        out = "".join(self._out)
+        self._out.clear()
+        return out
+
+    def _clean_attrs(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> str:
+        allowed = ALLOWED_ATTRIBUTES.get(tag, frozenset()) | ALLOWED_ATTRIBUTES["*"]
+        values = dict(attrs)
+        # WeChat article images are lazy-loaded from data-src
+        if tag == "img" and not values.get("src") and values.get("data-src"):
+            attrs = [*attrs, ("src", values["data-src"])]
+
+        parts = []
+        seen = set()
+        for name, value in attrs:
+            if name not in allowed or name in seen or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not _is_safe_url(value):
+                continue
+            seen.add(name)
+            parts.append(f' {name}="{escape(value, quote=True)}"')
+        return "".join(parts)
+
+    def _emit_start(self, tag: str, attrs: List[Tuple[str, Optional[str]]], self_closing: bool):
+        if self._drop_depth or tag not in ALLOWED_TAGS:
+            return
+        if tag in VOID_TAGS or self_closing:
+            self._out.append(f"<{tag}{self._clean_attrs(tag, attrs)}>")
+            if tag not in VOID_TAGS:
+                self._out.append(f"</{tag}>")
+            return
+        if len(self._stack) >= MAX_DEPTH:
+            return
+        self._stack.append(tag)
+        self._out.append(f"<{tag}{self._clean_attrs(tag, attrs)}>")
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth += 1
+            return
+        self._emit_start(tag, attrs, self_closing=False)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag in DROP_CONTENT_TAGS:
+            return
+        self._emit_start(tag, attrs, self_closing=True)
+
+    def handle_endtag(self, tag: str):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth = max(0, self._drop_depth - 1)
+            return
+        if self._drop_depth or tag not in self._stack:
+            return
+        # Close anything left open inside this element, keeping output balanced
+        while self._stack:
+            open_tag = self._stack.pop()
+            self._out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data: str):
+        if not self._drop_depth:
+            self._out.append(escape(data, quote=False))
+
+def _is_safe_url(value: str) -> bool:
+    """Allow only relative URLs and allowlisted schemes"""
+    try:
+        scheme = urlsplit(_URL_IGNORED_CHARS.sub("", value)).scheme.lower()
+    except ValueError:
+        return False
+    return scheme in ALLOWED_SCHEMES
+
+def iter_sanitize(chunks: Iterable[str]) -> Iterator[str]:
+    """Sanitize a stream of HTML chunks, yielding safe output as it is produced"""
+    sanitizer = HTMLSanitizer()
+    for chunk in chunks:
+        out = sanitizer.feed(chunk)
+        if out:
+            yield out
+    out = sanitizer.close()
+    if out:
+        yield out
+
+def sanitize(html_content: str, chunk_size: int = 64 * 1024) -> str:
+    """Sanitize an HTML document in one call"""
+    if not html_content:
+        return ""
+    chunks = (
+        html_content[i:i + chunk_size]
+        for i in range(0, len(html_content), chunk_size)
+    )
+    return "".join(iter_sanitize(chunks))
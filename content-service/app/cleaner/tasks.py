@@ -1,51 +1,65 @@
 """
 Content cleaner Celery tasks
 """
-from celery import current_task
 from app.celery_app import celery_app
+from app.progress import ProgressReporter
+from celery import group
+from celery.result import GroupResult
+from .keywords import KeywordExtractor, html_to_text
+from .sanitizer import sanitize
+from datetime import datetime
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import html
 
 logger = logging.getLogger(__name__)
 
+# Articles per worker task when a batch is fanned out across the pool
+KEYWORD_CHUNK_SIZE = 200
+
+_extractor: Optional[KeywordExtractor] = None
+
+def _get_extractor() -> KeywordExtractor:
+    """Process-wide keyword extractor sharing one Redis connection pool"""
+    global _extractor
+    if _extractor is None:
+        _extractor = KeywordExtractor()
+    return _extractor
+
 @celery_app.task(bind=True, name="cleaner.clean_content")
 def clean_content(self, content: Dict[str, Any]):
     """Clean and normalize content"""
+    progress = ProgressReporter(self.request.id)
     try:
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'current': 0, 'total': 100, 'status': 'Starting cleaning'}
-        )
+        progress.update(0, 'Starting cleaning')
         
         content_type = content.get('type', 'text')
         
         # Sanitize HTML
-        if 'html' in content:
-            current_task.update_state(
-                state='PROGRESS',
-                meta={'current': 30, 'total': 100, 'status': 'Sanitizing HTML'}
-            )
-            content['html'] = sanitize_html(content['html'])
+        if content.get('html'):
+            progress.update(30, 'Sanitizing HTML')
+            content['html'] = sanitize(content['html'])
         
         # Clean text
         if 'text' in content:
-            current_task.update_state(
-                state='PROGRESS',
-                meta={'current': 60, 'total': 100, 'status': 'Cleaning text'}
-            )
+            progress.update(60, 'Cleaning text')
             content['text'] = html.escape(content['text'])
         
         # Extract metadata
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'current': 90, 'total': 100, 'status': 'Extracting metadata'}
-        )
+        progress.update(90, 'Extracting metadata')
+        source_text = content.get('text') or html_to_text(content.get('html') or '')
+        # Pages from the frontier drain get keywords from the batched pipeline
+        if source_text and content.get('extract_keywords', True):
+            # Crawled pages count into document frequency once per URL;
+            # ad-hoc content from the API is only scored
+            keywords = _get_extractor().extract(source_text, doc_id=content.get('url'))
+            content['keywords'] = [term for term, _ in keywords]
         
         # Add cleaning metadata
         content['cleaned_at'] = datetime.utcnow().isoformat()
         content['cleaned'] = True
         
+        progress.finish('Cleaning completed')
         return {
             'status': 'success',
             'content_type': content_type,
@@ -54,6 +68,7 @@ def clean_content(self, content: Dict[str, Any]):
         
     except Exception as e:
         logger.error(f"Content cleaning failed: {str(e)}")
+        progress.finish('Cleaning failed', error=str(e))
         return {
             'status': 'error',
             'error': str(e)
@@ -62,14 +77,42 @@ def clean_content(self, content: Dict[str, Any]):
 @celery_app.task(name="cleaner.sanitize_html")
 def sanitize_html(html_content: str) -> str:
     """Sanitize HTML content"""
-    # Implement HTML sanitization logic here
-    # For now, return as-is (in production use a library like bleach)
-    return html_content
+    return sanitize(html_content)
 
 @celery_app.task(name="cleaner.extract_keywords")
 def extract_keywords(text: str, max_keywords: int = 10) -> list:
-    """Extract keywords from text"""
-    # Implement keyword extraction logic here
-    # For now, return mock keywords
-    words = text.split()[:max_keywords]
-    return list(set(words))
\ No newline at end of file
+    """Extract keywords from text without counting it into document frequency"""
+    return [term for term, _ in _get_extractor().extract(text, max_keywords)]
+
+@celery_app.task(name="cleaner.extract_keywords_batch")
+def extract_keywords_batch(
+    texts: List[str],
+    max_keywords: int = 10,
+    doc_ids: Optional[List[Optional[str]]] = None
+) -> List[list]:
+    """
+    Extract keywords for a batch of texts in a few Redis round trips.
+
+    Texts with a document id (the article URL for crawled pages) are counted
+    into document frequency the first time that id is seen.
+    """
+    return [
+        [term for term, _ in keywords]
+        for keywords in _get_extractor().extract_batch(texts, max_keywords, doc_ids)
+    ]
+
+def dispatch_keyword_extraction(
+    texts: List[str],
+    max_keywords: int = 10,
+    chunk_size: int = KEYWORD_CHUNK_SIZE,
+    doc_ids: Optional[List[Optional[str]]] = None
+) -> GroupResult:
+    """Fan a large batch out over the worker pool in chunks; results keep input order"""
+    return group(
+        extract_keywords_batch.s(
+            texts[i:i + chunk_size],
+            max_keywords,
+            doc_ids[i:i + chunk_size] if doc_ids else None
+        )
+        for i in range(0, len(texts), chunk_size)
+    ).apply_async()
@@ -1,13 +1,15 @@
 """
 Content Crawler Module
 """
-from .tasks import start_crawler, crawl_article, crawl_video
-from .models import CrawlSource, CrawlTask
+from .tasks import start_crawler, crawl_article, crawl_video, drain_frontier
+from .models import CrawlSource, CrawlTask, UrlCrawlState
 
 __all__ = [
     "start_crawler",
     "crawl_article",
     "crawl_video",
+    "drain_frontier",
     "CrawlSource",
-    "CrawlTask"
+    "CrawlTask",
+    "UrlCrawlState"
 ]
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Asyncio fetcher pool that drains the crawl frontier
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from .models import SourceType, UrlCrawlState
+from .state import CrawlStateStore, conditional_headers, record_response
+
+logger = logging.getLogger(__name__)
+
+# Longest a worker idles waiting for the next host to become ready
+MAX_IDLE_SECONDS = 1.0
+
+# Statuses that will not fix themselves; such URLs are retried at the longest interval
+PERMANENT_ERROR_STATUSES = frozenset({404, 410})
+
+
+async def fetch_if_changed(client: httpx.AsyncClient, state) -> Optional[httpx.Response]:
+    """
+    Conditionally fetch a source or URL and update its crawl state.
+
+    Returns the response only when the content changed, so unchanged pages
+    are never parsed.
+    """
+    response = await client.get(state.url, headers=conditional_headers(state))
+    if response.status_code != 304:
+        response.raise_for_status()
+    changed = record_response(
+        state,
+        response.status_code,
+        response.headers,
+        response.content if response.status_code != 304 else None
+    )
+    return response if changed else None
+
+
+class FrontierFetcher:
+    """
+    Pool of asyncio workers sharing one pooled HTTP client.
+
+    Each worker pops the next ready URL from the frontier, which enforces
+    per-host delay and concurrency, fetches it conditionally and reschedules
+    it at its adaptive next crawl time.
+    """
+
+    def __init__(self, store: Optional[CrawlStateStore] = None, concurrency: Optional[int] = None):
+        self.store = store or CrawlStateStore()
+        self.frontier = self.store.frontier
+        self.concurrency = concurrency or settings.crawl_fetcher_concurrency
+        self.stats: Dict[str, int] = {"fetched": 0, "changed": 0, "unchanged": 0, "failed": 0}
+        # (url, text) of changed articles waiting for batched keyword extraction
+        self._keyword_docs: List[Tuple[str, str]] = []
+
+    async def run(self, client: httpx.AsyncClient, max_seconds: Optional[float] = None) -> Dict[str, int]:
+        """Drain due URLs until the frontier is idle or max_seconds elapse"""
+        deadline = time.time() + (max_seconds or settings.crawl_drain_seconds)
+        workers = [
+            asyncio.create_task(self._worker(client, deadline))
+            for _ in range(self.concurrency)
+        ]
+        results = await asyncio.gather(*workers, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Frontier worker stopped: {result!r}")
+        await self._flush_keywords()
+        logger.info(f"Frontier drain finished: {self.stats}")
+        return self.stats
+
+    async def _worker(self, client: httpx.AsyncClient, deadline: float):
+        """Fetch URLs one at a time until nothing is due before the deadline"""
+        while time.time() < deadline:
+            item = await asyncio.to_thread(self.frontier.pop)
+            if item is None:
+                next_due = await asyncio.to_thread(self.frontier.next_due)
+                if next_due is None or next_due >= deadline:
+                    return
+                await asyncio.sleep(min(MAX_IDLE_SECONDS, max(0.05, next_due - time.time())))
+                continue
+
+            host, url = item
+            try:
+                await self._crawl(client, url)
+            finally:
+                await asyncio.to_thread(self.frontier.release, host)
+
+    async def _crawl(self, client: httpx.AsyncClient, url: str):
+        """
+        Fetch one URL and hand changed content to the cleaner.
+
+        The URL was popped off the frontier, so it is always queued again:
+        at its adaptive next crawl time on success, or one interval later
+        on any error.
+        """
+        state: Optional[UrlCrawlState] = None
+        rescheduled = False
+        try:
+            state = await asyncio.to_thread(self.store.get_url, url)
+            response = await fetch_if_changed(client, state)
+
+            self.stats["fetched"] += 1
+            await asyncio.to_thread(self.store.save_url, state)
+            rescheduled = True
+
+            if response is None:
+                self.stats["unchanged"] += 1
+                return
+
+            self.stats["changed"] += 1
+            await asyncio.to_thread(self._dispatch_changed, state, response)
+            await self._queue_keywords(state, response)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Crawl failed for {url}: {e!r}")
+            if (
+                state is not None
+                and isinstance(e, httpx.HTTPStatusError)
+                and e.response.status_code in PERMANENT_ERROR_STATUSES
+            ):
+                state.interval_minutes = settings.crawl_max_interval_minutes
+        finally:
+            if not rescheduled:
+                await self._retry_later(url, state)
+
+    async def _retry_later(self, url: str, state: Optional[UrlCrawlState]):
+        """Put a failed URL back on the frontier one interval from now"""
+        interval = state.interval_minutes if state else settings.crawl_min_interval_minutes
+        try:
+            if state is None:
+                due_at = time.time() + interval * 60
+                await asyncio.to_thread(self.frontier.schedule, [(url, due_at)])
+            else:
+                state.next_crawl_time = datetime.utcnow() + timedelta(minutes=interval)
+                await asyncio.to_thread(self.store.save_url, state)
+        except Exception as e:
+            logger.error(f"Could not reschedule {url}: {e!r}")
+
+    def _dispatch_changed(self, state: UrlCrawlState, response: httpx.Response):
+        """Send changed article pages on to cleaning"""
+        if state.source_type == SourceType.VIDEO:
+            return
+        from app.cleaner.tasks import clean_content
+        clean_content.delay({
+            "type": "html",
+            "url": state.url,
+            "source_id": state.source_id,
+            "html": response.text,
+            "extract_keywords": False
+        })
+
+    async def _queue_keywords(self, state: UrlCrawlState, response: httpx.Response):
+        """Buffer a changed article for keyword extraction, flushing full chunks"""
+        if state.source_type == SourceType.VIDEO:
+            return
+        from app.cleaner.keywords import html_to_text
+        from app.cleaner.tasks import KEYWORD_CHUNK_SIZE
+        self._keyword_docs.append((state.url, html_to_text(response.text)))
+        if len(self._keyword_docs) >= KEYWORD_CHUNK_SIZE:
+            await self._flush_keywords()
+
+    async def _flush_keywords(self):
+        """
+        Send buffered articles to the worker pool for keyword extraction.
+
+        Each article is counted into document frequency once, keyed by its URL.
+        """
+        docs, self._keyword_docs = self._keyword_docs, []
+        if not docs:
+            return
+        from app.cleaner.tasks import dispatch_keyword_extraction
+        urls, texts = zip(*docs)
+        try:
+            await asyncio.to_thread(
+                dispatch_keyword_extraction, list(texts), doc_ids=list(urls)
+            )
+        except Exception as e:
+            logger.error(f"Keyword extraction dispatch failed for {len(docs)} articles: {e!r}")
@@ -0,0 +1,195 @@
+"""
+Persistent crawl frontier: per-host due-time queues with politeness limits
+and Bloom filter URL dedup, stored in Redis
+"""
+import hashlib
+import math
+import time
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import redis
+
+from app.config import settings
+
+HOSTS_KEY = "crawler:frontier:hosts"
+HOST_QUEUE_KEY = "crawler:frontier:host:"
+HOST_READY_KEY = "crawler:frontier:ready"
+HOST_INFLIGHT_KEY = "crawler:frontier:inflight"
+BLOOM_KEY = "crawler:frontier:bloom"
+
+# Add URLs to a host queue and move the host to max(earliest due, politeness ready time)
+# KEYS: hosts zset, ready hash, host queue
+# ARGV: host, then (due, url) pairs
+_SCHEDULE_SCRIPT = """
+for i = 2, #ARGV, 2 do
+    redis.call('ZADD', KEYS[3], ARGV[i], ARGV[i + 1])
+end
+local head = redis.call('ZRANGE', KEYS[3], 0, 0, 'WITHSCORES')
+local ready = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+redis.call('ZADD', KEYS[1], math.max(tonumber(head[2]), ready), ARGV[1])
+return #head
+"""
+
+# Pop one due URL from the first host that is ready and under its concurrency limit
+# KEYS: hosts zset, ready hash, inflight hash
+# ARGV: now, host delay seconds, max inflight per host, host queue prefix, hosts to scan
+_POP_SCRIPT = """
+local now = tonumber(ARGV[1])
+local hosts = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[5]))
+for _, host in ipairs(hosts) do
+    local inflight = tonumber(redis.call('HGET', KEYS[3], host) or '0')
+    if inflight < tonumber(ARGV[3]) then
+        local queue = ARGV[4] .. host
+        local head = redis.call('ZRANGE', queue, 0, 0, 'WITHSCORES')
+        if #head == 0 then
+            redis.call('ZREM', KEYS[1], host)
+        elseif tonumber(head[2]) > now then
+            redis.call('ZADD', KEYS[1], head[2], host)
+        else
+            redis.call('ZREM', queue, head[1])
+            redis.call('HINCRBY', KEYS[3], host, 1)
+            local ready = now + tonumber(ARGV[2])
+            redis.call('HSET', KEYS[2], host, ready)
+            local nxt = redis.call('ZRANGE', queue, 0, 0, 'WITHSCORES')
+            if #nxt == 0 then
+                redis.call('ZREM', KEYS[1], host)
+            else
+                redis.call('ZADD', KEYS[1], math.max(ready, tonumber(nxt[2])), host)
+            end
+            return {host, head[1]}
+        end
+    end
+end
+return false
+"""
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL for dedup: lowercase scheme/host, drop fragment and default ports"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def url_host(url: str) -> str:
+    """Politeness key for a URL"""
+    return urlsplit(url).netloc.lower()
+
+
+class BloomFilter:
+    """Bloom filter on a Redis bitmap, shared by every crawler process"""
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        key: str = BLOOM_KEY,
+        capacity: Optional[int] = None,
+        error_rate: Optional[float] = None
+    ):
+        capacity = capacity or settings.crawl_bloom_capacity
+        error_rate = error_rate or settings.crawl_bloom_error_rate
+        self.client = client
+        self.key = key
+        self.num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+
+    def _offsets(self, item: str) -> List[int]:
+        """Bit offsets via double hashing of one 128-bit digest"""
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add_many(self, items: List[str]) -> List[bool]:
+        """Add items; True for each item that was definitely not present before"""
+        if not items:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for item in items:
+            for offset in self._offsets(item):
+                pipe.setbit(self.key, offset, 1)
+        old_bits = pipe.execute()
+        k = self.num_hashes
+        return [not all(old_bits[i * k:(i + 1) * k]) for i in range(len(items))]
+
+    def contains(self, item: str) -> bool:
+        """True if the item was probably added before"""
+        pipe = self.client.pipeline(transaction=False)
+        for offset in self._offsets(item):
+            pipe.getbit(self.key, offset)
+        return all(pipe.execute())
+
+
+class CrawlFrontier:
+    """
+    Due-time priority queue of URLs, partitioned per host.
+
+    A global sorted set orders hosts by the earliest time they may be fetched
+    again: the later of their next due URL and the politeness delay after the
+    previous fetch. Popping is a single Lua call, so any number of fetchers
+    across processes share the per-host rate and concurrency limits.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.client = client or redis.from_url(settings.redis_url, decode_responses=True)
+        self.bloom = BloomFilter(self.client)
+        self._schedule = self.client.register_script(_SCHEDULE_SCRIPT)
+        self._pop = self.client.register_script(_POP_SCRIPT)
+
+    def schedule(self, urls: Iterable[Tuple[str, float]]) -> int:
+        """Queue (url, due timestamp) pairs, replacing the due time of queued URLs"""
+        by_host = {}
+        for url, due_at in urls:
+            by_host.setdefault(url_host(url), []).extend([due_at, url])
+        pipe = self.client.pipeline(transaction=False)
+        for host, args in by_host.items():
+            self._schedule(
+                keys=[HOSTS_KEY, HOST_READY_KEY, HOST_QUEUE_KEY + host],
+                args=[host, *args],
+                client=pipe
+            )
+        pipe.execute()
+        return sum(len(args) // 2 for args in by_host.values())
+
+    def add_new(self, urls: List[str], due_at: Optional[float] = None) -> List[str]:
+        """Queue URLs never seen before (Bloom filter dedup); returns the new ones"""
+        urls = list(dict.fromkeys(canonicalize_url(url) for url in urls))
+        new_urls = [url for url, is_new in zip(urls, self.bloom.add_many(urls)) if is_new]
+        due_at = due_at or time.time()
+        self.schedule((url, due_at) for url in new_urls)
+        return new_urls
+
+    def pop(self, now: Optional[float] = None) -> Optional[Tuple[str, str]]:
+        """Take the next fetchable (host, url), or None if nothing is ready"""
+        result = self._pop(
+            keys=[HOSTS_KEY, HOST_READY_KEY, HOST_INFLIGHT_KEY],
+            args=[
+                now or time.time(),
+                settings.crawl_host_delay_seconds,
+                settings.crawl_host_concurrency,
+                HOST_QUEUE_KEY,
+                settings.crawl_frontier_scan_hosts
+            ]
+        )
+        return tuple(result) if result else None
+
+    def release(self, host: str):
+        """Mark a fetch for host as finished"""
+        self.client.hincrby(HOST_INFLIGHT_KEY, host, -1)
+
+    def reset_inflight(self):
+        """Clear in-flight counters left behind by a crashed drain"""
+        self.client.delete(HOST_INFLIGHT_KEY)
+
+    def next_due(self) -> Optional[float]:
+        """Earliest time any host becomes fetchable"""
+        head = self.client.zrange(HOSTS_KEY, 0, 0, withscores=True)
+        return head[0][1] if head else None
+
+    def size(self) -> int:
+        """Number of hosts with queued URLs"""
+        return self.client.zcard(HOSTS_KEY)
@@ -28,8 +28,27 @@ class CrawlSource(BaseModel):
     interval_minutes: int = 60
     is_active: bool = True
     last_crawl_time: Optional[datetime] = None
+    next_crawl_time: Optional[datetime] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
     config: Dict[str, Any] = Field(default_factory=dict)
 
+class UrlCrawlState(BaseModel):
+    """Incremental crawl state for a single URL"""
+    url: str
+    source_id: Optional[str] = None
+    source_type: SourceType = SourceType.ARTICLE
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    interval_minutes: int = 60
+    last_crawl_time: Optional[datetime] = None
+    last_changed_time: Optional[datetime] = None
+    next_crawl_time: Optional[datetime] = None
+    check_count: int = 0
+    change_count: int = 0
+
 class CrawlTask(BaseModel):
     """Crawl task definition"""
     task_id: str
@@ -39,5 +58,6 @@ class CrawlTask(BaseModel):
     completed_at: Optional[datetime] = None
     items_found: int = 0
     items_processed: int = 0
+    items_unchanged: int = 0
     error: Optional[str] = None
     result_urls: list[str] = Field(default_factory=list)
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+Incremental crawl state: conditional request validators, change detection
+and adaptive revisit intervals, persisted in Redis
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Mapping, Optional
+
+import redis
+
+from app.config import settings
+from .frontier import CrawlFrontier
+from .models import CrawlSource, SourceType, UrlCrawlState
+
+URL_STATE_KEY = "crawler:url:{}"
+SOURCE_STATE_KEY = "crawler:source:{}"
+DUE_SOURCES_KEY = "crawler:due:sources"
+
+
+def url_key(url: str) -> str:
+    """Stable short key for a URL"""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def content_hash(body: bytes) -> str:
+    """Hash of a response body used to detect unchanged pages"""
+    return hashlib.sha256(body).hexdigest()
+
+
+def due_score(when: Optional[datetime] = None) -> float:
+    """
+    Due-queue score for a naive UTC time, or for now.
+
+    Scores are Unix timestamps, like the frontier's time.time() scores.
+    Calling .timestamp() on a naive datetime would read it as local time
+    and shift every due time by the container's UTC offset.
+    """
+    if when is None:
+        return datetime.now(timezone.utc).timestamp()
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+def conditional_headers(state) -> Dict[str, str]:
+    """Build If-None-Match / If-Modified-Since headers from stored validators"""
+    headers = {}
+    if state.etag:
+        headers["If-None-Match"] = state.etag
+    if state.last_modified:
+        headers["If-Modified-Since"] = state.last_modified
+    return headers
+
+
+def adapt_interval(interval_minutes: int, changed: bool) -> int:
+    """Halve the revisit interval on change, grow it by half when unchanged"""
+    if changed:
+        interval_minutes = interval_minutes // 2
+    else:
+        interval_minutes = int(interval_minutes * 1.5)
+    return max(
+        settings.crawl_min_interval_minutes,
+        min(settings.crawl_max_interval_minutes, interval_minutes)
+    )
+
+
+def record_response(
+    state,
+    status_code: int,
+    headers: Mapping[str, str],
+    body: Optional[bytes] = None,
+    now: Optional[datetime] = None
+) -> bool:
+    """
+    Update a URL or source state from a fetch result.
+
+    Returns True when the content changed and should be parsed. A 304, or a
+    200 whose body hashes to the stored value, counts as unchanged.
+    """
+    now = now or datetime.utcnow()
+
+    changed = False
+    if status_code != 304 and body is not None:
+        digest = content_hash(body)
+        changed = digest != state.content_hash
+        state.content_hash = digest
+
+    # Keep the previous validators if the server omitted them on a 304
+    state.etag = headers.get("etag") or state.etag
+    state.last_modified = headers.get("last-modified") or state.last_modified
+
+    state.interval_minutes = adapt_interval(state.interval_minutes, changed)
+    state.last_crawl_time = now
+    state.next_crawl_time = now + timedelta(minutes=state.interval_minutes)
+
+    if isinstance(state, UrlCrawlState):
+        state.check_count += 1
+        if changed:
+            state.change_count += 1
+            state.last_changed_time = now
+
+    return changed
+
+
+class CrawlStateStore:
+    """
+    Redis-backed store for per-source and per-URL crawl state.
+
+    URL revisits are scheduled on the crawl frontier; sources keep their own
+    due queue since there are few of them.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        self.client = client or redis.from_url(settings.redis_url, decode_responses=True)
+        self.frontier = CrawlFrontier(self.client)
+
+    def get_url(self, url: str, source_id: Optional[str] = None) -> UrlCrawlState:
+        """Load state for a URL, or a fresh state if it has never been crawled"""
+        raw = self.client.get(URL_STATE_KEY.format(url_key(url)))
+        if raw:
+            return UrlCrawlState.model_validate_json(raw)
+        return UrlCrawlState(
+            url=url,
+            source_id=source_id,
+            interval_minutes=settings.crawl_min_interval_minutes
+        )
+
+    def save_url(self, state: UrlCrawlState):
+        """Persist URL state and queue its next visit on the frontier"""
+        due_at = due_score(state.next_crawl_time)
+        self.client.set(URL_STATE_KEY.format(url_key(state.url)), state.model_dump_json())
+        self.frontier.schedule([(state.url, due_at)])
+
+    def add_urls(
+        self,
+        urls: List[str],
+        source_id: Optional[str] = None,
+        source_type: SourceType = SourceType.ARTICLE
+    ) -> List[str]:
+        """
+        Register discovered URLs and queue the unseen ones on the frontier.
+
+        URLs that are already known keep their adaptive schedule. Returns the
+        URLs that were new.
+        """
+        new_urls = self.frontier.add_new(urls)
+
+        pipe = self.client.pipeline(transaction=False)
+        for url in new_urls:
+            state = UrlCrawlState(
+                url=url,
+                source_id=source_id,
+                source_type=source_type,
+                interval_minutes=settings.crawl_min_interval_minutes
+            )
+            pipe.set(URL_STATE_KEY.format(url_key(url)), state.model_dump_json(), nx=True)
+        pipe.execute()
+        return new_urls
+
+    def apply_source_state(self, source: CrawlSource) -> CrawlSource:
+        """Overlay stored validators and schedule onto a source definition"""
+        raw = self.client.get(SOURCE_STATE_KEY.format(source.id))
+        if raw:
+            stored = CrawlSource.model_validate_json(raw)
+            source.etag = stored.etag
+            source.last_modified = stored.last_modified
+            source.content_hash = stored.content_hash
+            source.last_crawl_time = stored.last_crawl_time
+            source.next_crawl_time = stored.next_crawl_time
+            source.interval_minutes = stored.interval_minutes
+        return source
+
+    def save_source(self, source: CrawlSource):
+        """Persist source state and its position in the due queue"""
+        due_at = due_score(source.next_crawl_time)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(SOURCE_STATE_KEY.format(source.id), source.model_dump_json())
+        pipe.zadd(DUE_SOURCES_KEY, {source.id: due_at})
+        pipe.execute()
+
+    def lease_due_sources(self, now: Optional[datetime] = None) -> List[str]:
+        """Source ids whose next crawl time has passed, leased like URLs"""
+        now = now or datetime.utcnow()
+        source_ids = self.client.zrangebyscore(DUE_SOURCES_KEY, "-inf", due_score(now))
+        if source_ids:
+            lease_until = due_score(now + timedelta(minutes=settings.crawl_min_interval_minutes))
+            self.client.zadd(DUE_SOURCES_KEY, {sid: lease_until for sid in source_ids}, xx=True)
+        return source_ids
@@ -1,75 +1,183 @@
 """
 Crawler Celery tasks
 """
-import asyncio
-from celery import current_task
+import re
 from app.celery_app import celery_app
+from app.config import settings
+from app.progress import ProgressReporter
+from app.runtime import runtime
+from .fetcher import FrontierFetcher, fetch_if_changed
 from .models import CrawlSource, SourceType
+from .state import CrawlStateStore
 from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urljoin, urldefrag
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _extract_links(html: str, base_url: str, pattern: Optional[str] = None) -> List[str]:
+    """Extract absolute links from a listing page, optionally filtered by pattern"""
+    from bs4 import BeautifulSoup
+
+    matcher = re.compile(pattern) if pattern else None
+    links = []
+    seen = set()
+    for anchor in BeautifulSoup(html, "html.parser").find_all("a", href=True):
+        url, _ = urldefrag(urljoin(base_url, anchor["href"]))
+        if not url.startswith(("http://", "https://")) or url in seen:
+            continue
+        if matcher and not matcher.search(url):
+            continue
+        seen.add(url)
+        links.append(url)
+    return links
+
+def _load_source(source_id: str) -> CrawlSource:
+    """Load a crawl source definition"""
+    # Here you would fetch the source from database
+    # For now, create a mock source
+    return CrawlSource(
+        id=source_id,
+        name="Example Source",
+        url="https://example.com",
+        source_type=SourceType.ARTICLE
+    )
+
 @celery_app.task(bind=True, name="crawler.start_crawler")
 def start_crawler(self, source_id: str):
     """Start crawling from a specific source"""
+    progress = ProgressReporter(self.request.id)
     try:
-        # Update task state
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'current': 0, 'total': 100, 'status': 'Starting crawler'}
-        )
-        
-        # Here you would fetch the source from database
-        # For now, create a mock source
-        source = CrawlSource(
-            id=source_id,
-            name="Example Source",
-            url="https://example.com",
-            source_type=SourceType.ARTICLE,
-            last_crawl_time=datetime.utcnow()
-        )
-        
-        # Simulate crawling process
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'current': 30, 'total': 100, 'status': 'Fetching content'}
-        )
-        
-        # Simulate delay
-        asyncio.sleep(2)
-        
-        current_task.update_state(
-            state='PROGRESS',
-            meta={'current': 70, 'total': 100, 'status': 'Processing content'}
+        progress.update(0, 'Starting crawler')
+
+        store = CrawlStateStore()
+        source = store.apply_source_state(_load_source(source_id))
+
+        progress.update(30, 'Fetching content')
+
+        response = runtime.run(
+            fetch_if_changed(runtime.http_client, source),
+            timeout=settings.crawl_timeout_seconds * 2
         )
+        store.save_source(source)
+
+        if response is None:
+            logger.info(f"Source {source_id} unchanged, next crawl at {source.next_crawl_time}")
+            progress.finish('Source unchanged')
+            return {
+                'status': 'success',
+                'source_id': source_id,
+                'changed': False,
+                'items_found': 0,
+                'items_new': 0,
+                'next_crawl_time': source.next_crawl_time.isoformat(),
+                'message': 'Source unchanged since last crawl'
+            }
+
+        progress.update(70, 'Processing content')
+
+        urls = _extract_links(response.text, str(response.url), source.crawl_pattern)
+        new_urls = store.add_urls(urls, source.id, source.source_type)
+
+        # New URLs are due now on the frontier; known ones follow their own schedule
+        if new_urls:
+            drain_frontier.delay()
+
+        progress.finish('Crawling completed', items_found=len(urls))
         
         # Return result
         return {
             'status': 'success',
             'source_id': source_id,
-            'items_found': 10,
+            'changed': True,
+            'items_found': len(urls),
+            'items_new': len(new_urls),
+            'next_crawl_time': source.next_crawl_time.isoformat(),
             'message': 'Crawling completed successfully'
         }
-        
+
     except Exception as e:
         logger.error(f"Crawler failed for source {source_id}: {str(e)}")
+        progress.finish('Crawling failed', error=str(e))
         return {
             'status': 'error',
             'source_id': source_id,
             'error': str(e)
         }
 
+def _crawl_url(url: str, source_type: SourceType) -> dict:
+    """Conditionally fetch a single URL, skipping it if unchanged"""
+    store = CrawlStateStore()
+    state = store.get_url(url)
+    state.source_type = source_type
+
+    # Only the fetch runs on the shared loop; other task threads fetch meanwhile
+    response = runtime.run(
+        fetch_if_changed(runtime.http_client, state),
+        timeout=settings.crawl_timeout_seconds * 2
+    )
+    store.save_url(state)
+
+    result = {
+        "type": source_type.value,
+        "url": url,
+        "content_hash": state.content_hash,
+        "next_crawl_time": state.next_crawl_time.isoformat()
+    }
+    if response is None:
+        result["status"] = "not_modified"
+        return result
+
+    result["status"] = "crawled"
+    result["html"] = response.text
+    result["crawled_at"] = datetime.utcnow().isoformat()
+    return result
+
 @celery_app.task(name="crawler.crawl_article")
 def crawl_article(url: str, source_name: str = None):
     """Crawl article from URL"""
     logger.info(f"Crawling article from {url}")
-    # Implement actual article crawling logic here
-    return {"type": "article", "url": url, "status": "crawled"}
+    result = _crawl_url(url, SourceType.ARTICLE)
+
+    if result["status"] == "crawled":
+        from app.cleaner.tasks import clean_content
+        clean_content.delay({
+            "type": "html",
+            "url": url,
+            "source_name": source_name,
+            "html": result.pop("html")
+        })
+    else:
+        logger.info(f"Article unchanged, skipped: {url}")
+    return result
 
 @celery_app.task(name="crawler.crawl_video")
 def crawl_video(url: str, platform: str = None):
     """Crawl video from URL"""
     logger.info(f"Crawling video from {url}")
-    # Implement actual video crawling logic here
-    return {"type": "video", "url": url, "status": "crawled"}
\ No newline at end of file
+    result = _crawl_url(url, SourceType.VIDEO)
+    # Video pages are only tracked for changes; media download is handled elsewhere
+    result.pop("html", None)
+    result["platform"] = platform
+    return result
+
+@celery_app.task(name="crawler.drain_frontier")
+def drain_frontier(max_seconds: int = None):
+    """Fetch every due URL on the crawl frontier with a pool of async workers"""
+    store = CrawlStateStore()
+    lock = store.client.lock(
+        "crawler:frontier:drain",
+        timeout=(max_seconds or settings.crawl_drain_seconds) + 60,
+        blocking=False
+    )
+    if not lock.acquire():
+        logger.info("Frontier drain already running, skipped")
+        return {"status": "skipped", "reason": "drain already running"}
+
+    try:
+        store.frontier.reset_inflight()
+        stats = runtime.run(FrontierFetcher(store).run(runtime.http_client, max_seconds))
+        return {"status": "success", **stats}
+    finally:
+        lock.release()
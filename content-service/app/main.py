@@ -5,6 +5,7 @@ from fastapi import FastAPI
 from app.config import settings
 from app.api import router as api_router
 from app.celery_app import celery_app
+from app.health import health_monitor
 
 app = FastAPI(
     title="QuantBull Content Service",
@@ -15,6 +16,26 @@ app = FastAPI(
 # Include API routers
 app.include_router(api_router, prefix="/api/v1")
 
+
+def _celery_broker_check():
+    """Connect to the Celery broker"""
+    with celery_app.connection_for_write() as conn:
+        conn.ensure_connection(max_retries=1)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start background dependency checks"""
+    health_monitor.register("celery_broker", _celery_broker_check)
+    await health_monitor.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background dependency checks"""
+    await health_monitor.close()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -22,22 +43,15 @@ async def health_check():
 
 @app.get("/status")
 async def status_check():
-    """Detailed status check endpoint"""
-    from celery.result import AsyncResult
-    # Test Celery connection
-    try:
-        # Send a test task
-        result = celery_app.send_task('app.tasks.test_task')
-        task_result = AsyncResult(result.id, app=celery_app)
-        celery_status = "connected" if task_result.state != "FAILURE" else "disconnected"
-    except Exception:
-        celery_status = "disconnected"
-    
+    """Detailed status check endpoint, served from cached background checks"""
+    health = health_monitor.snapshot()
+    broker = health["dependencies"]["celery_broker"]["status"]
     return {
-        "status": "healthy",
+        "status": health["status"],
         "service": "content-service",
         "version": "1.0.0",
-        "celery": celery_status,
+        "celery": "connected" if broker == "healthy" else "disconnected",
+        "dependencies": health["dependencies"],
         "modules": ["crawler", "cleaner", "scheduler", "storage", "api"]
     }
 
@@ -0,0 +1,287 @@
+"""
+Compact Celery serializer for tasks that pass record batches.
+
+Payloads are msgpack. Lists of dicts that share their keys, the record
+batches cleaning tasks take and return, are encoded column by column so
+keys are not repeated per record: as Arrow IPC when pyarrow is installed
+and Arrow returns every value exactly as given, and as msgpack columns
+otherwise. Either way a batch decodes to the same values.
+Large payloads are compressed, and payloads still over
+``celery_blob_min_bytes`` are written to a shared blob store so that only
+a handle crosses the broker.
+"""
+import hashlib
+import threading
+import uuid
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import msgpack
+import redis
+from kombu.serialization import register
+
+from app.config import settings
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow encoding is optional; batches fall back to msgpack columns
+    pa = None
+
+SERIALIZER = "msgpack-records"
+CONTENT_TYPE = "application/x-msgpack-records"
+
+BLOB_KEY_PREFIX = "celery:blob:"
+
+# Smallest list of dicts encoded column by column
+COLUMNAR_MIN_ROWS = 32
+
+# First byte of every payload
+_PLAIN = b"\x00"
+_ZLIB = b"\x01"
+_BLOB = b"\x02"
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+_EXT_COLUMNS = 4
+_EXT_ARROW = 5
+_EXT_TIME = 6
+_EXT_UUID = 7
+_EXT_BIGINT = 8
+
+# Python types Arrow stores and returns unchanged; naive datetimes and lists
+# of these are checked separately
+_ARROW_SCALARS = frozenset({bool, int, float, str, bytes, date})
+
+
+class BlobNotFound(KeyError):
+    """Raised when a payload handle points at an expired or missing blob."""
+
+
+class BlobStore:
+    """
+    Content-addressed payload storage shared by producers and workers.
+
+    Blobs expire after ``celery_blob_ttl_seconds`` instead of being deleted
+    when read, so redelivered and retried tasks still find their payload.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None, ttl: Optional[int] = None):
+        """
+        Initialize the store.
+
+        Args:
+            client: Redis client, defaults to settings.celery_blob_url or settings.redis_url
+            ttl: Seconds a blob is kept, defaults to settings.celery_blob_ttl_seconds
+        """
+        self.client = client or redis.from_url(settings.celery_blob_url or settings.redis_url)
+        self.ttl = ttl or settings.celery_blob_ttl_seconds
+
+    def put(self, data: bytes) -> str:
+        """
+        Store a payload.
+
+        Args:
+            data: Payload bytes
+
+        Returns:
+            Handle to pass instead of the payload
+        """
+        key = BLOB_KEY_PREFIX + hashlib.blake2b(data, digest_size=20).hexdigest()
+        self.client.set(key, data, ex=self.ttl)
+        return key
+
+    def get(self, handle: str) -> bytes:
+        """
+        Load a payload.
+
+        Args:
+            handle: Handle returned by put()
+
+        Returns:
+            Payload bytes
+
+        Raises:
+            BlobNotFound: If the blob expired or the handle is not a blob key
+        """
+        data = self.client.get(handle) if handle.startswith(BLOB_KEY_PREFIX) else None
+        if data is None:
+            raise BlobNotFound(handle)
+        return data
+
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """
+    Get the process-wide blob store.
+
+    Returns:
+        Shared BlobStore instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore()
+        return _store
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode a Celery message body or result.
+
+    Args:
+        obj: Body to encode
+
+    Returns:
+        Framed payload, or a blob handle for payloads over the blob threshold
+    """
+    # Bytes already compressed inside Arrow batches
+    compressed: List[int] = []
+    payload = _packb(_prepare(obj, compressed))
+    if len(payload) - sum(compressed) >= settings.celery_compress_min_bytes:
+        payload = _ZLIB + zlib.compress(payload, 1)
+    else:
+        payload = _PLAIN + payload
+    if len(payload) >= settings.celery_blob_min_bytes:
+        return _BLOB + get_blob_store().put(payload).encode()
+    return payload
+
+
+def loads(data: bytes) -> Any:
+    """
+    Decode a payload produced by dumps().
+
+    Args:
+        data: Framed payload or blob handle
+
+    Returns:
+        Decoded body
+    """
+    if data[:1] == _BLOB:
+        data = get_blob_store().get(data[1:].decode())
+    header, payload = data[:1], data[1:]
+    if header == _ZLIB:
+        payload = zlib.decompress(payload)
+    return msgpack.unpackb(payload, ext_hook=_ext_hook, strict_map_key=False)
+
+
+def register_serializer() -> None:
+    """Make the serializer available to Celery as SERIALIZER."""
+    register(SERIALIZER, dumps, loads, content_type=CONTENT_TYPE, content_encoding="binary")
+
+
+def _packb(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def _default(value: Any) -> msgpack.ExtType:
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    if isinstance(value, time):
+        return msgpack.ExtType(_EXT_TIME, value.isoformat().encode())
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    if isinstance(value, int):
+        # Only ints outside msgpack's 64-bit range reach here
+        return msgpack.ExtType(_EXT_BIGINT, str(value).encode())
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _prepare(value: Any, compressed: List[int]) -> Any:
+    """Replace record batches anywhere in a body with columnar extension types."""
+    if isinstance(value, (list, tuple)):
+        if _is_batch(value):
+            return _encode_batch(value, compressed)
+        return [_prepare(item, compressed) for item in value]
+    if isinstance(value, dict):
+        return {key: _prepare(item, compressed) for key, item in value.items()}
+    return value
+
+
+def _is_batch(rows: Any) -> bool:
+    if len(rows) < COLUMNAR_MIN_ROWS or not isinstance(rows[0], dict) or not rows[0]:
+        return False
+    keys = rows[0].keys()
+    return all(isinstance(row, dict) and row.keys() == keys for row in rows)
+
+
+def _encode_batch(rows: List[Dict[str, Any]], compressed: List[int]) -> msgpack.ExtType:
+    if pa is not None and settings.celery_arrow_enabled:
+        arrow = _encode_arrow(rows)
+        if arrow is not None:
+            if settings.celery_arrow_compression:
+                compressed.append(len(arrow))
+            return msgpack.ExtType(_EXT_ARROW, arrow)
+    keys = list(rows[0])
+    columns = [_prepare([row[key] for row in rows], compressed) for key in keys]
+    return msgpack.ExtType(_EXT_COLUMNS, _packb([keys, columns]))
+
+
+def _encode_arrow(rows: List[Dict[str, Any]]) -> Optional[bytes]:
+    """Arrow IPC stream of the rows, or None if Arrow would change any value."""
+    if any(not isinstance(key, str) for key in rows[0]):
+        return None
+    columns = {key: [row[key] for row in rows] for key in rows[0]}
+    if not all(_arrow_exact(values) for values in columns.values()):
+        return None
+    try:
+        table = pa.Table.from_pydict(columns)
+    except (pa.ArrowException, OverflowError, TypeError, ValueError):
+        return None
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=settings.celery_arrow_compression or None)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_exact(values: List[Any]) -> bool:
+    """
+    Whether Arrow returns a column's values with their Python types intact.
+
+    Arrow widens mixed columns (an int next to a float comes back as a
+    float), rescales Decimals, converts time zones and merges dict keys, so
+    only columns of one plain type, or lists of them, qualify.
+    """
+    kinds = {list if type(value) is tuple else type(value) for value in values} - {type(None)}
+    if len(kinds) != 1:
+        return not kinds
+    kind = kinds.pop()
+    if kind is datetime:
+        return all(value.tzinfo is None for value in values if value is not None)
+    if kind is list:
+        return _arrow_exact([item for value in values if value is not None for item in value])
+    return kind in _ARROW_SCALARS
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_TIME:
+        return time.fromisoformat(data.decode())
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_BIGINT:
+        return int(data.decode())
+    if code == _EXT_COLUMNS:
+        keys, columns = msgpack.unpackb(data, ext_hook=_ext_hook, strict_map_key=False)
+        return [dict(zip(keys, values)) for values in zip(*columns)]
+    if code == _EXT_ARROW:
+        if pa is None:
+            raise RuntimeError("pyarrow is required to decode Arrow record batches")
+        return pa.ipc.open_stream(data).read_all().to_pylist()
+    return msgpack.ExtType(code, data)
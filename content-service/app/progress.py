@@ -0,0 +1,98 @@
+"""
+Throttled task progress reporting
+
+Tasks report progress through `ProgressReporter`, which coalesces updates and
+writes them as a small JSON record under one Redis key at most every
+`progress_flush_interval_ms` (and always on completion) instead of a
+result-backend write per step. The API answers status polls for queued and
+running tasks from that record alone and only queries the Celery result
+backend once the record says DONE or is missing.
+"""
+import json
+import time
+from typing import Any, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+PROGRESS_KEY = "task:progress:{}"
+
+STATE_PENDING = "PENDING"
+STATE_PROGRESS = "PROGRESS"
+STATE_DONE = "DONE"
+
+_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+def _get_client() -> redis.Redis:
+    """Process-wide Redis client for task-side writes"""
+    global _client
+    if _client is None:
+        _client = redis.from_url(settings.redis_url, decode_responses=True)
+    return _client
+
+def _get_async_client() -> aioredis.Redis:
+    """Process-wide async Redis client for API-side reads"""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.from_url(settings.redis_url, decode_responses=True)
+    return _async_client
+
+class ProgressReporter:
+    """Coalesces progress updates for one task and flushes them on a timer"""
+
+    def __init__(
+        self,
+        task_id: str,
+        total: int = 100,
+        interval_ms: Optional[int] = None,
+        client: Optional[redis.Redis] = None
+    ):
+        self.task_id = task_id
+        self.total = total
+        self.interval = (interval_ms or settings.progress_flush_interval_ms) / 1000
+        self.client = client or _get_client()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._last_flush = 0.0
+
+    def update(self, current: int, status: str = "", **meta: Any):
+        """Record progress; written out only if the flush interval has elapsed"""
+        self._pending = {"current": current, "total": self.total, "status": status, **meta}
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush(STATE_PROGRESS)
+
+    def finish(self, status: str = "Completed", **meta: Any):
+        """Write the final progress record unconditionally"""
+        self._pending = {"current": self.total, "total": self.total, "status": status, **meta}
+        self.flush(STATE_DONE)
+
+    def flush(self, state: str = STATE_PROGRESS):
+        """Write the pending update, if any"""
+        if self._pending is None or not self.task_id:
+            return
+        record = {"state": state, "updated_at": time.time(), **self._pending}
+        self.client.set(
+            PROGRESS_KEY.format(self.task_id),
+            json.dumps(record),
+            ex=settings.progress_ttl_seconds
+        )
+        self._pending = None
+        self._last_flush = time.monotonic()
+
+async def mark_pending(task_id: str):
+    """Record a just-dispatched task so polls before it starts report it as queued"""
+    record = {"state": STATE_PENDING, "current": 0, "total": 100, "status": "Queued",
+              "updated_at": time.time()}
+    await _get_async_client().set(
+        PROGRESS_KEY.format(task_id),
+        json.dumps(record),
+        ex=settings.progress_ttl_seconds,
+        nx=True
+    )
+
+async def read_progress(task_id: str) -> Optional[Dict[str, Any]]:
+    """Latest progress record for a task, or None if none was reported"""
+    raw = await _get_async_client().get(PROGRESS_KEY.format(task_id))
+    return json.loads(raw) if raw else None
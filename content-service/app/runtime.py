@@ -0,0 +1,118 @@
+"""
+Async runtime for Celery workers
+
+Each worker process owns one event loop running in a background thread and
+one pooled HTTP client bound to it. Sync Celery tasks submit coroutines with
+`runtime.run(...)`; with a thread pool worker many task threads share the loop,
+so their fetches overlap instead of each holding a slot for a blocking request.
+"""
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+
+import httpx
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AsyncRuntime:
+    """Persistent event loop and shared HTTP client for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop of this process, started on first use"""
+        # A loop inherited through fork has no running thread; start a new one
+        if self._loop is None or self._pid != os.getpid():
+            self.start()
+        return self._loop
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client bound to the runtime loop"""
+        if self._client is None or self._pid != os.getpid():
+            self.start()
+        return self._client
+
+    def start(self):
+        """Start the loop thread and HTTP client for the current process"""
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="async-runtime",
+                daemon=True
+            )
+            thread.start()
+
+            async def _make_client() -> httpx.AsyncClient:
+                return httpx.AsyncClient(
+                    timeout=settings.crawl_timeout_seconds,
+                    follow_redirects=True,
+                    headers={"User-Agent": settings.crawl_user_agent},
+                    limits=httpx.Limits(
+                        max_connections=settings.crawl_fetcher_concurrency,
+                        max_keepalive_connections=settings.crawl_fetcher_concurrency
+                    )
+                )
+
+            self._client = asyncio.run_coroutine_threadsafe(_make_client(), loop).result()
+            self._loop = loop
+            self._thread = thread
+            self._pid = os.getpid()
+            logger.info(f"Async runtime started in process {self._pid}")
+
+    def stop(self):
+        """Close the HTTP client and stop the loop"""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Failed to close runtime HTTP client: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = self._thread = self._client = None
+            logger.info(f"Async runtime stopped in process {os.getpid()}")
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        """Schedule a coroutine on the runtime loop without waiting"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runtime loop and wait for its result"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+runtime = AsyncRuntime()
+
+@worker_process_init.connect
+def _start_runtime(**kwargs):
+    """Give each prefork child its own loop instead of inheriting the parent's"""
+    runtime.start()
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_runtime(**kwargs):
+    """Close pooled connections on worker exit"""
+    runtime.stop()
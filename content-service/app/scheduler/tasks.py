@@ -14,17 +14,34 @@ def schedule_crawl(source_id: str = None):
     """Schedule crawling tasks"""
     logger.info(f"Scheduling crawl for source: {source_id}")
     
+    from app.crawler.tasks import start_crawler, drain_frontier
+    
     if source_id:
         # Schedule specific source
-        from app.crawler.tasks import start_crawler
         start_crawler.delay(source_id)
-    else:
-        # Schedule all active sources
-        # This would query database for active sources
-        # For now, just log
-        logger.info("Scheduling all active sources")
+        return {"scheduled": True, "time": datetime.utcnow().isoformat()}
+    
+    # Only sources whose adaptive next-crawl time has passed are refetched;
+    # article URLs are revisited from the crawl frontier by a single drain.
+    # Sources that were never crawled would be picked up from the database here.
+    from app.crawler.state import CrawlStateStore
+    
+    store = CrawlStateStore()
+    
+    due_sources = store.lease_due_sources()
+    for due_source_id in due_sources:
+        start_crawler.delay(due_source_id)
     
-    return {"scheduled": True, "time": datetime.utcnow().isoformat()}
+    drain_frontier.delay()
+    
+    logger.info(f"Scheduled {len(due_sources)} sources and a frontier drain")
+    
+    return {
+        "scheduled": True,
+        "time": datetime.utcnow().isoformat(),
+        "sources_scheduled": len(due_sources),
+        "frontier_hosts": store.frontier.size()
+    }
 
 @celery_app.task(name="scheduler.schedule_cleanup")
 def schedule_cleanup(days_old: int = 30):
@@ -10,6 +10,10 @@ CREATE TABLE IF NOT EXISTS crawl_sources (
     interval_minutes INTEGER DEFAULT 60,
     is_active BOOLEAN DEFAULT TRUE,
     last_crawl_time TIMESTAMP,
+    next_crawl_time TIMESTAMP,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash VARCHAR(64),
     config JSONB,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -23,6 +27,7 @@ CREATE TABLE IF NOT EXISTS crawl_tasks (
     completed_at TIMESTAMP,
     items_found INTEGER DEFAULT 0,
     items_processed INTEGER DEFAULT 0,
+    items_unchanged INTEGER DEFAULT 0,
     error TEXT,
     result_urls JSONB,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -2,11 +2,11 @@
 News data cleaner for processing financial news.
 """
 import re
-from html import unescape
 from typing import Any, Dict, List, Optional
 
 from app.cleaner.base import BaseCleaner
 from app.utils.logger import logger
+from app.utils.text import normalize_text
 
 
 class NewsCleaner(BaseCleaner):
@@ -14,6 +14,9 @@ class NewsCleaner(BaseCleaner):
     Cleaner for news data.
     """
     
+    # Stock code pattern: 6-digit code (000001, 600000, etc.)
+    STOCK_CODE_PATTERN = re.compile(r"\b(?:00|30|60|68|43|83|87)[0-9]{4}\b")
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize news cleaner.
@@ -22,8 +25,6 @@ class NewsCleaner(BaseCleaner):
             config: Configuration dictionary
         """
         super().__init__(name="news", config=config)
-        # HTML tag pattern
-        self.html_pattern = re.compile(r"<[^>]+>")
     
     def clean(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -107,25 +108,15 @@ class NewsCleaner(BaseCleaner):
         """
         Clean HTML and normalize text.
         
+        Control characters are kept, as they always were for news text.
+        
         Args:
             text: Text to clean
             
         Returns:
             Cleaned text
         """
-        if not text:
-            return ""
-        
-        # Unescape HTML entities
-        text = unescape(text)
-        
-        # Remove HTML tags
-        text = self.html_pattern.sub("", text)
-        
-        # Remove extra whitespace
-        text = re.sub(r"\s+", " ", text).strip()
-        
-        return text
+        return normalize_text(text, strip_control=False)
     
     def _normalize_datetime(self, dt_str: Any) -> str:
         """
@@ -150,8 +141,6 @@ class NewsCleaner(BaseCleaner):
         Returns:
             List of stock codes found
         """
-        # Pattern: 6-digit code (000001, 600000, etc.)
-        pattern = r"\b(?:00|30|60|68|43|83|87)[0-9]{4}\b"
-        codes = re.findall(pattern, text)
+        codes = self.STOCK_CODE_PATTERN.findall(text)
         return list(set(codes))  # Remove duplicates
 
@@ -19,6 +19,18 @@ class Settings(BaseSettings):
     tdengine_url: Optional[str] = None
     redis_url: str = "redis://redis:6379/0"
     
+    # Connection pools for async request handlers (per process)
+    postgres_pool_size: int = 10
+    postgres_max_overflow: int = 20
+    postgres_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    postgres_pool_recycle: int = 1800
+    redis_max_connections: int = 100
+    redis_pool_timeout: float = 5.0  # seconds to wait for a free connection
+    redis_pipeline_batch_size: int = 500  # commands per pipeline round trip
+    
+    # Bulk upserts (COPY into staging, then INSERT ... ON CONFLICT)
+    bulk_write_batch_size: int = 5000  # records per COPY and merge
+    
     # Data sources
     tushare_token: Optional[str] = None
     cls_api_key: Optional[str] = None
@@ -27,6 +39,19 @@ class Settings(BaseSettings):
     celery_broker_url: Optional[str] = None
     celery_result_backend: Optional[str] = None
     
+    # Celery payloads, see app.scheduler.payload
+    celery_serializer: str = "msgpack-records"  # "json" for plain JSON messages
+    celery_arrow_enabled: bool = True  # record batches as Arrow IPC when pyarrow is installed
+    celery_arrow_compression: Optional[str] = "zstd"  # "lz4", "zstd" or None
+    celery_compress_min_bytes: int = 16 * 1024
+    celery_blob_min_bytes: int = 256 * 1024  # larger payloads pass through the blob store
+    celery_blob_url: Optional[str] = None  # Redis holding payload blobs, defaults to redis_url
+    celery_blob_ttl_seconds: int = 86400
+    
+    # Dependency health checks (served from cache by /status)
+    health_check_interval: float = 10.0
+    health_check_timeout: float = 3.0
+    
     # Logging
     log_level: str = "INFO"
     log_file: Optional[str] = None
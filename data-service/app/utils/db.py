@@ -0,0 +1,217 @@
+"""
+Async PostgreSQL and Redis access for request handlers.
+
+Handlers share one pooled asyncpg engine and one pooled redis.asyncio
+client per process, so a slow query or Redis call waits on the event
+loop instead of blocking it or tying up a worker thread.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+import redis.asyncio as aioredis
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.config import settings
+from app.utils.logger import logger
+
+# A raw Redis command and its arguments, such as ("SET", key, value, "EX", 60)
+Command = Sequence[Any]
+
+
+def async_postgres_url(url: str) -> str:
+    """
+    PostgreSQL URL for the asyncpg driver.
+
+    Args:
+        url: SQLAlchemy URL, such as settings.postgres_url
+
+    Returns:
+        The same database URL with the ``postgresql+asyncpg`` driver
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return url
+    return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+class DataAccess:
+    """
+    Process-wide async engine and Redis client.
+
+    Both are created on first use. The engine pools up to
+    ``postgres_pool_size + postgres_max_overflow`` connections; the Redis
+    pool holds up to ``redis_max_connections`` and callers wait for a free
+    connection instead of failing when it is exhausted. Redis replies are
+    bytes, which keeps binary values intact.
+    """
+
+    def __init__(self, postgres_url: Optional[str] = None, redis_url: Optional[str] = None):
+        """
+        Initialize without connecting.
+
+        Args:
+            postgres_url: Database URL, defaults to settings.postgres_url
+            redis_url: Redis URL, defaults to settings.redis_url
+        """
+        self.postgres_url = postgres_url or settings.postgres_url
+        self.redis_url = redis_url or settings.redis_url
+        self._engine: Optional[AsyncEngine] = None
+        self._sessions: Optional[async_sessionmaker] = None
+        self._redis: Optional[aioredis.Redis] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Async SQLAlchemy engine, created on first use."""
+        if self._engine is None:
+            self._engine = create_async_engine(
+                async_postgres_url(self.postgres_url),
+                pool_size=settings.postgres_pool_size,
+                max_overflow=settings.postgres_max_overflow,
+                pool_timeout=settings.postgres_pool_timeout,
+                pool_recycle=settings.postgres_pool_recycle,
+                pool_pre_ping=True,
+                connect_args={"timeout": 5},
+            )
+        return self._engine
+
+    @property
+    def sessions(self) -> async_sessionmaker:
+        """Session factory bound to the engine."""
+        if self._sessions is None:
+            self._sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        return self._sessions
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        """Async Redis client, created on first use."""
+        if self._redis is None:
+            pool = aioredis.BlockingConnectionPool.from_url(
+                self.redis_url,
+                max_connections=settings.redis_max_connections,
+                timeout=settings.redis_pool_timeout,
+                socket_connect_timeout=5,
+            )
+            self._redis = aioredis.Redis(connection_pool=pool)
+        return self._redis
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Session for one unit of work; the caller commits.
+
+        Yields:
+            AsyncSession, closed on exit
+        """
+        async with self.sessions() as session:
+            yield session
+
+    async def start(self) -> None:
+        """Open both pools and log whether each dependency answered."""
+        try:
+            await self.redis.ping()
+            logger.info("Redis connection established")
+        except Exception as e:
+            logger.warning(f"Redis connection failed: {e}")
+
+        try:
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            logger.info("PostgreSQL connection established")
+        except Exception as e:
+            logger.warning(f"PostgreSQL connection failed: {e}")
+
+    async def close(self) -> None:
+        """Close both pools."""
+        if self._redis is not None:
+            await self._redis.close()
+            await self._redis.connection_pool.disconnect()
+            self._redis = None
+            logger.info("Redis connection closed")
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = self._sessions = None
+            logger.info("PostgreSQL connection closed")
+
+
+async def pipelined(
+    client: aioredis.Redis,
+    commands: Sequence[Command],
+    batch_size: Optional[int] = None,
+    transaction: bool = False,
+    raise_on_error: bool = True,
+) -> List[Any]:
+    """
+    Run Redis commands in pipelines, one round trip per batch.
+
+    Batches go out concurrently on separate pooled connections, so there
+    is no ordering between batches unless ``transaction`` is set and the
+    commands fit in one batch.
+
+    Args:
+        client: Async Redis client
+        commands: Raw commands, such as ("HSET", key, field, value)
+        batch_size: Commands per pipeline, defaults to settings.redis_pipeline_batch_size
+        transaction: Wrap each batch in MULTI/EXEC
+        raise_on_error: Raise the first command error; otherwise errors are
+            returned in place of their results
+
+    Returns:
+        Result per command, in command order
+    """
+    batch_size = batch_size or settings.redis_pipeline_batch_size
+
+    async def run(batch: Sequence[Command]) -> List[Any]:
+        async with client.pipeline(transaction=transaction) as pipe:
+            for command in batch:
+                pipe.execute_command(*command)
+            return await pipe.execute(raise_on_error=raise_on_error)
+
+    batches = [
+        commands[start : start + batch_size] for start in range(0, len(commands), batch_size)
+    ]
+    results = await asyncio.gather(*(run(batch) for batch in batches))
+    return [result for batch in results for result in batch]
+
+
+async def mget(
+    client: aioredis.Redis,
+    keys: Sequence[str],
+    batch_size: Optional[int] = None,
+) -> List[Optional[bytes]]:
+    """
+    MGET any number of keys without one oversized command.
+
+    Args:
+        client: Async Redis client
+        keys: Keys to read
+        batch_size: Keys per MGET, defaults to settings.redis_pipeline_batch_size
+
+    Returns:
+        Value per key, None where the key is missing
+    """
+    batch_size = batch_size or settings.redis_pipeline_batch_size
+    batches = [keys[start : start + batch_size] for start in range(0, len(keys), batch_size)]
+    results = await asyncio.gather(*(client.mget(batch) for batch in batches))
+    return [value for batch in results for value in batch]
+
+
+data_access = DataAccess()
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency yielding a session from the shared engine.
+
+    Yields:
+        AsyncSession, closed after the request
+    """
+    async with data_access.session() as session:
+        yield session
@@ -0,0 +1,49 @@
+"""
+Text normalization helpers shared by the cleaners.
+"""
+import re
+from html import unescape
+
+# HTML tag pattern
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Control characters (C0/C1) that survive whitespace collapsing
+CONTROL_CHAR_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
+
+
+def normalize_text(text: str, strip_control: bool = True) -> str:
+    """
+    Decode HTML entities, strip tags, collapse whitespace and drop control characters.
+
+    Equivalent to running ``unescape``, tag removal, ``\\s+`` collapsing, ``strip``
+    and control-character removal in that order, but every step is a precompiled
+    C-level scan and steps that cannot match are skipped:
+
+    - entity decoding only runs when the text contains ``&``
+    - tag stripping only runs when the text contains ``<``
+    - whitespace is collapsed and trimmed by ``str.split``/``str.join``
+    - control characters are only searched for when the collapsed text is not
+      printable, which is the rare case for crawled articles
+
+    Args:
+        text: Raw text, possibly containing HTML markup
+        strip_control: Whether to drop control characters
+
+    Returns:
+        Normalized single-line text
+    """
+    if not text:
+        return ""
+
+    if "&" in text:
+        text = unescape(text)
+
+    if "<" in text:
+        text = HTML_TAG_PATTERN.sub("", text)
+
+    text = " ".join(text.split())
+
+    if strip_control and not text.isprintable():
+        text = CONTROL_CHAR_PATTERN.sub("", text)
+
+    return text
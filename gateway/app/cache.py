@@ -0,0 +1,359 @@
+"""
+Response cache for read routes: in-process LRU in front of Redis.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import redis.asyncio as aioredis
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.config import settings
+from app.utils.logging import logger
+
+KEY_PREFIX = "gw:cache:"
+
+# Upstream headers never replayed from the cache
+_UNCACHED_HEADERS = frozenset({"content-length", "date", "set-cookie", "x-request-id", "age"})
+
+
+@dataclass
+class CachedResponse:
+    """A stored upstream response."""
+
+    status_code: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+    etag: str
+    stored_at: float  # wall-clock time, shared across gateway replicas
+    ttl: int
+    stale: int
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < self.ttl
+
+    @property
+    def usable(self) -> bool:
+        """Whether the entry may still be served while it is revalidated."""
+        return self.age < self.ttl + self.stale
+
+    def dumps(self) -> bytes:
+        meta = {
+            "status": self.status_code,
+            "headers": self.headers,
+            "etag": self.etag,
+            "stored_at": self.stored_at,
+            "ttl": self.ttl,
+            "stale": self.stale,
+        }
+        return json.dumps(meta, separators=(",", ":")).encode() + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "CachedResponse":
+        meta, _, body = raw.partition(b"\n")
+        fields = json.loads(meta)
+        return cls(
+            status_code=fields["status"],
+            headers=[tuple(header) for header in fields["headers"]],
+            body=body,
+            etag=fields["etag"],
+            stored_at=fields["stored_at"],
+            ttl=fields["ttl"],
+            stale=fields["stale"],
+        )
+
+    @classmethod
+    def build(
+        cls,
+        status_code: int,
+        headers: List[Tuple[str, str]],
+        body: bytes,
+        ttl: int,
+        stale: int = 0,
+    ) -> "CachedResponse":
+        """
+        Entry for an upstream response, with an ETag derived from the body if
+        upstream sent none.
+        """
+        etag = next((value for key, value in headers if key.lower() == "etag"), None)
+        if etag is None:
+            etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        return cls(
+            status_code=status_code,
+            headers=[
+                (key, value) for key, value in headers if key.lower() not in _UNCACHED_HEADERS
+            ],
+            body=body,
+            etag=etag,
+            stored_at=time.time(),
+            ttl=ttl,
+            stale=stale,
+        )
+
+
+Loader = Callable[[], Awaitable[Union[CachedResponse, Response]]]
+
+
+def cache_key(request: Request, namespace: str) -> str:
+    """
+    Cache key for a request.
+
+    Covers the namespace, path, sorted query parameters, whether the client
+    accepts gzip (upstreams may compress) and, for authenticated requests,
+    a hash of the credentials so private data is never shared.
+
+    Args:
+        request: Incoming request
+        namespace: Key namespace, such as the route name
+
+    Returns:
+        Cache key
+    """
+    query = "&".join(
+        f"{key}={value}" for key, value in sorted(request.query_params.multi_items())
+    )
+    gzip = "gzip" in request.headers.get("accept-encoding", "")
+    authorization = request.headers.get("authorization", "")
+    material = f"{request.url.path}?{query}|{gzip}|{authorization}"
+    digest = hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+    return f"{KEY_PREFIX}{namespace}:{digest}"
+
+
+def is_cacheable(status_code: int, headers: List[Tuple[str, str]]) -> bool:
+    """
+    Whether an upstream response may be stored.
+
+    Args:
+        status_code: Upstream status
+        headers: Upstream headers
+
+    Returns:
+        True for 200 responses without cookies or no-store/private directives
+    """
+    if status_code != 200:
+        return False
+    for key, value in headers:
+        key = key.lower()
+        if key == "set-cookie":
+            return False
+        if key == "cache-control" and ("no-store" in value or "private" in value):
+            return False
+    return True
+
+
+class ResponseCache:
+    """
+    Two-tier response cache with stale-while-revalidate.
+
+    Lookups check a bounded in-process LRU, then Redis, which all gateway
+    replicas share. Fresh entries are served directly. Entries past their TTL
+    but within the stale window are served immediately while one background
+    request refreshes them. Concurrent misses for the same key share a
+    single upstream call.
+    """
+
+    def __init__(
+        self,
+        client: Optional[aioredis.Redis] = None,
+        local_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            client: Async Redis client, defaults to settings.redis_url
+            local_entries: Size of the in-process LRU
+        """
+        self._client = client
+        self.local_entries = local_entries or settings.cache_local_entries
+        self._local: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+        self.stats = {"hit": 0, "stale": 0, "miss": 0, "coalesced": 0, "not_modified": 0}
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Redis client, created on first use."""
+        if self._client is None:
+            self._client = aioredis.from_url(settings.redis_url)
+        return self._client
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look up an entry that is fresh or within its stale window.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Entry, or None
+        """
+        local = self._local.get(key)
+        if local is not None and local.fresh:
+            self._local.move_to_end(key)
+            return local
+
+        # Another replica may already have refreshed an entry that is stale here
+        try:
+            raw = await self.client.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            raw = None
+        entry = CachedResponse.loads(raw) if raw is not None else None
+        if entry is not None and entry.usable:
+            if local is None or entry.stored_at > local.stored_at:
+                self._local_put(key, entry)
+                return entry
+        if local is not None and local.usable:
+            return local
+        self._local.pop(key, None)
+        return None
+
+    async def set(self, key: str, entry: CachedResponse) -> None:
+        """
+        Store an entry in both tiers.
+
+        Args:
+            key: Cache key
+            entry: Response to store
+        """
+        self._local_put(key, entry)
+        try:
+            await self.client.set(key, entry.dumps(), ex=entry.ttl + entry.stale)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def serve(self, request: Request, namespace: str, load: Loader) -> Response:
+        """
+        Answer a request from the cache, loading from upstream on a miss.
+
+        Args:
+            request: Incoming request
+            namespace: Key namespace, such as the route name
+            load: Fetches the upstream response; returns a CachedResponse if
+                it may be stored and a ready Response otherwise
+
+        Returns:
+            Response for the client
+        """
+        key = cache_key(request, namespace)
+        entry = await self.get(key)
+        if entry is not None:
+            if entry.fresh:
+                self.stats["hit"] += 1
+                return self._respond(request, entry, "HIT")
+            self.stats["stale"] += 1
+            self._refresh(key, load)
+            return self._respond(request, entry, "STALE")
+
+        self.stats["miss"] += 1
+        result, leader = await self._load_once(key, load)
+        if isinstance(result, CachedResponse):
+            return self._respond(request, result, "MISS")
+        if leader:
+            return result
+        # The shared load produced nothing storable; fetch for this client
+        result = await load()
+        if isinstance(result, CachedResponse):
+            return self._respond(request, result, "MISS")
+        return result
+
+    async def _load_once(
+        self,
+        key: str,
+        load: Loader,
+    ) -> Tuple[Union[CachedResponse, Response, None], bool]:
+        """
+        Run ``load`` once per key at a time.
+
+        Returns:
+            Tuple of (result, leader). Followers get the stored entry, or
+            None if the leader's response could not be shared.
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await load()
+            if isinstance(result, CachedResponse):
+                await self.set(key, result)
+                future.set_result(result)
+            else:
+                future.set_result(None)
+            return result, True
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _refresh(self, key: str, load: Loader) -> None:
+        """Revalidate a stale entry in the background, once per key."""
+        if key in self._inflight:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._load_once(key, load)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    def _respond(self, request: Request, entry: CachedResponse, state: str) -> Response:
+        remaining = max(0, int(entry.ttl - entry.age))
+        scope = "private" if "authorization" in request.headers else "public"
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": f"{scope}, max-age={remaining}",
+            "Age": str(int(entry.age)),
+            "X-Cache": state,
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (
+            if_none_match.strip() == "*" or entry.etag.removeprefix("W/") in _etags(if_none_match)
+        ):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+
+        response = Response(content=entry.body, status_code=entry.status_code)
+        for key, value in entry.headers:
+            if key.lower() not in ("etag", "cache-control"):
+                response.headers.append(key, value)
+        response.headers.update(headers)
+        return response
+
+    def _local_put(self, key: str, entry: CachedResponse) -> None:
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_entries:
+            self._local.popitem(last=False)
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._client is not None:
+            await self._client.close()
+
+
+def _etags(header: str) -> List[str]:
+    """ETags listed in an If-None-Match header, weak validators included."""
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+response_cache = ResponseCache()
@@ -1,6 +1,8 @@
 """
 Configuration management
 """
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -14,10 +16,58 @@ class Settings(BaseSettings):
     ai_service_url: str = "http://ai-service:8002"
     quant_engine_url: str = "http://quant-engine:8003"
     content_service_url: str = "http://content-service:8004"
+    user_service_url: str = "http://user-service:8005"
+    
+    # Upstream timeouts in seconds (routes may override)
+    data_service_timeout: float = 10.0
+    ai_service_timeout: float = 120.0
+    quant_engine_timeout: float = 300.0
+    content_service_timeout: float = 30.0
+    user_service_timeout: float = 10.0
+    upstream_connect_timeout: float = 3.0
+    
+    # Upstream connection pool, per service
+    upstream_max_connections: int = 200
+    upstream_max_keepalive: int = 100
+    upstream_keepalive_expiry: float = 60.0
+    
+    # Redis (response cache, revocation checks)
+    redis_url: str = "redis://redis:6379/0"
     
-    # Auth settings
-    jwt_secret: str = ""
+    # Response cache
+    cache_enabled: bool = True
+    cache_local_entries: int = 2048  # in-process LRU in front of Redis
+    cache_max_body_bytes: int = 1048576  # larger responses are streamed, not cached
+    
+    # Auth settings (JWT_SECRET_KEY must match user-service, which signs the tokens;
+    # the gateway refuses to start without it)
+    jwt_secret_key: str = ""
     jwt_algorithm: str = "HS256"
+    auth_cache_entries: int = 10000  # verified tokens kept in memory
+    auth_cache_max_seconds: float = 3600.0  # re-verify tokens at least this often
+    auth_revocation_sync_seconds: float = 5.0  # revocation snapshot poll interval
+    
+    # Rate limiting (limits per route are in the route table)
+    rate_limit_enabled: bool = True
+    rate_limit_sync_seconds: float = 0.25  # how often local buckets reconcile with Redis
+    rate_limit_sync_batch: int = 500  # buckets per reconciliation script call
+    rate_limit_levels: Dict[str, int] = {  # requests per window across all routes, per caller
+        "anonymous": 100,
+        "registered": 500,
+        "vip": 2000,
+        "premium": 5000,
+    }
+    rate_limit_level_window: int = 60
+    
+    # Adaptive concurrency limits per route (circuit breakers per service are
+    # configured in app/middleware/circuit_breaker.py)
+    concurrency_limit_enabled: bool = True
+    concurrency_initial_limit: int = 20
+    concurrency_min_limit: int = 2
+    concurrency_max_limit: int = 500
+    concurrency_tolerance: float = 2.0  # latency over the baseline tolerated before shrinking
+    concurrency_rtt_window: int = 500  # samples between re-measurements of the baseline
+    concurrency_backoff: float = 0.9  # limit multiplier after a timeout
     
     class Config:
         env_file = ".env"
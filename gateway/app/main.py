@@ -2,7 +2,13 @@
 API Gateway - Main Application Entry
 """
 from fastapi import FastAPI
+
+from app.cache import response_cache
 from app.config import settings
+from app.middleware import authenticator, rate_limiter
+from app.routes import aggregate_router, health_router, proxy_router
+from app.upstream import upstreams
+from app.utils.logging import logger
 
 app = FastAPI(
     title="QuantBull API Gateway",
@@ -10,8 +16,29 @@ app = FastAPI(
     description="API Gateway for QuantBull Platform"
 )
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "gateway"}
+app.include_router(health_router)
+app.include_router(aggregate_router)
+# Catch-all; keep last
+app.include_router(proxy_router)
+
+
+@app.on_event("startup")
+async def startup_event() -> None:
+    """Open pooled upstream connections and start background sync."""
+    logger.info(f"Starting {settings.service_name}")
+    if not settings.jwt_secret_key:
+        # With an empty key, anyone could sign tokens the gateway accepts
+        raise RuntimeError("JWT_SECRET_KEY is not set; use the key user-service signs tokens with")
+    upstreams.start()
+    authenticator.revocations.start()
+    rate_limiter.start()
+
 
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Stop background work and close connections."""
+    await rate_limiter.close()
+    await authenticator.revocations.close()
+    await upstreams.close()
+    await response_cache.close()
+    logger.info(f"Stopped {settings.service_name}")
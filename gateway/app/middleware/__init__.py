@@ -0,0 +1,28 @@
+"""
+Request checks applied by the gateway before proxying.
+"""
+from app.middleware.auth import (
+    IDENTITY_HEADERS,
+    AuthError,
+    Authenticator,
+    Principal,
+    authenticator,
+)
+from app.middleware.circuit_breaker import Admission, Overloaded, UpstreamGuard, upstream_guard
+from app.middleware.rate_limit import RateLimit, RateLimited, RateLimiter, rate_limiter
+
+__all__ = [
+    "IDENTITY_HEADERS",
+    "AuthError",
+    "Authenticator",
+    "Principal",
+    "authenticator",
+    "Admission",
+    "Overloaded",
+    "UpstreamGuard",
+    "upstream_guard",
+    "RateLimit",
+    "RateLimited",
+    "RateLimiter",
+    "rate_limiter",
+]
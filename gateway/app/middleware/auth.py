@@ -0,0 +1,340 @@
+"""
+JWT authentication with a verified-token cache and in-memory revocation checks.
+"""
+import asyncio
+import hashlib
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AbstractSet, Any, Dict, FrozenSet, Optional
+
+import httpx
+import redis.asyncio as aioredis
+from fastapi import Request
+from jose import JWTError, jwt
+
+from app.config import settings
+from app.upstream import upstreams
+from app.utils.logging import logger
+
+REVOCATIONS_PATH = "/internal/auth/revocations"
+REVOKED_KEY = "auth:revoked"  # user-service sorted set: token ID -> expiry
+
+# Identity headers set by the gateway; any sent by clients are dropped
+IDENTITY_HEADERS = frozenset({"x-user-id", "x-user-roles", "x-user-level"})
+
+# Same layout as user-service app/auth/bloom.py: magic, bit count, hash count, bits
+_BLOOM_MAGIC = b"BF1"
+_BLOOM_HEADER = struct.Struct(">3sIB")
+
+
+class AuthError(Exception):
+    """Request rejected by authentication or authorization."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        if self.status_code == 401:
+            return {"WWW-Authenticate": "Bearer"}
+        return {}
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller."""
+
+    user_id: str
+    roles: FrozenSet[str] = frozenset()
+    level: str = "registered"  # rate-limit tier
+    jti: Optional[str] = None
+    expires_at: Optional[float] = None
+    claims: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> "Principal":
+        roles = claims.get("roles") or ()
+        if isinstance(roles, str):
+            roles = roles.split(",")
+        return cls(
+            user_id=str(claims["sub"]),
+            roles=frozenset(roles),
+            level=str(claims.get("level") or "registered"),
+            jti=claims.get("jti"),
+            expires_at=float(claims["exp"]) if "exp" in claims else None,
+            claims=claims,
+        )
+
+    def upstream_headers(self) -> Dict[str, str]:
+        """Identity headers forwarded to upstream services."""
+        return {
+            "x-user-id": self.user_id,
+            "x-user-roles": ",".join(sorted(self.roles)),
+            "x-user-level": self.level,
+        }
+
+
+class BloomFilter:
+    """Read side of the revocation snapshot published by user-service."""
+
+    def __init__(self, size_bits: int, hash_count: int, bits: bytes):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.bits = bits
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        magic, size_bits, hash_count = _BLOOM_HEADER.unpack_from(data)
+        if magic != _BLOOM_MAGIC or len(data) - _BLOOM_HEADER.size < (size_bits + 7) // 8:
+            raise ValueError("Malformed Bloom filter snapshot")
+        return cls(size_bits, hash_count, data[_BLOOM_HEADER.size :])
+
+    def __contains__(self, item: str) -> bool:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            position = (h1 + i * h2) % self.size_bits
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class TokenVerifier:
+    """
+    HS256 verification with a bounded cache of verified claims.
+
+    Entries are keyed by a hash of the token, so raw tokens are not kept in
+    memory, and expire with the token. A repeat token costs one hash and
+    one dict lookup instead of a signature check.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Initialize the verifier.
+
+        Args:
+            max_entries: Cached tokens, defaults to settings.auth_cache_entries
+        """
+        self.max_entries = max_entries or settings.auth_cache_entries
+        self._cache: "OrderedDict[bytes, tuple[Principal, float]]" = OrderedDict()
+        self.stats = {"hit": 0, "miss": 0, "invalid": 0}
+
+    def verify(self, token: str) -> Principal:
+        """
+        Verify a token.
+
+        Args:
+            token: Encoded JWT
+
+        Returns:
+            Principal from the token's claims
+
+        Raises:
+            AuthError: If the signature, expiry or subject is invalid
+        """
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        now = time.time()
+        cached = self._cache.get(key)
+        if cached is not None:
+            principal, valid_until = cached
+            if now < valid_until:
+                self._cache.move_to_end(key)
+                self.stats["hit"] += 1
+                return principal
+            del self._cache[key]
+
+        self.stats["miss"] += 1
+        try:
+            claims = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+            principal = Principal.from_claims(claims)
+        except (JWTError, KeyError, TypeError, ValueError) as e:
+            self.stats["invalid"] += 1
+            logger.debug(f"Rejected token: {e}")
+            raise AuthError(401, "Invalid or expired token") from None
+
+        # Tokens without exp are re-verified periodically all the same
+        valid_until = now + settings.auth_cache_max_seconds
+        if principal.expires_at is not None:
+            valid_until = min(valid_until, principal.expires_at)
+        self._cache[key] = (principal, valid_until)
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return principal
+
+
+class RevocationFilter:
+    """
+    Revoked-token check against a Bloom filter snapshot.
+
+    A background loop fetches the snapshot from user-service whenever its
+    version changes. A token whose ID is not in the filter is certainly not
+    revoked, which settles almost every request in memory; filter hits are
+    confirmed once in Redis and remembered until the next snapshot.
+    """
+
+    def __init__(self, client: Optional[aioredis.Redis] = None):
+        """
+        Initialize an empty filter.
+
+        Args:
+            client: Async Redis client for confirming hits, defaults to settings.redis_url
+        """
+        self._client = client
+        self._bloom: Optional[BloomFilter] = None
+        self._etag: Optional[str] = None
+        self._confirmed: Dict[str, bool] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.synced_at: Optional[float] = None
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Redis client, created on first use."""
+        if self._client is None:
+            self._client = aioredis.from_url(settings.redis_url)
+        return self._client
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        Whether a token ID is revoked.
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            True if revoked; also True if a filter hit cannot be confirmed
+        """
+        if self._bloom is None or jti not in self._bloom:
+            return False
+        confirmed = self._confirmed.get(jti)
+        if confirmed is not None:
+            return confirmed
+        try:
+            expires_at = await self.client.zscore(REVOKED_KEY, jti)
+        except Exception as e:
+            logger.warning(f"Revocation check failed, rejecting token: {e}")
+            return True
+        revoked = expires_at is not None
+        self._confirmed[jti] = revoked
+        return revoked
+
+    def load(self, data: bytes, etag: Optional[str] = None) -> None:
+        """
+        Swap in a new snapshot.
+
+        Args:
+            data: Serialized filter
+            etag: Snapshot version
+        """
+        self._bloom = BloomFilter.from_bytes(data)
+        self._etag = etag
+        self._confirmed = {}
+
+    async def sync(self) -> bool:
+        """
+        Fetch the snapshot if it changed.
+
+        Returns:
+            True if a new snapshot was loaded
+        """
+        headers = {"If-None-Match": self._etag} if self._etag else {}
+        response = await upstreams.client("user_service").get(REVOCATIONS_PATH, headers=headers)
+        self.synced_at = time.time()
+        if response.status_code == 304:
+            return False
+        if response.status_code == 404:
+            # Nothing has been revoked yet
+            self._bloom = None
+            self._etag = None
+            return False
+        response.raise_for_status()
+        self.load(response.content, response.headers.get("etag"))
+        logger.info(f"Loaded revocation snapshot {self._etag} ({len(response.content)} bytes)")
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except (httpx.HTTPError, ValueError) as e:
+                # Keep checking against the last snapshot
+                logger.warning(f"Revocation snapshot sync failed: {e}")
+            await asyncio.sleep(settings.auth_revocation_sync_seconds)
+
+    def start(self) -> None:
+        """Start the background sync loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop syncing and close the Redis connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.close()
+
+
+class Authenticator:
+    """Applies a route's auth requirements to a request."""
+
+    def __init__(
+        self,
+        verifier: Optional[TokenVerifier] = None,
+        revocations: Optional[RevocationFilter] = None,
+    ):
+        self.verifier = verifier or TokenVerifier()
+        self.revocations = revocations or RevocationFilter()
+
+    async def authenticate(
+        self,
+        request: Request,
+        required: bool = False,
+        roles: AbstractSet[str] = frozenset(),
+    ) -> Optional[Principal]:
+        """
+        Identify the caller.
+
+        A bearer token is verified whenever one is sent, so public routes
+        still see who is calling; only required auth rejects anonymous
+        requests.
+
+        Args:
+            request: Incoming request
+            required: Whether the route needs an authenticated caller
+            roles: Roles of which the caller needs at least one; empty for any
+
+        Returns:
+            Principal, or None for an anonymous request to a public route
+
+        Raises:
+            AuthError: 401 for a missing, invalid or revoked token, 403 if
+                the caller lacks the route's roles
+        """
+        authorization = request.headers.get("authorization")
+        if not authorization:
+            if required:
+                raise AuthError(401, "Not authenticated")
+            return None
+
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise AuthError(401, "Invalid authorization header")
+
+        principal = self.verifier.verify(token.strip())
+        if principal.jti and await self.revocations.is_revoked(principal.jti):
+            raise AuthError(401, "Token revoked")
+        if roles and not principal.roles & roles:
+            raise AuthError(403, "Insufficient permissions")
+        return principal
+
+
+authenticator = Authenticator()
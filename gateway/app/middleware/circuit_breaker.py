@@ -0,0 +1,323 @@
+"""
+Per-upstream circuit breakers and adaptive per-route concurrency limits.
+"""
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.config import settings
+from app.utils.logging import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Weight of each new limit estimate in the smoothed concurrency limit
+_SMOOTHING = 0.2
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    """Circuit breaker thresholds for one upstream service."""
+
+    failure_threshold: int = 5  # consecutive failures that open the circuit
+    success_threshold: int = 2  # successful probes that close it again
+    timeout: float = 60  # seconds the circuit stays open
+    half_open_timeout: float = 30  # seconds before an unanswered probe counts as failed
+
+
+# Mirrors circuit_breaker in docs/design/gateway-routes.yaml
+BREAKER_CONFIGS: Dict[str, BreakerConfig] = {
+    "data_service": BreakerConfig(failure_threshold=10, timeout=30),
+    "ai_service": BreakerConfig(failure_threshold=5, timeout=120),
+    "quant_engine": BreakerConfig(failure_threshold=3, timeout=180),
+    "content_service": BreakerConfig(failure_threshold=10, timeout=30),
+}
+
+
+class Overloaded(Exception):
+    """Request shed before reaching an upstream service."""
+
+    status_code = 503
+
+    def __init__(self, detail: str, retry_after: float = 1):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    After ``failure_threshold`` failures in a row the circuit opens and
+    requests fail fast. Once ``timeout`` has passed, one probe request at a
+    time is let through; ``success_threshold`` successful probes close the
+    circuit and any failed probe opens it again.
+    """
+
+    def __init__(self, name: str, config: Optional[BreakerConfig] = None):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            name: Service name
+            config: Thresholds, defaults to BreakerConfig()
+        """
+        self.name = name
+        self.config = config or BreakerConfig()
+        self.state = CLOSED
+        self.failures = 0
+        self.successes = 0
+        self.opened_at = 0.0
+        self.probe_started: Optional[float] = None
+
+    def allow(self) -> bool:
+        """
+        Whether a request may go upstream now.
+
+        Returns:
+            True if admitted; in the half-open state the caller is the probe
+        """
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.config.timeout:
+                return False
+            self._transition(HALF_OPEN)
+        if self.probe_started is not None:
+            if now - self.probe_started < self.config.half_open_timeout:
+                return False
+            # The probe never answered
+            self._open()
+            return False
+        self.probe_started = now
+        return True
+
+    def record(self, success: bool) -> None:
+        """
+        Record the outcome of an admitted request.
+
+        Args:
+            success: Whether the upstream answered without a server error
+        """
+        if self.state == OPEN:
+            # Stragglers admitted before the circuit opened
+            return
+        if success:
+            self.failures = 0
+            if self.state == HALF_OPEN:
+                self.probe_started = None
+                self.successes += 1
+                if self.successes >= self.config.success_threshold:
+                    self._transition(CLOSED)
+            return
+
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.config.failure_threshold:
+            self._open()
+
+    def abandon_probe(self) -> None:
+        """Let another request probe; the current probe's outcome will not be recorded."""
+        if self.state == HALF_OPEN:
+            self.probe_started = None
+
+    def retry_after(self) -> float:
+        if self.state == OPEN:
+            return max(0.0, self.config.timeout - (time.monotonic() - self.opened_at))
+        return 1.0
+
+    def _open(self) -> None:
+        self.opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit for {self.name}: {self.state} -> {state}")
+        self.state = state
+        self.successes = 0
+        self.probe_started = None
+        if state == CLOSED:
+            self.failures = 0
+
+
+class ConcurrencyLimiter:
+    """
+    Concurrency limit that adapts to observed latency (gradient algorithm).
+
+    The fastest recent response time is the baseline for an unloaded
+    upstream; it is re-measured every ``concurrency_rtt_window`` samples so
+    it can follow a service that got slower for good. Each sample moves the
+    limit by the ratio of tolerated to observed latency, clamped to
+    [0.5, 1], plus headroom of sqrt(limit), so the limit grows while
+    latency holds and shrinks once requests queue upstream. Timeouts cut
+    the limit multiplicatively. Requests over the limit are rejected at
+    once instead of waiting.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Route name
+        """
+        self.name = name
+        self.limit = float(settings.concurrency_initial_limit)
+        self.inflight = 0
+        self.min_rtt: Optional[float] = None
+        self._window_min = math.inf
+        self._window_samples = 0
+
+    def acquire(self, enforce: bool = True) -> bool:
+        """
+        Take a slot.
+
+        Args:
+            enforce: Whether to refuse slots over the limit; False only tracks
+
+        Returns:
+            True if admitted
+        """
+        if enforce and self.inflight >= int(self.limit):
+            return False
+        self.inflight += 1
+        return True
+
+    def release(self) -> None:
+        self.inflight -= 1
+
+    def observe(self, rtt: float, inflight: int) -> None:
+        """
+        Update the limit from a latency sample.
+
+        Args:
+            rtt: Seconds until the upstream responded
+            inflight: Requests in flight when the sample's request started
+        """
+        self._window_min = min(self._window_min, rtt)
+        self._window_samples += 1
+        if self.min_rtt is None or rtt < self.min_rtt:
+            self.min_rtt = rtt
+        if self._window_samples >= settings.concurrency_rtt_window:
+            self.min_rtt = self._window_min
+            self._window_min = math.inf
+            self._window_samples = 0
+
+        # A limit the traffic never reached says nothing about capacity
+        if inflight < self.limit / 2:
+            return
+        gradient = max(0.5, min(1.0, settings.concurrency_tolerance * self.min_rtt / rtt))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self._set(self.limit * (1 - _SMOOTHING) + target * _SMOOTHING)
+
+    def backoff(self) -> None:
+        """Cut the limit after a timeout."""
+        self._set(self.limit * settings.concurrency_backoff)
+
+    def _set(self, limit: float) -> None:
+        self.limit = min(
+            float(settings.concurrency_max_limit),
+            max(float(settings.concurrency_min_limit), limit),
+        )
+
+
+class Admission:
+    """An admitted upstream request; record its outcome, then release it."""
+
+    def __init__(self, breaker: CircuitBreaker, limiter: ConcurrencyLimiter):
+        self.breaker = breaker
+        self.limiter = limiter
+        self.probe = breaker.state == HALF_OPEN
+        self.started = time.monotonic()
+        self.inflight = limiter.inflight
+        self._released = False
+
+    def responded(self, status_code: int) -> None:
+        """Record an upstream response; server errors count as failures."""
+        self.breaker.record(status_code < 500)
+        self.limiter.observe(time.monotonic() - self.started, self.inflight)
+
+    def failed(self, timeout: bool = False) -> None:
+        """Record a request that got no response."""
+        self.breaker.record(False)
+        if timeout:
+            self.limiter.backoff()
+
+    def abandoned(self) -> None:
+        """
+        Record a request the caller stopped waiting for at its own deadline.
+
+        A deadline tighter than the service's own timeout says nothing about
+        the service's health, so the breaker is not charged; the route's
+        concurrency limit still backs off.
+        """
+        if self.probe:
+            self.breaker.abandon_probe()
+        self.limiter.backoff()
+
+    def release(self) -> None:
+        """Free the concurrency slot; safe to call more than once."""
+        if not self._released:
+            self._released = True
+            self.limiter.release()
+
+
+class UpstreamGuard:
+    """Breakers per upstream service and concurrency limits per route."""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.limiters: Dict[str, ConcurrencyLimiter] = {}
+
+    def admit(self, service: str, route_name: str) -> Admission:
+        """
+        Admit a request to an upstream service.
+
+        Args:
+            service: Upstream service name
+            route_name: Route name
+
+        Returns:
+            Admission to record the outcome on and release
+
+        Raises:
+            Overloaded: If the circuit is open or the route is at its limit
+        """
+        breaker = self.breakers.get(service)
+        if breaker is None:
+            breaker = self.breakers[service] = CircuitBreaker(service, BREAKER_CONFIGS.get(service))
+        limiter = self.limiters.get(route_name)
+        if limiter is None:
+            limiter = self.limiters[route_name] = ConcurrencyLimiter(route_name)
+
+        if not limiter.acquire(enforce=settings.concurrency_limit_enabled):
+            raise Overloaded(f"Upstream {service} is busy")
+        if not breaker.allow():
+            limiter.release()
+            raise Overloaded(f"Upstream {service} unavailable", breaker.retry_after())
+        return Admission(breaker, limiter)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """
+        Current breaker states and concurrency limits.
+
+        Returns:
+            Breaker state per service and limit and in-flight count per route
+        """
+        return {
+            "circuits": {name: breaker.state for name, breaker in self.breakers.items()},
+            "concurrency": {
+                name: {"limit": int(limiter.limit), "inflight": limiter.inflight}
+                for name, limiter in self.limiters.items()
+            },
+        }
+
+
+upstream_guard = UpstreamGuard()
@@ -0,0 +1,366 @@
+"""
+Distributed rate limiting: local token buckets reconciled with Redis in batches.
+"""
+import asyncio
+import math
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from fastapi import Request
+
+from app.config import settings
+from app.middleware.auth import Principal
+from app.utils.logging import logger
+
+KEY_PREFIX = "rate_limit:"
+REPLICAS_KEY = f"{KEY_PREFIX}replicas"
+
+# Levels whose callers get a route's vip_limit
+VIP_LEVELS = frozenset({"vip", "premium"})
+
+# Refills each bucket's unleased pool from Redis time and resizes the
+# caller's lease to a fair share of the bucket. ARGV holds capacity, rate,
+# ttl, the lease the caller holds (negative when it overspent) and the
+# replica count (0 to hand the whole lease back) for each key in turn.
+# Returns the pool balance and the lease change for each key.
+RECONCILE_SCRIPT = """
+local now = redis.call('TIME')
+local t = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local out = {}
+for i, key in ipairs(KEYS) do
+    local base = (i - 1) * 5
+    local capacity = tonumber(ARGV[base + 1])
+    local rate = tonumber(ARGV[base + 2])
+    local ttl = tonumber(ARGV[base + 3])
+    local held = tonumber(ARGV[base + 4])
+    local replicas = tonumber(ARGV[base + 5])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or t
+    tokens = math.min(capacity, tokens + math.max(0, t - ts) * rate)
+    local delta = 0
+    if held < 0 then
+        -- Spending past the lease is charged to the pool
+        tokens = tokens + held
+        delta = -held
+        held = 0
+    end
+    local target = 0
+    if replicas > 0 and tokens + held >= 1 then
+        target = math.max(1, math.floor((tokens + held) / replicas))
+    end
+    local change = target - held
+    if change > 0 then
+        change = math.min(change, math.max(0, math.floor(tokens)))
+    end
+    tokens = math.max(-capacity, tokens - change)
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(t))
+    redis.call('EXPIRE', key, ttl)
+    out[#out + 1] = tostring(tokens)
+    out[#out + 1] = delta + change
+end
+return out
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A route's request limit."""
+
+    limit: int  # requests per window
+    window: int = 60  # seconds
+    key_by: str = "ip"  # "ip" or "user"
+    vip_limit: Optional[int] = None  # limit for VIP and premium callers
+
+
+class RateLimited(Exception):
+    """Request rejected by a rate limit."""
+
+    status_code = 429
+    detail = "Rate limit exceeded"
+
+    def __init__(self, limit: int, window: int, retry_after: float):
+        super().__init__(self.detail)
+        self.limit = limit
+        self.window = window
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Retry-After": str(max(1, math.ceil(self.retry_after))),
+            "X-RateLimit-Limit": f"{self.limit};w={self.window}",
+        }
+
+
+class LocalBucket:
+    """
+    One process's lease on a shared token bucket.
+
+    ``tokens`` is the lease, spent without asking Redis. ``pool`` is the
+    unleased balance in Redis as of the last reconciliation, refilled
+    locally since, so an exhausted bucket is rejected without a round trip.
+    """
+
+    __slots__ = ("key", "limit", "window", "tokens", "pool", "updated", "touched", "inflight")
+
+    def __init__(self, key: str, limit: int, window: int):
+        self.key = key
+        self.limit = limit
+        self.window = window
+        self.tokens = 0  # no lease until the first reconciliation
+        self.pool = float(limit)
+        self.updated = time.monotonic()
+        self.touched = self.updated
+        self.inflight: Optional[asyncio.Future] = None
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.window
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.pool = min(self.limit, self.pool + elapsed * self.rate)
+            self.updated = now
+
+    def reconciled(self, pool: float, delta: int) -> None:
+        """Apply a reconciliation result."""
+        # Spending while the call was in flight is kept; overspend goes
+        # negative and is charged at the next reconciliation
+        self.tokens += delta
+        self.pool = pool
+        self.updated = time.monotonic()
+
+    def retry_after(self) -> float:
+        return max(0.0, 1 - self.pool) / self.rate
+
+
+class RateLimiter:
+    """
+    Per-route and per-caller rate limits shared by every gateway replica.
+
+    Each bucket is a token bucket of ``limit`` tokens refilled over
+    ``window`` seconds, held in Redis. A replica leases a fair share of a
+    bucket's tokens (its balance divided by the number of live replicas)
+    and admits requests against the lease in memory, so most requests cost
+    no network round trip. Every ``rate_limit_sync_seconds`` one batched
+    script call resizes the leases of recently used buckets and returns
+    idle ones. Leased tokens are taken out of Redis when granted, so
+    replicas together never admit more than the bucket holds; a replica
+    asks Redis directly only when its lease is empty and the bucket may
+    still hold tokens.
+    """
+
+    def __init__(self, client: Optional[aioredis.Redis] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            client: Async Redis client, defaults to settings.redis_url
+        """
+        self._client = client
+        self._script = None
+        self._buckets: Dict[str, LocalBucket] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.instance_id = uuid.uuid4().hex
+        self.replicas = 1
+        self.stats = {"allowed": 0, "limited": 0, "remote": 0, "synced": 0}
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Redis client, created on first use."""
+        if self._client is None:
+            self._client = aioredis.from_url(settings.redis_url)
+        return self._client
+
+    async def check(
+        self,
+        request: Request,
+        route_name: str,
+        limit: Optional[RateLimit],
+        principal: Optional[Principal] = None,
+    ) -> None:
+        """
+        Admit a request or reject it.
+
+        Applies the route's limit and the caller's level-wide limit.
+
+        Args:
+            request: Incoming request
+            route_name: Matched route name
+            limit: Route limit, None for none
+            principal: Authenticated caller, None if anonymous
+
+        Raises:
+            RateLimited: If a limit is exhausted
+        """
+        if not settings.rate_limit_enabled:
+            return
+
+        ip = request.client.host if request.client else "unknown"
+        level = principal.level if principal is not None else "anonymous"
+        checks: List[Tuple[str, int, int]] = []
+        if limit is not None:
+            by_user = limit.key_by == "user" and principal is not None
+            caller = f"user:{principal.user_id}" if by_user else f"ip:{ip}"
+            count = limit.vip_limit if limit.vip_limit and level in VIP_LEVELS else limit.limit
+            checks.append((f"{KEY_PREFIX}{route_name}:{caller}", count, limit.window))
+        level_limit = settings.rate_limit_levels.get(level)
+        if level_limit:
+            caller = f"user:{principal.user_id}" if principal is not None else f"ip:{ip}"
+            checks.append(
+                (f"{KEY_PREFIX}global:{caller}", level_limit, settings.rate_limit_level_window)
+            )
+
+        spent: List[LocalBucket] = []
+        for key, count, window in checks:
+            bucket = self._bucket(key, count, window)
+            if not await self._take(bucket):
+                # Give back what earlier limits already took
+                for taken in spent:
+                    taken.tokens += 1
+                self.stats["limited"] += 1
+                raise RateLimited(bucket.limit, bucket.window, bucket.retry_after())
+            spent.append(bucket)
+        self.stats["allowed"] += 1
+
+    def _bucket(self, key: str, limit: int, window: int) -> LocalBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.limit != limit or bucket.window != window:
+            bucket = LocalBucket(key, limit, window)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def _take(self, bucket: LocalBucket) -> bool:
+        now = time.monotonic()
+        bucket.touched = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True
+        bucket.refill(now)
+        if bucket.pool < 1:
+            return False
+
+        # Lease spent, but the bucket may still hold tokens; one call per
+        # bucket at a time, which concurrent requests wait for
+        if bucket.inflight is not None:
+            await asyncio.shield(bucket.inflight)
+        else:
+            self.stats["remote"] += 1
+            bucket.inflight = asyncio.get_running_loop().create_future()
+            try:
+                ((pool, delta),) = await self._reconcile([bucket], self.replicas)
+                bucket.reconciled(pool, delta)
+            except Exception as e:
+                logger.warning(f"Rate limit check failed, deciding locally: {e}")
+                bucket.pool -= 1
+                return True
+            finally:
+                bucket.inflight.set_result(None)
+                bucket.inflight = None
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return True
+        return False
+
+    async def _reconcile(
+        self,
+        buckets: List[LocalBucket],
+        replicas: int,
+    ) -> List[Tuple[float, int]]:
+        """
+        Resize leases in Redis.
+
+        Args:
+            buckets: Buckets to reconcile
+            replicas: Live replica count, 0 to return the leases
+
+        Returns:
+            Pool balance and lease change per bucket
+        """
+        if self._script is None:
+            self._script = self.client.register_script(RECONCILE_SCRIPT)
+        args: List[float] = []
+        for bucket in buckets:
+            args.extend((bucket.limit, bucket.rate, bucket.window * 2, bucket.tokens, replicas))
+        result = await self._script(keys=[bucket.key for bucket in buckets], args=args)
+        return [(float(result[i]), int(result[i + 1])) for i in range(0, len(result), 2)]
+
+    async def sync(self) -> int:
+        """
+        Resize the leases of buckets in use and return idle ones.
+
+        Returns:
+            Number of buckets reconciled
+        """
+        now = time.monotonic()
+        idle_after = settings.rate_limit_sync_seconds * 2
+
+        pipe = self.client.pipeline(transaction=False)
+        wall = time.time()
+        pipe.zadd(REPLICAS_KEY, {self.instance_id: wall})
+        pipe.zremrangebyscore(REPLICAS_KEY, "-inf", wall - max(5.0, idle_after * 10))
+        pipe.zcard(REPLICAS_KEY)
+        self.replicas = max(1, (await pipe.execute())[-1])
+
+        active: List[LocalBucket] = []
+        idle: List[LocalBucket] = []
+        for key, bucket in list(self._buckets.items()):
+            if bucket.inflight is not None:
+                continue
+            if now - bucket.touched <= idle_after:
+                active.append(bucket)
+            elif bucket.tokens:
+                idle.append(bucket)
+            else:
+                del self._buckets[key]
+
+        batch = settings.rate_limit_sync_batch
+        for buckets, replicas in ((active, self.replicas), (idle, 0)):
+            for start in range(0, len(buckets), batch):
+                chunk = buckets[start : start + batch]
+                for bucket, (pool, delta) in zip(chunk, await self._reconcile(chunk, replicas)):
+                    bucket.reconciled(pool, delta)
+        self.stats["synced"] += len(active) + len(idle)
+        return len(active) + len(idle)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.rate_limit_sync_seconds)
+            try:
+                await self.sync()
+            except Exception as e:
+                # Leases and pool estimates keep limiting until Redis is back
+                logger.warning(f"Rate limit sync failed: {e}")
+
+    def start(self) -> None:
+        """Start the background reconciliation loop."""
+        if self._task is None and settings.rate_limit_enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Return leases, stop syncing and close the Redis connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            for bucket in self._buckets.values():
+                bucket.touched = float("-inf")
+            try:
+                await self.sync()
+                await self.client.zrem(REPLICAS_KEY, self.instance_id)
+            except Exception as e:
+                logger.warning(f"Final rate limit sync failed: {e}")
+        if self._client is not None:
+            await self._client.close()
+
+
+rate_limiter = RateLimiter()
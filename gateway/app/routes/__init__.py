@@ -0,0 +1,10 @@
+"""
+Gateway routes.
+
+The proxy router catches every path, so it must be included last.
+"""
+from app.routes.aggregate import router as aggregate_router
+from app.routes.health import router as health_router
+from app.routes.proxy import router as proxy_router
+
+__all__ = ["aggregate_router", "health_router", "proxy_router"]
@@ -0,0 +1,228 @@
+"""
+Composite endpoints that fan out to several services in one round trip.
+"""
+import asyncio
+import gzip
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from app.middleware import (
+    AuthError,
+    Overloaded,
+    Principal,
+    RateLimit,
+    RateLimited,
+    authenticator,
+    rate_limiter,
+    upstream_guard,
+)
+from app.upstream import upstreams
+from app.utils.logging import logger
+from app.utils.response import error_response
+
+router = APIRouter()
+
+# Payloads smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+
+
+@dataclass(frozen=True)
+class Part:
+    """One upstream call of a composite endpoint."""
+
+    name: str
+    service: str
+    path: str
+    params: Dict[str, str] = field(default_factory=dict)
+    timeout: float = 2.0  # seconds; a slower part is left out of the payload
+    auth_required: bool = False  # skipped for anonymous callers
+
+
+@dataclass(frozen=True)
+class Composite:
+    """An endpoint merging several parts into one payload."""
+
+    name: str
+    path: str
+    parts: Tuple[Part, ...]
+    rate_limit: Optional[RateLimit] = None
+
+
+COMPOSITES: List[Composite] = [
+    # Miniapp home screen
+    Composite(
+        "aggregate_home",
+        "/api/v1/aggregate/home",
+        (
+            Part(
+                "quotes",
+                "data_service",
+                "/api/v1/market/quotes",
+                {"codes": "000001.SH,399001.SZ,399006.SZ"},
+                timeout=1.5,
+            ),
+            Part("report", "content_service", "/api/v1/daily-reports/latest"),
+            Part("scores", "quant_engine", "/api/v1/factors/scores", {"limit": "10"}),
+            Part("watchlist", "user_service", "/api/v1/watchlist", auth_required=True),
+        ),
+        rate_limit=RateLimit(300),
+    ),
+]
+
+
+async def _fetch(
+    composite: Composite,
+    part: Part,
+    params: Dict[str, str],
+    headers: Dict[str, str],
+) -> Tuple[Any, Optional[str]]:
+    """
+    Call one part.
+
+    Returns:
+        Tuple of (data, error); data is None when error is set
+    """
+    route_name = f"{composite.name}.{part.name}"
+    try:
+        admission = upstream_guard.admit(part.service, route_name)
+    except Overloaded as e:
+        return None, e.detail
+    try:
+        response = await asyncio.wait_for(
+            upstreams.client(part.service).get(
+                part.path,
+                params=params,
+                headers=headers,
+                timeout=upstreams.timeout(part.service, part.timeout),
+            ),
+            part.timeout,
+        )
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        # The part's deadline is much tighter than the service timeout, so a
+        # slow part must not open the breaker shared with the service's routes
+        admission.abandoned()
+        return None, "timeout"
+    except httpx.TransportError as e:
+        admission.failed()
+        logger.warning(f"Aggregate part {route_name} failed: {e}")
+        return None, f"{part.service} unavailable"
+    finally:
+        admission.release()
+
+    admission.responded(response.status_code)
+    if response.status_code >= 400:
+        return None, f"HTTP {response.status_code}"
+    try:
+        return response.json(), None
+    except ValueError:
+        return None, "invalid response"
+
+
+async def aggregate(request: Request, composite: Composite) -> Response:
+    """
+    Serve a composite endpoint.
+
+    Parts are fetched concurrently, each under its own timeout, circuit
+    breaker and concurrency limit, so the payload arrives after the slowest
+    part or its timeout rather than the sum of all calls. Failed parts are
+    left out and reported under ``errors``. Client query parameters named
+    ``<part>.<param>`` override that part's parameters.
+
+    Args:
+        request: Incoming request
+        composite: Composite endpoint
+
+    Returns:
+        JSON payload, gzip-compressed when the client accepts it, or 502
+        if every part failed
+    """
+    try:
+        principal = await authenticator.authenticate(request)
+    except AuthError as e:
+        return error_response(e.status_code, e.detail, headers=e.headers)
+    try:
+        await rate_limiter.check(request, composite.name, composite.rate_limit, principal)
+    except RateLimited as e:
+        return error_response(e.status_code, e.detail, headers=e.headers)
+
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    headers = _part_headers(request, request_id, principal)
+    parts = [part for part in composite.parts if principal is not None or not part.auth_required]
+    results = await asyncio.gather(
+        *(_fetch(composite, part, _part_params(request, part), headers) for part in parts)
+    )
+
+    data: Dict[str, Any] = {part.name: None for part in composite.parts}
+    errors: Dict[str, str] = {}
+    for part, (value, error) in zip(parts, results):
+        if error is None:
+            data[part.name] = value
+        else:
+            errors[part.name] = error
+    if parts and len(errors) == len(parts):
+        return error_response(
+            502, "All upstream parts failed", headers={"x-request-id": request_id}
+        )
+    if errors:
+        logger.info(f"{composite.name} partial: {errors}")
+
+    payload = {"data": data, "errors": errors, "partial": bool(errors)}
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    response_headers = {
+        "x-request-id": request_id,
+        "Cache-Control": "private, no-cache" if principal is not None else "no-cache",
+        "Vary": "Accept-Encoding, Authorization",
+    }
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        response_headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=response_headers)
+
+
+def _part_params(request: Request, part: Part) -> Dict[str, str]:
+    params = dict(part.params)
+    prefix = f"{part.name}."
+    for key, value in request.query_params.items():
+        if key.startswith(prefix):
+            params[key[len(prefix) :]] = value
+    return params
+
+
+def _part_headers(
+    request: Request,
+    request_id: str,
+    principal: Optional[Principal],
+) -> Dict[str, str]:
+    client_ip = request.client.host if request.client else ""
+    forwarded_for = request.headers.get("x-forwarded-for")
+    headers = {
+        "accept": "application/json",
+        "x-request-id": request_id,
+        "x-forwarded-for": f"{forwarded_for}, {client_ip}" if forwarded_for else client_ip,
+    }
+    if principal is not None:
+        headers.update(principal.upstream_headers())
+    return headers
+
+
+def _endpoint(composite: Composite):
+    async def endpoint(request: Request) -> Response:
+        return await aggregate(request, composite)
+
+    return endpoint
+
+
+for _composite in COMPOSITES:
+    router.add_api_route(
+        _composite.path,
+        _endpoint(_composite),
+        methods=["GET"],
+        name=_composite.name,
+        summary=f"Composite endpoint: {', '.join(part.name for part in _composite.parts)}",
+    )
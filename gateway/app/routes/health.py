@@ -0,0 +1,17 @@
+"""
+Gateway health check.
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.config import settings
+from app.middleware import upstream_guard
+
+router = APIRouter()
+
+
+@router.get("/health")
+async def health_check() -> Dict[str, Any]:
+    """Health check endpoint, with upstream circuit states and concurrency limits"""
+    return {"status": "healthy", "service": settings.service_name, **upstream_guard.snapshot()}
@@ -0,0 +1,258 @@
+"""
+Reverse proxy from public gateway paths to the upstream services.
+"""
+import uuid
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+import httpx
+from fastapi import APIRouter, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.cache import CachedResponse, is_cacheable, response_cache
+from app.config import settings
+from app.middleware import (
+    IDENTITY_HEADERS,
+    Admission,
+    AuthError,
+    Overloaded,
+    Principal,
+    RateLimited,
+    authenticator,
+    rate_limiter,
+    upstream_guard,
+)
+from app.routes.table import MethodNotAllowed, RouteMatch, route_table
+from app.upstream import upstreams
+from app.utils.logging import logger
+from app.utils.response import error_response
+
+router = APIRouter()
+
+PROXY_METHODS = ["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"]
+
+# Connection-scoped headers that must not be forwarded (RFC 9110 section 7.6.1)
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+})
+
+
+def _request_headers(
+    request: Request,
+    request_id: str,
+    principal: Optional[Principal] = None,
+) -> list:
+    headers = [
+        (key, value)
+        for key, value in request.headers.raw
+        if key.decode("latin-1") not in HOP_BY_HOP_HEADERS
+        and key.decode("latin-1") not in IDENTITY_HEADERS
+        and key != b"host"
+    ]
+    client_ip = request.client.host if request.client else ""
+    forwarded_for = request.headers.get("x-forwarded-for")
+    headers = [(key, value) for key, value in headers if key != b"x-forwarded-for"]
+    headers.append((
+        b"x-forwarded-for",
+        (f"{forwarded_for}, {client_ip}" if forwarded_for else client_ip).encode("latin-1"),
+    ))
+    headers.append((b"x-forwarded-proto", request.url.scheme.encode("latin-1")))
+    if "x-forwarded-host" not in request.headers and "host" in request.headers:
+        headers.append((b"x-forwarded-host", request.headers["host"].encode("latin-1")))
+    if "x-request-id" not in request.headers:
+        headers.append((b"x-request-id", request_id.encode("latin-1")))
+    if principal is not None:
+        for key, value in principal.upstream_headers().items():
+            headers.append((key.encode("latin-1"), value.encode("utf-8")))
+    return headers
+
+
+def _response_headers(response: httpx.Response, request_id: str) -> List[Tuple[str, str]]:
+    headers = [
+        (key, value)
+        for key, value in response.headers.multi_items()
+        if key.lower() not in HOP_BY_HOP_HEADERS
+    ]
+    if "x-request-id" not in response.headers:
+        headers.append(("x-request-id", request_id))
+    return headers
+
+
+def _with_headers(response: Response, headers: List[Tuple[str, str]]) -> Response:
+    # Appended one by one so repeated headers such as Set-Cookie survive
+    for key, value in headers:
+        response.headers.append(key, value)
+    return response
+
+
+@router.api_route("/{path:path}", methods=PROXY_METHODS, include_in_schema=False)
+async def proxy(request: Request, path: str) -> Response:
+    """
+    Forward a request to the service its route points at.
+
+    The caller is authenticated and rate limited first, and passed
+    upstream as X-User-* headers. Request and response bodies are streamed through without
+    buffering, so large uploads, downloads and server-sent events pass
+    straight through. GET requests on routes with a cache TTL are answered
+    through the response cache instead.
+
+    Args:
+        request: Incoming request
+        path: Request path
+
+    Returns:
+        Upstream or cached response, or a 401/403/404/405/429/502/504 error
+    """
+    try:
+        match = route_table.match(request.method, request.url.path)
+    except MethodNotAllowed as e:
+        return error_response(405, "Method not allowed", headers={"Allow": ", ".join(e.allowed)})
+    if match is None:
+        return error_response(404, "Not found")
+
+    route = match.route
+    try:
+        principal = await authenticator.authenticate(request, route.auth_required, route.roles)
+    except AuthError as e:
+        return error_response(e.status_code, e.detail, headers=e.headers)
+    request.state.principal = principal
+    try:
+        await rate_limiter.check(request, route.name, route.rate_limit, principal)
+    except RateLimited as e:
+        return error_response(e.status_code, e.detail, headers=e.headers)
+
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    if request.method == "GET" and route.cache_ttl and settings.cache_enabled:
+
+        async def load() -> Union[CachedResponse, Response]:
+            return await _forward(request, match, request_id, buffer=True)
+
+        response = await response_cache.serve(request, route.name, load)
+        response.headers.setdefault("x-request-id", request_id)
+        return response
+
+    return await _forward(request, match, request_id)
+
+
+async def _forward(
+    request: Request,
+    match: RouteMatch,
+    request_id: str,
+    buffer: bool = False,
+) -> Union[CachedResponse, Response]:
+    """
+    Send a request upstream through its circuit breaker and concurrency limit.
+
+    Args:
+        request: Incoming request
+        match: Matched route
+        request_id: Request ID passed upstream
+        buffer: Read cacheable responses up to settings.cache_max_body_bytes
+            into a CachedResponse instead of streaming them
+
+    Returns:
+        CachedResponse when buffered, otherwise the response for the client
+    """
+    route = match.route
+    try:
+        admission = upstream_guard.admit(route.service, route.name)
+    except Overloaded as e:
+        return error_response(e.status_code, e.detail, headers=e.headers)
+    try:
+        return await _send(request, match, request_id, buffer, admission)
+    except BaseException:
+        admission.release()
+        raise
+
+
+async def _send(
+    request: Request,
+    match: RouteMatch,
+    request_id: str,
+    buffer: bool,
+    admission: Admission,
+) -> Union[CachedResponse, Response]:
+    route = match.route
+    client = upstreams.client(route.service)
+
+    url = match.upstream_path
+    if request.url.query:
+        url = f"{url}?{request.url.query}"
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+
+    upstream_request = client.build_request(
+        request.method,
+        url,
+        headers=_request_headers(request, request_id, request.state.principal),
+        content=request.stream() if has_body else None,
+        timeout=upstreams.timeout(route.service, route.timeout),
+    )
+    try:
+        upstream_response = await client.send(upstream_request, stream=True)
+    except httpx.TimeoutException:
+        admission.failed(timeout=True)
+        admission.release()
+        logger.warning(f"Upstream timeout: {route.name} -> {route.service}{url}")
+        return error_response(504, f"Upstream {route.service} timed out")
+    except httpx.TransportError as e:
+        admission.failed()
+        admission.release()
+        logger.warning(f"Upstream unavailable: {route.name} -> {route.service}: {e}")
+        return error_response(502, f"Upstream {route.service} unavailable")
+    admission.responded(upstream_response.status_code)
+
+    headers = _response_headers(upstream_response, request_id)
+    if buffer and is_cacheable(upstream_response.status_code, headers):
+        length = upstream_response.headers.get("content-length")
+        if length is None or int(length) <= settings.cache_max_body_bytes:
+            try:
+                # Raw bytes, matching the Content-Encoding header passed on with them
+                body = b"".join([chunk async for chunk in upstream_response.aiter_raw()])
+            except httpx.HTTPError as e:
+                logger.warning(f"Upstream read failed: {route.name} -> {route.service}: {e}")
+                return error_response(502, f"Upstream {route.service} unavailable")
+            finally:
+                await upstream_response.aclose()
+                admission.release()
+            if len(body) <= settings.cache_max_body_bytes:
+                return CachedResponse.build(
+                    upstream_response.status_code, headers, body, route.cache_ttl, route.cache_stale
+                )
+            return _with_headers(
+                Response(body, status_code=upstream_response.status_code),
+                [(key, value) for key, value in headers if key.lower() != "content-length"],
+            )
+
+    return _with_headers(
+        StreamingResponse(
+            _relay(upstream_response, admission),
+            status_code=upstream_response.status_code,
+            background=BackgroundTask(_close, upstream_response, admission),
+        ),
+        headers,
+    )
+
+
+async def _relay(upstream_response: httpx.Response, admission: Admission) -> AsyncIterator[bytes]:
+    # The concurrency slot is held until the body is relayed, as the upstream
+    # is busy until then; released here too in case a client disconnect
+    # skips the background task
+    try:
+        async for chunk in upstream_response.aiter_raw():
+            yield chunk
+    finally:
+        admission.release()
+
+
+async def _close(upstream_response: httpx.Response, admission: Admission) -> None:
+    try:
+        await upstream_response.aclose()
+    finally:
+        admission.release()
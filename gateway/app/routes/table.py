@@ -0,0 +1,430 @@
+"""
+Route table mapping public gateway paths to upstream services.
+
+Mirrors the proxied routes in docs/design/gateway-routes.yaml.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple, Union
+from urllib.parse import quote
+
+from app.middleware.rate_limit import RateLimit
+
+PARAM_PATTERN = re.compile(r"\{(\w+)\}")
+
+# Path segments an upstream would resolve against the segments before them
+DOT_SEGMENTS = frozenset({".", ".."})
+
+
+@dataclass(frozen=True)
+class Route:
+    """One proxied route."""
+
+    name: str
+    path: str
+    service: str
+    target_path: str
+    methods: FrozenSet[str] = frozenset({"GET"})
+    timeout: Optional[float] = None  # seconds, defaults to the service timeout
+    cache_ttl: Optional[int] = None  # seconds a GET response is fresh; None disables caching
+    cache_stale: int = 0  # seconds an expired response may be served while it is refreshed
+    auth_required: bool = False
+    roles: FrozenSet[str] = frozenset()  # the caller needs any one of these; empty allows all
+    rate_limit: Optional[RateLimit] = None
+
+
+@dataclass(frozen=True)
+class RouteMatch:
+    """A route matched against a request path."""
+
+    route: Route
+    upstream_path: str
+    params: Dict[str, str] = field(default_factory=dict)  # decoded values
+
+
+class MethodNotAllowed(Exception):
+    """The path matched a route, but not for the request method."""
+
+    def __init__(self, allowed: Iterable[str]):
+        super().__init__("Method not allowed")
+        self.allowed = sorted(allowed)
+
+
+class RouteTable:
+    """
+    Path matcher for the route table.
+
+    Static paths are found with one dict lookup. Paths with ``{param}``
+    segments are grouped by their first segment, which must be static, and
+    their segment count, so only a few compiled patterns are tried per
+    request.
+
+    Requests are only sent to the path their route allows: paths with ``.``
+    or ``..`` segments match nothing, and parameters are percent-encoded
+    into the upstream path, so a value can never add segments or a query.
+    """
+
+    def __init__(self, routes: Iterable[Route]):
+        """
+        Build the matcher.
+
+        Args:
+            routes: Routes, in priority order
+        """
+        self.routes = list(routes)
+        self._static: Dict[str, List[Route]] = {}
+        self._dynamic: Dict[Tuple[str, int], List[Tuple[Pattern, Route]]] = {}
+        for route in self.routes:
+            if PARAM_PATTERN.search(route.path) is None:
+                self._static.setdefault(route.path, []).append(route)
+                continue
+            bucket = self._dynamic.setdefault(_bucket(route.path), [])
+            bucket.append((_compile(route.path), route))
+
+    def match(self, method: str, path: str) -> Optional[RouteMatch]:
+        """
+        Find the route for a request.
+
+        Args:
+            method: HTTP method
+            path: Request path
+
+        Returns:
+            RouteMatch, or None if no route has this path
+
+        Raises:
+            MethodNotAllowed: If routes have this path but not this method
+        """
+        if any(segment in DOT_SEGMENTS for segment in path.split("/")):
+            return None
+
+        allowed: List[str] = []
+        for route in self._static.get(path, ()):
+            if method in route.methods:
+                return RouteMatch(route, route.target_path)
+            allowed.extend(route.methods)
+
+        for pattern, route in self._dynamic.get(_bucket(path), ()):
+            found = pattern.match(path)
+            if found is None:
+                continue
+            if method not in route.methods:
+                allowed.extend(route.methods)
+                continue
+            params = found.groupdict()
+            encoded = {name: quote(value, safe="") for name, value in params.items()}
+            return RouteMatch(route, route.target_path.format_map(encoded), params)
+
+        if allowed:
+            raise MethodNotAllowed(set(allowed))
+        return None
+
+
+def _bucket(path: str) -> Tuple[str, int]:
+    """First segment and segment count of a path."""
+    segments = path.strip("/").split("/")
+    return segments[0], len(segments)
+
+
+def _compile(path: str) -> Pattern:
+    """Regex matching a path template, capturing each ``{param}`` segment."""
+    parts = []
+    position = 0
+    for match in PARAM_PATTERN.finditer(path):
+        parts.append(re.escape(path[position : match.start()]))
+        parts.append(f"(?P<{match.group(1)}>[^/]+)")
+        position = match.end()
+    parts.append(re.escape(path[position:]))
+    return re.compile("^" + "".join(parts) + "$")
+
+
+def _route(
+    name: str,
+    path: str,
+    service: str,
+    target_path: str,
+    methods: Union[str, Iterable[str]] = "GET",
+    timeout: Optional[float] = None,
+    cache_ttl: Optional[int] = None,
+    cache_stale: Optional[int] = None,
+    auth_required: bool = False,
+    roles: Iterable[str] = (),
+    rate_limit: Optional[RateLimit] = None,
+) -> Route:
+    methods = {methods} if isinstance(methods, str) else set(methods)
+    # Unless set, an expired entry may be served stale for as long again as it was fresh
+    stale = cache_stale if cache_stale is not None else (cache_ttl or 0)
+    return Route(
+        name,
+        path,
+        service,
+        target_path,
+        frozenset(methods),
+        timeout,
+        cache_ttl,
+        stale,
+        auth_required,
+        frozenset(roles),
+        rate_limit,
+    )
+
+
+ROUTES: List[Route] = [
+    # Data service
+    _route(
+        "market_quotes",
+        "/api/v1/data/market/quotes",
+        "data_service",
+        "/api/v1/market/quotes",
+        cache_ttl=60,
+        rate_limit=RateLimit(1000),
+    ),
+    _route(
+        "market_kline",
+        "/api/v1/data/market/kline",
+        "data_service",
+        "/api/v1/market/kline",
+        cache_ttl=300,
+        rate_limit=RateLimit(500),
+    ),
+    _route(
+        "market_realtime",
+        "/api/v1/data/market/realtime",
+        "data_service",
+        "/api/v1/market/realtime",
+        rate_limit=RateLimit(100),
+    ),
+    _route(
+        "news_list",
+        "/api/v1/data/news",
+        "data_service",
+        "/api/v1/news/list",
+        cache_ttl=300,
+        rate_limit=RateLimit(500),
+    ),
+    _route(
+        "news_detail",
+        "/api/v1/data/news/{id}",
+        "data_service",
+        "/api/v1/news/{id}",
+        cache_ttl=3600,
+        rate_limit=RateLimit(200),
+    ),
+    _route(
+        "etf_list",
+        "/api/v1/data/etf",
+        "data_service",
+        "/api/v1/etf/list",
+        cache_ttl=1800,
+        rate_limit=RateLimit(200),
+    ),
+    _route(
+        "company_info",
+        "/api/v1/data/companies/{code}",
+        "data_service",
+        "/api/v1/companies/{code}",
+        cache_ttl=3600,
+        rate_limit=RateLimit(300),
+    ),
+    # AI service
+    _route(
+        "ai_generate_news",
+        "/api/v1/ai/generate/news",
+        "ai_service",
+        "/api/v1/generate/news",
+        "POST",
+        auth_required=True,
+        rate_limit=RateLimit(10, key_by="user", vip_limit=50),
+    ),
+    _route(
+        "ai_generate_strategy",
+        "/api/v1/ai/generate/strategy",
+        "ai_service",
+        "/api/v1/generate/strategy",
+        "POST",
+        timeout=180,
+        auth_required=True,
+        rate_limit=RateLimit(5, key_by="user", vip_limit=20),
+    ),
+    _route(
+        "ai_generate_daily_report",
+        "/api/v1/ai/generate/daily-report",
+        "ai_service",
+        "/api/v1/generate/daily-report",
+        "POST",
+        timeout=300,
+        auth_required=True,
+        rate_limit=RateLimit(1, window=86400, key_by="user"),
+    ),
+    _route(
+        "ai_generate_company_intro",
+        "/api/v1/ai/generate/company-intro",
+        "ai_service",
+        "/api/v1/generate/company-intro",
+        "POST",
+        auth_required=True,
+        rate_limit=RateLimit(20, key_by="user", vip_limit=100),
+    ),
+    _route(
+        "ai_generate_video_script",
+        "/api/v1/ai/generate/video-script",
+        "ai_service",
+        "/api/v1/generate/video-script",
+        "POST",
+        auth_required=True,
+        rate_limit=RateLimit(10, key_by="user"),
+    ),
+    _route(
+        "ai_generate_stream",
+        "/api/v1/ai/generate/stream",
+        "ai_service",
+        "/generate/stream",
+        "POST",
+        timeout=300,
+        auth_required=True,
+        rate_limit=RateLimit(10, key_by="user", vip_limit=50),
+    ),
+    _route(
+        "ai_prompts",
+        "/api/v1/ai/prompts",
+        "ai_service",
+        "/api/v1/prompts",
+        cache_ttl=3600,
+        rate_limit=RateLimit(100),
+    ),
+    # Quant engine
+    _route(
+        "quant_backtest_run",
+        "/api/v1/quant/backtest",
+        "quant_engine",
+        "/api/v1/backtest/run",
+        "POST",
+        timeout=600,
+        auth_required=True,
+        rate_limit=RateLimit(5, key_by="user", vip_limit=20),
+    ),
+    _route(
+        "quant_backtest_result",
+        "/api/v1/quant/backtest/{id}",
+        "quant_engine",
+        "/api/v1/backtest/{id}",
+        cache_ttl=3600,
+        auth_required=True,
+        rate_limit=RateLimit(50, key_by="user"),
+    ),
+    _route(
+        "quant_strategies",
+        "/api/v1/quant/strategies",
+        "quant_engine",
+        "/api/v1/strategies",
+        cache_ttl=1800,
+        rate_limit=RateLimit(100),
+    ),
+    _route(
+        "quant_strategy_detail",
+        "/api/v1/quant/strategies/{id}",
+        "quant_engine",
+        "/api/v1/strategies/{id}",
+        cache_ttl=1800,
+        rate_limit=RateLimit(100),
+    ),
+    _route(
+        "quant_calculate_factors",
+        "/api/v1/quant/factors/calculate",
+        "quant_engine",
+        "/api/v1/factors/calculate",
+        "POST",
+        timeout=120,
+        auth_required=True,
+        rate_limit=RateLimit(20, key_by="user", vip_limit=100),
+    ),
+    _route(
+        "quant_select_stocks",
+        "/api/v1/quant/selectors/stocks",
+        "quant_engine",
+        "/api/v1/selectors/stocks",
+        "POST",
+        timeout=180,
+        auth_required=True,
+        rate_limit=RateLimit(10, key_by="user", vip_limit=50),
+    ),
+    _route(
+        "quant_select_etf",
+        "/api/v1/quant/selectors/etf",
+        "quant_engine",
+        "/api/v1/selectors/etf",
+        "POST",
+        timeout=180,
+        auth_required=True,
+        rate_limit=RateLimit(10, key_by="user", vip_limit=50),
+    ),
+    # Content service
+    _route(
+        "content_articles",
+        "/api/v1/content/articles",
+        "content_service",
+        "/api/v1/articles",
+        cache_ttl=300,
+        rate_limit=RateLimit(500),
+    ),
+    _route(
+        "content_article_detail",
+        "/api/v1/content/articles/{id}",
+        "content_service",
+        "/api/v1/articles/{id}",
+        cache_ttl=3600,
+        rate_limit=RateLimit(200),
+    ),
+    _route(
+        "content_article_create",
+        "/api/v1/content/articles",
+        "content_service",
+        "/api/v1/articles",
+        "POST",
+        auth_required=True,
+        roles=["admin", "editor"],
+        rate_limit=RateLimit(20, key_by="user"),
+    ),
+    _route(
+        "content_daily_reports",
+        "/api/v1/content/daily-reports",
+        "content_service",
+        "/api/v1/daily-reports",
+        cache_ttl=300,
+        rate_limit=RateLimit(100),
+    ),
+    _route(
+        "content_daily_report_detail",
+        "/api/v1/content/daily-reports/{id}",
+        "content_service",
+        "/api/v1/daily-reports/{id}",
+        cache_ttl=3600,
+        rate_limit=RateLimit(100),
+    ),
+    _route(
+        "content_h5_page",
+        "/h5/{type}/{id}",
+        "content_service",
+        "/api/v1/h5/{type}/{id}",
+        cache_ttl=1800,
+        rate_limit=RateLimit(1000),
+    ),
+    _route(
+        "content_videos",
+        "/api/v1/content/videos",
+        "content_service",
+        "/api/v1/videos",
+        cache_ttl=600,
+        rate_limit=RateLimit(200),
+    ),
+    _route(
+        "content_video_detail",
+        "/api/v1/content/videos/{id}",
+        "content_service",
+        "/api/v1/videos/{id}",
+        cache_ttl=1800,
+        rate_limit=RateLimit(200),
+    ),
+]
+
+route_table = RouteTable(ROUTES)
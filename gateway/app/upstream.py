@@ -0,0 +1,112 @@
+"""
+Pooled HTTP clients for the upstream services.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+
+from app.config import settings
+from app.utils.logging import logger
+
+
+@dataclass(frozen=True)
+class Service:
+    """An upstream service."""
+
+    name: str
+    base_url: str
+    timeout: float
+
+
+def configured_services() -> Dict[str, Service]:
+    """
+    Upstream services from settings.
+
+    Returns:
+        Services by name, as referenced by the route table
+    """
+    services = [
+        Service("data_service", settings.data_service_url, settings.data_service_timeout),
+        Service("ai_service", settings.ai_service_url, settings.ai_service_timeout),
+        Service("quant_engine", settings.quant_engine_url, settings.quant_engine_timeout),
+        Service("content_service", settings.content_service_url, settings.content_service_timeout),
+        Service("user_service", settings.user_service_url, settings.user_service_timeout),
+    ]
+    return {service.name: service for service in services}
+
+
+class UpstreamPool:
+    """
+    One long-lived keep-alive client per upstream service.
+
+    Connections are reused across requests, so a proxied call normally
+    costs no TCP handshake. Clients belong to the event loop that started
+    the pool.
+    """
+
+    def __init__(self, services: Optional[Dict[str, Service]] = None):
+        """
+        Initialize an empty pool.
+
+        Args:
+            services: Upstream services, defaults to configured_services()
+        """
+        self.services = services if services is not None else configured_services()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def start(self) -> None:
+        """Create the service clients."""
+        limits = httpx.Limits(
+            max_connections=settings.upstream_max_connections,
+            max_keepalive_connections=settings.upstream_max_keepalive,
+            keepalive_expiry=settings.upstream_keepalive_expiry,
+        )
+        for name, service in self.services.items():
+            self._clients[name] = httpx.AsyncClient(
+                base_url=service.base_url,
+                timeout=httpx.Timeout(service.timeout, connect=settings.upstream_connect_timeout),
+                limits=limits,
+                follow_redirects=False,
+            )
+        logger.info(f"Upstream pool started for: {list(self._clients)}")
+
+    def client(self, service: str) -> httpx.AsyncClient:
+        """
+        Client for a service.
+
+        Args:
+            service: Service name
+
+        Returns:
+            Pooled client
+
+        Raises:
+            KeyError: If the service is unknown or the pool is not started
+        """
+        return self._clients[service]
+
+    def timeout(self, service: str, seconds: Optional[float] = None) -> httpx.Timeout:
+        """
+        Request timeout for a service.
+
+        Args:
+            service: Service name
+            seconds: Route override of the service timeout
+
+        Returns:
+            httpx timeout
+        """
+        return httpx.Timeout(
+            seconds or self.services[service].timeout,
+            connect=settings.upstream_connect_timeout,
+        )
+
+    async def close(self) -> None:
+        """Close every client."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+upstreams = UpstreamPool()
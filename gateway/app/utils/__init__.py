@@ -0,0 +1,7 @@
+"""
+Utility modules for the API gateway.
+"""
+from app.utils.logging import logger, setup_logger
+from app.utils.response import error_response
+
+__all__ = ["logger", "setup_logger", "error_response"]
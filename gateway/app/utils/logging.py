@@ -0,0 +1,45 @@
+"""
+Logging configuration for the API gateway.
+"""
+import logging
+import sys
+from typing import Optional
+
+from app.config import settings
+
+
+def setup_logger(name: str = "gateway", log_level: Optional[str] = None) -> logging.Logger:
+    """
+    Setup and configure logger.
+
+    Args:
+        name: Logger name
+        log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
+
+    Returns:
+        Configured logger instance
+    """
+    logger = logging.getLogger(name)
+
+    if log_level:
+        logger.setLevel(getattr(logging, log_level.upper()))
+    elif settings.debug:
+        logger.setLevel(logging.DEBUG)
+    else:
+        logger.setLevel(logging.INFO)
+
+    # Avoid duplicate handlers
+    if logger.handlers:
+        return logger
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter(
+        fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    ))
+    logger.addHandler(handler)
+    return logger
+
+
+# Global logger instance
+logger = setup_logger()
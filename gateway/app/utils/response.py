@@ -0,0 +1,25 @@
+"""
+Response helpers shared by gateway routes and middleware.
+"""
+from typing import Mapping, Optional
+
+from fastapi.responses import JSONResponse
+
+
+def error_response(
+    status_code: int,
+    detail: str,
+    headers: Optional[Mapping[str, str]] = None,
+) -> JSONResponse:
+    """
+    Error response in FastAPI's ``{"detail": ...}`` shape.
+
+    Args:
+        status_code: HTTP status code
+        detail: Error message
+        headers: Extra response headers
+
+    Returns:
+        JSON error response
+    """
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
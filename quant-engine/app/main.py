@@ -7,13 +7,13 @@ middleware, and startup/shutdown events.
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-import redis
+import httpx
 from fastapi import FastAPI, status
 from fastapi.responses import JSONResponse
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
 
 from app.config import settings
+from app.utils.db import data_access
+from app.utils.health import health_monitor, http_check, postgres_check, redis_check
 from app.utils.logger import logger
 
 # Initialize FastAPI app
@@ -26,8 +26,7 @@ app = FastAPI(
 )
 
 # Global connection objects (initialized on startup)
-redis_client: Optional[redis.Redis] = None
-postgres_engine: Optional[Engine] = None
+http_client: Optional[httpx.AsyncClient] = None
 
 
 @app.on_event("startup")
@@ -35,38 +34,22 @@ async def startup_event() -> None:
     """
     Initialize connections and resources on application startup.
     """
-    global redis_client, postgres_engine
+    global http_client
     
     logger.info(f"Starting {settings.service_name} v{settings.service_version}")
     
-    try:
-        # Initialize Redis connection
-        redis_client = redis.from_url(
-            settings.redis_url,
-            decode_responses=True,
-            socket_connect_timeout=5,
-        )
-        redis_client.ping()
-        logger.info("Redis connection established")
-    except Exception as e:
-        logger.warning(f"Redis connection failed: {e}")
-        redis_client = None
+    await data_access.start()
     
-    try:
-        # Initialize PostgreSQL connection
-        postgres_engine = create_engine(
-            settings.postgres_url,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
-        )
-        # Test connection
-        with postgres_engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        logger.info("PostgreSQL connection established")
-    except Exception as e:
-        logger.warning(f"PostgreSQL connection failed: {e}")
-        postgres_engine = None
+    # Probed in the background from here on; /status serves the cached results
+    health_monitor.register("redis", redis_check(data_access.redis))
+    health_monitor.register("postgresql", postgres_check(data_access.engine))
+    
+    # One pooled client for calls to other services
+    http_client = httpx.AsyncClient(timeout=settings.health_check_timeout)
+    health_monitor.register(
+        "data_service", http_check(http_client, f"{settings.data_service_url}/health")
+    )
+    await health_monitor.start()
 
 
 @app.on_event("shutdown")
@@ -76,15 +59,14 @@ async def shutdown_event() -> None:
     """
     logger.info("Shutting down quant engine")
     
-    global redis_client, postgres_engine
+    await health_monitor.close()
+    
+    global http_client
     
-    if redis_client:
-        redis_client.close()
-        logger.info("Redis connection closed")
+    if http_client:
+        await http_client.aclose()
     
-    if postgres_engine:
-        postgres_engine.dispose()
-        logger.info("PostgreSQL connection closed")
+    await data_access.close()
 
 
 @app.get("/health")
@@ -107,75 +89,26 @@ async def status_check() -> JSONResponse:
     """
     Detailed status check endpoint with dependency health.
     
-    Checks the health of:
+    Reports the latest background check results for:
     - Redis connection
     - PostgreSQL connection
     - Data service connectivity
     
+    Checks run on an interval in the background, so this endpoint does
+    no I/O and answers instantly however often it is polled.
+    
     Returns:
         Detailed status JSON response
     """
-    global redis_client, postgres_engine
-    
+    health = health_monitor.snapshot()
     status_info: Dict[str, Any] = {
         "service": settings.service_name,
         "version": settings.service_version,
         "timestamp": datetime.utcnow().isoformat() + "Z",
-        "status": "healthy",
-        "dependencies": {},
+        "status": health["status"],
+        "dependencies": health["dependencies"],
     }
     
-    # Check Redis
-    redis_status = {"status": "unknown", "error": None}
-    if redis_client:
-        try:
-            redis_client.ping()
-            redis_status["status"] = "healthy"
-        except Exception as e:
-            redis_status["status"] = "unhealthy"
-            redis_status["error"] = str(e)
-            status_info["status"] = "degraded"
-    else:
-        redis_status["status"] = "not_configured"
-    
-    status_info["dependencies"]["redis"] = redis_status
-    
-    # Check PostgreSQL
-    postgres_status = {"status": "unknown", "error": None}
-    if postgres_engine:
-        try:
-            with postgres_engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            postgres_status["status"] = "healthy"
-        except Exception as e:
-            postgres_status["status"] = "unhealthy"
-            postgres_status["error"] = str(e)
-            status_info["status"] = "degraded"
-    else:
-        postgres_status["status"] = "not_configured"
-    
-    status_info["dependencies"]["postgresql"] = postgres_status
-    
-    # Check Data Service connectivity
-    data_service_status = {"status": "unknown", "error": None}
-    try:
-        import httpx
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{settings.data_service_url}/health")
-            if response.status_code == 200:
-                data_service_status["status"] = "healthy"
-            else:
-                data_service_status["status"] = "unhealthy"
-    except ImportError:
-        data_service_status["status"] = "not_configured"
-        data_service_status["error"] = "httpx not installed"
-    except Exception as e:
-        data_service_status["status"] = "unhealthy"
-        data_service_status["error"] = str(e)
-        status_info["status"] = "degraded"
-    
-    status_info["dependencies"]["data_service"] = data_service_status
-    
     # Determine overall HTTP status code
     http_status = status.HTTP_200_OK
     if status_info["status"] == "degraded":
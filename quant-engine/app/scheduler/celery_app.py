@@ -4,6 +4,9 @@ Celery application configuration for quant engine service.
 from celery import Celery
 
 from app.config import settings
+from app.scheduler.payload import SERIALIZER, register_serializer
+
+register_serializer()
 
 # Create Celery instance
 celery_app = Celery(
@@ -18,9 +21,9 @@ celery_app = Celery(
 # Celery configuration
 celery_app.conf.update(
     # Task settings
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
+    task_serializer=settings.celery_serializer,
+    accept_content=["json", SERIALIZER],
+    result_serializer=settings.celery_serializer,
     timezone="Asia/Shanghai",
     enable_utc=True,
     
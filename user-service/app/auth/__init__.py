@@ -0,0 +1,7 @@
+"""
+Token revocation for the gateway's auth fast path.
+"""
+from app.auth.bloom import BloomFilter
+from app.auth.revocation import RevocationStore, get_revocation_store, read_snapshot
+
+__all__ = ["BloomFilter", "RevocationStore", "get_revocation_store", "read_snapshot"]
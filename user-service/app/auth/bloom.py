@@ -0,0 +1,72 @@
+"""
+Bloom filter with a compact binary form shared with the gateway.
+"""
+import hashlib
+import math
+import struct
+from typing import Iterable
+
+# Serialized form: magic, bit count (uint32), hash count (uint8), then the bit array
+MAGIC = b"BF1"
+HEADER = struct.Struct(">3sIB")
+
+
+class BloomFilter:
+    """Set membership with no false negatives and a tunable false-positive rate."""
+
+    def __init__(self, size_bits: int, hash_count: int, bits: bytes = b""):
+        """
+        Initialize the filter.
+
+        Args:
+            size_bits: Number of bits
+            hash_count: Bit positions set per item
+            bits: Existing bit array, empty for a new filter
+        """
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.bits = bytearray(bits or (size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float) -> "BloomFilter":
+        """
+        Filter sized for ``capacity`` items at the given false-positive rate.
+
+        Args:
+            capacity: Expected number of items
+            false_positive_rate: Target false-positive probability
+
+        Returns:
+            Empty filter
+        """
+        capacity = max(capacity, 1)
+        size_bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        size_bits = max(1024, size_bits)
+        hash_count = max(1, round(size_bits / capacity * math.log(2)))
+        return cls(size_bits, min(hash_count, 16))
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Double hashing (Kirsch-Mitzenmacher) from one 128-bit digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item)
+        )
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(MAGIC, self.size_bits, self.hash_count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        magic, size_bits, hash_count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a Bloom filter snapshot")
+        return cls(size_bits, hash_count, data[HEADER.size:])
@@ -0,0 +1,167 @@
+"""
+Revoked access tokens, published as a Bloom filter snapshot.
+"""
+import threading
+import time
+from typing import Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.auth.bloom import BloomFilter
+from app.config import settings
+from app.utils.logger import logger
+
+REVOKED_KEY = "auth:revoked"  # sorted set: token ID -> expiry timestamp
+SNAPSHOT_KEY = "auth:revoked:bloom"
+VERSION_KEY = "auth:revoked:version"
+SEQUENCE_KEY = "auth:revoked:sequence"
+
+# Take the next publish ticket, never below the published version
+# KEYS: sequence, version
+_TICKET_SCRIPT = """
+local ticket = redis.call('INCR', KEYS[1])
+local version = tonumber(redis.call('GET', KEYS[2]) or '0')
+if ticket <= version then
+    ticket = version + 1
+    redis.call('SET', KEYS[1], ticket)
+end
+return ticket
+"""
+
+# Store a snapshot unless one built from a later ticket is already published
+# KEYS: snapshot, version
+# ARGV: ticket, serialized filter
+_PUBLISH_SCRIPT = """
+local version = tonumber(redis.call('GET', KEYS[2]) or '0')
+local ticket = tonumber(ARGV[1])
+if ticket <= version then
+    return version
+end
+redis.call('SET', KEYS[1], ARGV[2])
+redis.call('SET', KEYS[2], ticket)
+return ticket
+"""
+
+
+class RevocationStore:
+    """
+    Revoked token IDs (JWT ``jti``), kept until the token would have expired.
+
+    Every change rebuilds a Bloom filter of the live revocations and bumps a
+    version counter. The gateway syncs the snapshot and checks tokens
+    against it in memory, confirming with Redis only on a filter hit.
+
+    Concurrent publishes are ordered by a ticket taken before the live set
+    is read, and a snapshot is only stored if no later ticket has been
+    published, so the newest version always covers every revocation
+    committed before its publish began.
+    """
+
+    def __init__(self, client: Optional[redis.Redis] = None):
+        """
+        Initialize the store.
+
+        Args:
+            client: Redis client, defaults to settings.redis_url
+        """
+        self.client = client or redis.from_url(settings.redis_url)
+        self._ticket = self.client.register_script(_TICKET_SCRIPT)
+        self._publish = self.client.register_script(_PUBLISH_SCRIPT)
+
+    def revoke(self, jti: str, expires_at: float) -> int:
+        """
+        Revoke a token.
+
+        Args:
+            jti: Token ID
+            expires_at: Token expiry as a Unix timestamp
+
+        Returns:
+            New snapshot version
+        """
+        self.client.zadd(REVOKED_KEY, {jti: expires_at})
+        return self.publish()
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Exact revocation check.
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            True if the token is revoked and not yet expired
+        """
+        expires_at = self.client.zscore(REVOKED_KEY, jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge_expired(self) -> int:
+        """
+        Drop revocations of tokens that have expired anyway.
+
+        Returns:
+            Number of revocations removed
+        """
+        removed = self.client.zremrangebyscore(REVOKED_KEY, "-inf", time.time())
+        if removed:
+            self.publish()
+        return removed
+
+    def publish(self) -> int:
+        """
+        Rebuild and store the Bloom filter snapshot.
+
+        Returns:
+            Published snapshot version, which is newer than this call's if a
+            concurrent publish superseded it
+        """
+        ticket = self._ticket(keys=[SEQUENCE_KEY, VERSION_KEY])
+        live = self.client.zrangebyscore(REVOKED_KEY, time.time(), "+inf")
+        bloom = BloomFilter.for_capacity(
+            len(live) * 2, settings.revocation_bloom_false_positive_rate
+        )
+        for jti in live:
+            bloom.add(jti.decode() if isinstance(jti, bytes) else jti)
+
+        version = self._publish(keys=[SNAPSHOT_KEY, VERSION_KEY], args=[ticket, bloom.to_bytes()])
+        if version == ticket:
+            logger.info(f"Published revocation snapshot v{version} ({len(live)} tokens)")
+        else:
+            logger.info(f"Revocation snapshot v{ticket} superseded by v{version}")
+        return version
+
+
+async def read_snapshot(client: aioredis.Redis) -> Tuple[Optional[int], Optional[bytes]]:
+    """
+    Current snapshot, as published by RevocationStore.publish().
+
+    Args:
+        client: Async Redis client, such as data_access.redis
+
+    Returns:
+        Tuple of (version, serialized filter), both None before the first publish
+    """
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.get(VERSION_KEY)
+        pipe.get(SNAPSHOT_KEY)
+        version, data = await pipe.execute()
+    return (int(version) if version is not None else None), data
+
+
+_store: Optional[RevocationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_revocation_store() -> RevocationStore:
+    """
+    Get the process-wide revocation store.
+
+    Returns:
+        Shared RevocationStore instance
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RevocationStore()
+        return _store
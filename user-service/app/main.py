@@ -5,15 +5,15 @@ This module initializes the FastAPI application and sets up all routes,
 middleware, and startup/shutdown events.
 """
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 
-import redis
-from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, Response
 
+from app.auth.revocation import read_snapshot
 from app.config import settings
+from app.utils.db import data_access
+from app.utils.health import health_monitor, postgres_check, redis_check
 from app.utils.logger import logger
 
 # Initialize FastAPI app
@@ -25,48 +25,20 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
-# Global connection objects (initialized on startup)
-redis_client: Optional[redis.Redis] = None
-postgres_engine: Optional[Engine] = None
-
 
 @app.on_event("startup")
 async def startup_event() -> None:
     """
     Initialize connections and resources on application startup.
     """
-    global redis_client, postgres_engine
-    
     logger.info(f"Starting {settings.service_name} v{settings.service_version}")
     
-    try:
-        # Initialize Redis connection
-        redis_client = redis.from_url(
-            settings.redis_url,
-            decode_responses=True,
-            socket_connect_timeout=5,
-        )
-        redis_client.ping()
-        logger.info("Redis connection established")
-    except Exception as e:
-        logger.warning(f"Redis connection failed: {e}")
-        redis_client = None
+    await data_access.start()
     
-    try:
-        # Initialize PostgreSQL connection
-        postgres_engine = create_engine(
-            settings.postgres_url,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
-        )
-        # Test connection
-        with postgres_engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        logger.info("PostgreSQL connection established")
-    except Exception as e:
-        logger.warning(f"PostgreSQL connection failed: {e}")
-        postgres_engine = None
+    # Probed in the background from here on; /status serves the cached results
+    health_monitor.register("redis", redis_check(data_access.redis))
+    health_monitor.register("postgresql", postgres_check(data_access.engine))
+    await health_monitor.start()
 
 
 @app.on_event("shutdown")
@@ -76,15 +48,9 @@ async def shutdown_event() -> None:
     """
     logger.info("Shutting down user service")
     
-    global redis_client, postgres_engine
-    
-    if redis_client:
-        redis_client.close()
-        logger.info("Redis connection closed")
+    await health_monitor.close()
     
-    if postgres_engine:
-        postgres_engine.dispose()
-        logger.info("PostgreSQL connection closed")
+    await data_access.close()
 
 
 @app.get("/health")
@@ -107,55 +73,26 @@ async def status_check() -> JSONResponse:
     """
     Detailed status check endpoint with dependency health.
     
-    Checks the health of:
+    Reports the latest background check results for:
     - Redis connection
     - PostgreSQL connection
     - Service uptime
     
+    Checks run on an interval in the background, so this endpoint does
+    no I/O and answers instantly however often it is polled.
+    
     Returns:
         Detailed status JSON response
     """
-    global redis_client, postgres_engine
-    
+    health = health_monitor.snapshot()
     status_info: Dict[str, Any] = {
         "service": settings.service_name,
         "version": settings.service_version,
         "timestamp": datetime.utcnow().isoformat() + "Z",
-        "status": "healthy",
-        "dependencies": {},
+        "status": health["status"],
+        "dependencies": health["dependencies"],
     }
     
-    # Check Redis
-    redis_status = {"status": "unknown", "error": None}
-    if redis_client:
-        try:
-            redis_client.ping()
-            redis_status["status"] = "healthy"
-        except Exception as e:
-            redis_status["status"] = "unhealthy"
-            redis_status["error"] = str(e)
-            status_info["status"] = "degraded"
-    else:
-        redis_status["status"] = "not_configured"
-    
-    status_info["dependencies"]["redis"] = redis_status
-    
-    # Check PostgreSQL
-    postgres_status = {"status": "unknown", "error": None}
-    if postgres_engine:
-        try:
-            with postgres_engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            postgres_status["status"] = "healthy"
-        except Exception as e:
-            postgres_status["status"] = "unhealthy"
-            postgres_status["error"] = str(e)
-            status_info["status"] = "degraded"
-    else:
-        postgres_status["status"] = "not_configured"
-    
-    status_info["dependencies"]["postgresql"] = postgres_status
-    
     # Determine overall HTTP status code
     http_status = status.HTTP_200_OK
     if status_info["status"] == "degraded":
@@ -167,6 +104,28 @@ async def status_check() -> JSONResponse:
     )
 
 
+@app.get("/internal/auth/revocations")
+async def revocation_snapshot(request: Request) -> Response:
+    """
+    Bloom filter snapshot of revoked access tokens, for the gateway.
+    
+    The ETag is the snapshot version; a matching If-None-Match gets a 304
+    so polling replicas only download a snapshot when it changed.
+    
+    Returns:
+        Serialized filter, or 404 before any token has been revoked
+    """
+    version, data = await read_snapshot(data_access.redis)
+    if version is None or data is None:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+    
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=data, media_type="application/octet-stream", headers=headers)
+
+
 @app.get("/")
 async def root() -> Dict[str, str]:
     """
@@ -4,6 +4,7 @@ Celery tasks for user-related operations.
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 
+from app.auth import get_revocation_store
 from app.crawler.wechat import WeChatUserCrawler
 from app.cleaner.user import UserDataCleaner
 from app.scheduler.celery_app import celery_app
@@ -63,15 +64,15 @@ def clean_expired_tokens() -> Dict[str, Any]:
     logger.info("Starting expired token cleanup")
     
     try:
-        # TODO: Implement token cleanup
-        # 1. Query expired tokens from Redis
-        # 2. Delete expired tokens
-        # 3. Update user session status
+        # Revocations outlive their tokens only until expiry; dropping them
+        # keeps the gateway's Bloom snapshot small
+        store = get_revocation_store()
+        deleted = store.purge_expired()
         
         result = {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
-            "tokens_deleted": 0,
+            "tokens_deleted": deleted,
         }
         
         logger.info(f"Completed token cleanup: {result}")
@@ -1,7 +1,19 @@
 """
 Utility modules for user service.
 """
+from app.utils.bulk import BulkWriter, UpsertResult, bulk_upsert
+from app.utils.db import DataAccess, data_access
+from app.utils.health import HealthMonitor, health_monitor
 from app.utils.logger import logger, setup_logger
 
-__all__ = ["logger", "setup_logger"]
-
+__all__ = [
+    "logger",
+    "setup_logger",
+    "BulkWriter",
+    "UpsertResult",
+    "bulk_upsert",
+    "DataAccess",
+    "data_access",
+    "HealthMonitor",
+    "health_monitor",
+]